@@ -8,9 +8,6 @@ from pathlib import Path
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.database import init_db
-from src.main import get_customer_support_agent
-
 
 def main():
     """Main example function"""
@@ -19,12 +16,16 @@ def main():
     print("Welcome to Multi-Agent HR Intelligence Platform - Customer Support Agent")
     print("=" * 80 + "\n")
 
+    # Imported here so the banner prints before the heavy modules load
+    from src.database import init_db
+    from src.agent_service import get_agent_client
+
     # Initialize database (first time only)
     print("Initializing system...")
     init_db()
 
-    # Get agent instance
-    agent = get_customer_support_agent()
+    # Get agent instance (shared service if running, else in-process)
+    agent = get_agent_client()
     print("Agent ready!\n")
 
     # Example 1: Simple query
@@ -64,8 +65,12 @@ def main():
     print("\n--- Example 4: Conversation History ---")
     history = agent.get_conversation_history("user_john", limit=5)
     print(f"Found {len(history)} conversations for user_john:")
-    for conv in history:
-        print(f"  - [{conv['category']}] {conv['query'][:60]}...")
+    # Format all rows first and write them in one call
+    if history:
+        sys.stdout.write(
+            "\n".join(f"  - [{c['category']}] {c['query'][:60]}..." for c in history)
+            + "\n"
+        )
 
     print("\n" + "=" * 80)
     print("Examples complete! Check the code to see how it works.")
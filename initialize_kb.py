@@ -3,6 +3,8 @@ Initialize Knowledge Base with FAQs
 Run this script to load FAQs into the vector store
 """
 
+import sys
+
 from src.knowledge_base.retriever import get_kb_retriever
 from src.utils.logger import app_logger
 
@@ -39,18 +41,26 @@ def main():
             "What are your business hours?",
         ]
 
-        for query in test_queries:
-            print(f"\nQuery: '{query}'")
-            print("-" * 60)
+        # Encode and search all test queries in one batch
+        batch_results = retriever.retrieve_batch(test_queries, k=2)
 
-            results = retriever.retrieve(query, k=2)
+        # Build the whole report, then write it in one call
+        lines = []
+        for query, results in zip(test_queries, batch_results):
+            lines.append(f"\nQuery: '{query}'")
+            lines.append("-" * 60)
 
             if results:
                 for i, result in enumerate(results, 1):
-                    print(f"{i}. [{result['category']}] {result['question'][:60]}...")
-                    print(f"   Score: {result['similarity_score']:.3f}")
+                    lines.append(
+                        f"{i}. [{result['category']}] {result['question'][:60]}..."
+                    )
+                    lines.append(f"   Score: {result['similarity_score']:.3f}")
             else:
-                print("   No results found")
+                lines.append("   No results found")
+
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
 
         print("\n" + "=" * 60)
         print("Knowledge Base Initialized Successfully!")
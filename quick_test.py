@@ -1,8 +1,7 @@
-from src.database import init_db
-from src.main import get_customer_support_agent
+from src.agent_service import get_agent_client
 
-# Get agent
-agent = get_customer_support_agent()
+# Get agent (shared service if running, else in-process)
+agent = get_agent_client()
 
 # Test query
 response = agent.process_query(
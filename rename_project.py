@@ -1,50 +1,87 @@
 """
 Rename project from Multi-Agent HR Intelligence Platform to Multi-Agent HR Intelligence Platform
 """
+import mmap
 import os
 import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # Mapping of old names to new names
 REPLACEMENTS = {
     "Multi-Agent HR Intelligence Platform": "Multi-Agent HR Intelligence Platform",
-    "Multi-Agent HR Intelligence Platform": "Multi-Agent HR Intelligence Platform",
-    "Multi-Agent HR Intelligence Platform": "Multi-Agent HR Intelligence Platform",
-    "Multi-Agent HR Intelligence Platform": "Multi-Agent HR Intelligence Platform",
 }
 
 # File extensions to process
 EXTENSIONS = ['.md', '.py', '.html', '.css', '.json', '.txt']
+EXT_SET = frozenset(EXTENSIONS)
 
 # Directories to skip
-SKIP_DIRS = {'.git', '__pycache__', 'node_modules', '.pytest_cache', 'venv', 'env', '.venv'}
+SKIP_DIRS = frozenset({'.git', '__pycache__', 'node_modules', '.pytest_cache', 'venv', 'env', '.venv'})
 
-def should_process_file(file_path):
-    """Check if file should be processed"""
-    # Skip if in excluded directory
-    for skip_dir in SKIP_DIRS:
-        if skip_dir in file_path.parts:
-            return False
+# Pre-encoded old -> new mapping so files are rewritten without a decode/encode pass
+BYTES_REPLACEMENTS = {
+    old.encode('utf-8'): new.encode('utf-8') for old, new in REPLACEMENTS.items()
+}
+
+# Single-pass multi-pattern scanner over raw bytes (longest patterns first)
+SCAN_PATTERN = re.compile(
+    b"|".join(
+        re.escape(old)
+        for old in sorted(BYTES_REPLACEMENTS, key=len, reverse=True)
+    )
+)
 
-    # Only process specific extensions
-    return file_path.suffix in EXTENSIONS
+def iter_candidate_files(root):
+    """Yield files to process, pruning SKIP_DIRS before descending into them"""
+    for dir_path, dirs, files in os.walk(root):
+        # Prune in place so os.walk never enters skipped directories
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        for name in files:
+            if os.path.splitext(name)[1] in EXT_SET:
+                yield Path(dir_path, name)
+
+def read_if_matching(file_path):
+    """Return the raw file bytes, or None if no pattern occurs in the file"""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Scan the mapped file once before copying anything out of it
+            if SCAN_PATTERN.search(mm) is None:
+                return None
+            return mm[:]
+
+def write_atomically(file_path, content):
+    """Stream bytes to a sibling temp file and swap it into place"""
+    fd, tmp_path = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        shutil.copymode(file_path, tmp_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
 def replace_in_file(file_path):
     """Replace text in a single file"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        original_content = content
+        # Files without any match are never read in full or rewritten
+        original_content = read_if_matching(file_path)
+        if original_content is None:
+            return False
 
-        # Apply all replacements
-        for old_text, new_text in REPLACEMENTS.items():
-            content = content.replace(old_text, new_text)
+        # Apply all replacements in one pass over the raw bytes
+        content = SCAN_PATTERN.sub(
+            lambda m: BYTES_REPLACEMENTS[m.group(0)], original_content
+        )
 
         # Only write if changes were made
         if content != original_content:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            write_atomically(file_path, content)
             return True
         return False
     except Exception as e:
@@ -60,10 +97,12 @@ def main():
     print(f"Root directory: {project_root}")
     print()
 
-    # Walk through all files
-    for file_path in project_root.rglob('*'):
-        if file_path.is_file() and should_process_file(file_path):
-            if replace_in_file(file_path):
+    # Walk through all files and process them in parallel
+    file_paths = list(iter_candidate_files(project_root))
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = executor.map(replace_in_file, file_paths, chunksize=32)
+        for file_path, updated in zip(file_paths, results):
+            if updated:
                 print(f"[OK] Updated: {file_path.relative_to(project_root)}")
                 files_updated += 1
 
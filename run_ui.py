@@ -5,8 +5,8 @@ Simple script to launch the Gradio web interface.
 """
 
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import traceback
 
 # Add project root to path
 project_root = Path(__file__).parent
@@ -28,28 +28,39 @@ except Exception as e:
     print(f"      [WARN] Logger failed: {e}")
     print("      --> Continuing without logging...")
 
-# Step 2: Initialize database
+# Steps 2-3: Initialize database and load AI agent concurrently
+# (disjoint resources, so startup takes max(db, agent) instead of the sum)
 print("\n[2/4] Initializing database...")
-try:
-    from src.database import init_db
+print("[3/4] Loading AI agent...")
+
+
+def report_db_ready(future):
+    """Print the database initialization result"""
+    error = future.exception()
+    if error is None:
+        print("      [OK] Database ready!")
+    else:
+        print(f"      [WARN] Database initialization issue: {error}")
+        print("      --> Continuing anyway (may work with defaults)...")
 
-    init_db()
-    print("      [OK] Database ready!")
-except Exception as e:
-    print(f"      [WARN] Database initialization issue: {e}")
-    print("      --> Continuing anyway (may work with defaults)...")
 
-# Step 3: Load AI agent
-print("\n[3/4] Loading AI agent...")
 try:
+    from src.database import init_db
     from src.main import get_customer_support_agent
 
-    agent = get_customer_support_agent()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        db_future = executor.submit(init_db)
+        db_future.add_done_callback(report_db_ready)
+        agent_future = executor.submit(get_customer_support_agent)
+        agent = agent_future.result()
+
     print("      [OK] Agent ready!")
 except Exception as e:
     print(f"      [FAIL] Agent loading failed: {e}")
     print("\n" + "=" * 70)
     print("ERROR DETAILS:")
+    import traceback
+
     traceback.print_exc()
     print("=" * 70)
     print("\nTROUBLESHOOTING:")
@@ -92,6 +103,8 @@ except Exception as e:
     print("=" * 70)
     print(f"\nError: {e}")
     print("\nFull traceback:")
+    import traceback
+
     traceback.print_exc()
     print("\n" + "=" * 70)
     print("TROUBLESHOOTING:")
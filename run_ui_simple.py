@@ -4,6 +4,7 @@ This uses a simplified version to avoid Gradio type checking bugs
 """
 
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add project root to path
@@ -24,14 +25,40 @@ try:
 except Exception as e:
     print(f"      [WARN] Logger failed: {e}")
 
-print("\n[2/3] Initializing database...")
+# Initialize database and preload the AI agent concurrently
+# (disjoint resources, so startup takes max(db, agent) instead of the sum)
+print("\n[2/3] Initializing database and loading AI agent...")
+
+
+def report_db_ready(future):
+    """Print the database initialization result"""
+    error = future.exception()
+    if error is None:
+        print("      [OK] Database ready!")
+    else:
+        print(f"      [WARN] Database issue: {error}")
+
+
+def report_agent_ready(future):
+    """Print the agent preload result"""
+    error = future.exception()
+    if error is None:
+        print("      [OK] Agent ready!")
+    else:
+        print(f"      [WARN] Agent preload failed, will load on first request: {error}")
+
+
 try:
     from src.database import init_db
+    from src.main import get_customer_support_agent
 
-    init_db()
-    print("      [OK] Database ready!")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        executor.submit(init_db).add_done_callback(report_db_ready)
+        executor.submit(get_customer_support_agent).add_done_callback(
+            report_agent_ready
+        )
 except Exception as e:
-    print(f"      [WARN] Database issue: {e}")
+    print(f"      [WARN] Startup issue: {e}")
 
 print("\n[3/3] Launching simplified Gradio interface...")
 try:
@@ -3,9 +3,15 @@ Launch Multi-Agent HR Intelligence Platform - FastAPI Web Interface
 Production-ready alternative to Gradio
 """
 
+import os
 import sys
 from pathlib import Path
 
+# Worker processes inherit these; keep tokenizer/BLAS thread pools from
+# oversubscribing the cores when several workers load models at once
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+
 # Add project root to path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
@@ -27,6 +33,10 @@ try:
 except Exception as e:
     print(f"      [WARN] Logger failed: {e}")
 
+# Leave headroom for the embedding model; each worker loads its own agent
+WORKERS = max(2, (os.cpu_count() or 1) // 2)
+
+# Initialize database (the agent is loaded per worker on startup)
 print("\n[2/3] Initializing database...")
 try:
     from src.database import init_db
@@ -46,14 +56,14 @@ try:
     print()
     print(">>> URL: http://127.0.0.1:8000")
     print(">>> API Docs: http://127.0.0.1:8000/docs")
-    print(">>> Mode: Development (auto-reload enabled)")
+    print(f">>> Mode: Production ({WORKERS} workers, auto-reload disabled)")
     print()
     print("[!] Press Ctrl+C to stop the server")
     print("=" * 70)
     print()
 
-    # Run server with auto-reload
-    run_server(host="127.0.0.1", port=8000, reload=False)
+    # Run server with multiple worker processes
+    run_server(host="127.0.0.1", port=8000, reload=False, workers=WORKERS)
 
 except KeyboardInterrupt:
     print("\n\n[!] Server stopped by user")
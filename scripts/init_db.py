@@ -3,6 +3,7 @@ Simple database initialization script for E2E testing
 Creates all tables without any prompts
 """
 
+import argparse
 import sys
 from pathlib import Path
 
@@ -11,7 +12,7 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from sqlalchemy import create_engine
-from src.database.models import Base
+from src.database.models import Base, conversation_user_created_index
 from src.utils.config import settings
 import logging
 
@@ -20,26 +21,47 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def init_database():
-    """Initialize database with all tables"""
+def init_database(fresh: bool = False):
+    """
+    Initialize database with all tables
+
+    Args:
+        fresh: Database is known to be empty (e.g. E2E runs), so skip the
+            per-table existence checks and the post-create reflection
+    """
     logger.info("Initializing database...")
 
     # Create engine
     engine = create_engine(settings.database_url)
 
-    # Create all tables
-    Base.metadata.create_all(engine)
+    # Create all tables in a single transaction
+    with engine.begin() as conn:
+        Base.metadata.create_all(conn, checkfirst=not fresh)
+
+        # create_all skips indexes on tables that already existed
+        if not fresh:
+            conversation_user_created_index.create(conn, checkfirst=True)
 
     logger.info("[OK] All database tables created successfully!")
     logger.info(f"Database location: {settings.database_url}")
 
     # List created tables
-    from sqlalchemy import inspect
-    inspector = inspect(engine)
-    tables = inspector.get_table_names()
+    if fresh:
+        tables = [table.name for table in Base.metadata.sorted_tables]
+    else:
+        from sqlalchemy import inspect
+        inspector = inspect(engine)
+        tables = inspector.get_table_names()
 
     logger.info(f"Created tables: {', '.join(tables)}")
 
 
 if __name__ == "__main__":
-    init_database()
+    parser = argparse.ArgumentParser(description="Create all database tables")
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Database is empty; skip existence checks (fails if tables exist)",
+    )
+    args = parser.parse_args()
+    init_database(fresh=args.fresh)
@@ -17,7 +17,12 @@ sys.path.insert(0, str(project_root))
 
 from sqlalchemy import create_engine, text, inspect
 from sqlalchemy.orm import sessionmaker
-from src.database.models import Base, Employee, JobApplication
+from src.database.models import (
+    Base,
+    Employee,
+    JobApplication,
+    conversation_user_created_index,
+)
 from src.utils.config import settings
 import logging
 
@@ -32,14 +37,23 @@ def backup_database(engine):
 
     db_url = str(engine.url)
     if "sqlite" in db_url:
-        import shutil
+        import sqlite3
         from datetime import datetime
 
         db_file = db_url.split("///")[-1]
         backup_file = f"{db_file}.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
         if os.path.exists(db_file):
-            shutil.copy2(db_file, backup_file)
+            # Online backup API: consistent snapshot (including WAL contents)
+            # while other connections keep reading
+            source = sqlite3.connect(db_file)
+            destination = sqlite3.connect(backup_file)
+            try:
+                with destination:
+                    source.backup(destination, pages=1024)
+            finally:
+                destination.close()
+                source.close()
             logger.info(f"[OK] Backup created: {backup_file}")
             return backup_file
     else:
@@ -47,6 +61,20 @@ def backup_database(engine):
         return None
 
 
+def create_history_index(engine):
+    """Create the (user_id, created_at DESC) index used by history lookups"""
+    logger.info("Creating conversation history index...")
+
+    inspector = inspect(engine)
+    if "conversations" not in inspector.get_table_names():
+        logger.info("No conversations table found - index will be created with it")
+        return
+
+    with engine.begin() as conn:
+        conversation_user_created_index.create(conn, checkfirst=True)
+    logger.info(f"  [OK] Index ready: {conversation_user_created_index.name}")
+
+
 def migrate_category_data(engine):
     """Migrate old customer support categories to HR categories"""
     logger.info("Migrating category data...")
@@ -58,25 +86,42 @@ def migrate_category_data(engine):
         "General": "General"
     }
 
-    with engine.connect() as conn:
-        # Check if conversations table exists
-        inspector = inspect(engine)
-        if "conversations" not in inspector.get_table_names():
-            logger.info("No conversations table found - fresh database")
-            return
-
-        # Update conversation categories
-        for old_cat, new_cat in category_mapping.items():
+    # Check if conversations table exists
+    inspector = inspect(engine)
+    table_names = inspector.get_table_names()
+    if "conversations" not in table_names:
+        logger.info("No conversations table found - fresh database")
+        return
+
+    # Identity mappings are no-ops, so leave them out of the UPDATE
+    changed = {old: new for old, new in category_mapping.items() if old != new}
+    params = {}
+    when_clauses = []
+    in_params = []
+    for i, (old_cat, new_cat) in enumerate(changed.items()):
+        params[f"old_{i}"] = old_cat
+        params[f"new_{i}"] = new_cat
+        when_clauses.append(f"WHEN :old_{i} THEN :new_{i}")
+        in_params.append(f":old_{i}")
+
+    # Single transaction: one scan of conversations and one commit at the end
+    with engine.begin() as conn:
+        # Update conversation categories in one statement
+        if changed:
             result = conn.execute(
-                text("UPDATE conversations SET category = :new_cat WHERE category = :old_cat"),
-                {"new_cat": new_cat, "old_cat": old_cat}
+                text(
+                    f"UPDATE conversations SET category = CASE category "
+                    f"{' '.join(when_clauses)} END "
+                    f"WHERE category IN ({', '.join(in_params)})"
+                ),
+                params,
             )
-            conn.commit()
             if result.rowcount > 0:
-                logger.info(f"  Migrated {result.rowcount} conversations: {old_cat} → {new_cat}")
+                mapping_desc = ", ".join(f"{old} → {new}" for old, new in changed.items())
+                logger.info(f"  Migrated {result.rowcount} conversations ({mapping_desc})")
 
         # Update analytics if exists
-        if "analytics" in inspector.get_table_names():
+        if "analytics" in table_names:
             # Map old columns to new columns in analytics table
             # This is a simplification - in production you'd want more sophisticated logic
             logger.info("  Updating analytics aggregations...")
@@ -92,7 +137,6 @@ def migrate_category_data(engine):
                     WHERE technical_queries IS NOT NULL OR billing_queries IS NOT NULL
                 """)
             )
-            conn.commit()
             logger.info("  [OK] Analytics updated")
 
 
@@ -100,30 +144,49 @@ def add_hr_columns(engine):
     """Add HR-specific columns to existing tables"""
     logger.info("Adding HR columns to users table...")
 
-    with engine.connect() as conn:
-        inspector = inspect(engine)
-
-        # Check if users table exists
-        if "users" not in inspector.get_table_names():
-            logger.info("No users table found - will be created fresh")
-            return
-
-        # Get existing columns
-        existing_columns = [col['name'] for col in inspector.get_columns('users')]
-
-        # Add HR columns if they don't exist
-        hr_columns = {
-            'employee_id': 'VARCHAR(50)',
-            'department': 'VARCHAR(100)',
-            'position': 'VARCHAR(100)',
-            'hire_date': 'DATETIME'
-        }
+    inspector = inspect(engine)
 
-        for column_name, column_type in hr_columns.items():
-            if column_name not in existing_columns:
+    # Check if users table exists
+    if "users" not in inspector.get_table_names():
+        logger.info("No users table found - will be created fresh")
+        return
+
+    # Get existing columns
+    existing_columns = [col['name'] for col in inspector.get_columns('users')]
+
+    # Add HR columns if they don't exist
+    is_postgres = engine.dialect.name == "postgresql"
+    hr_columns = {
+        'employee_id': 'VARCHAR(50)',
+        'department': 'VARCHAR(100)',
+        'position': 'VARCHAR(100)',
+        'hire_date': 'TIMESTAMP' if is_postgres else 'DATETIME'
+    }
+    missing_columns = {
+        name: col_type for name, col_type in hr_columns.items()
+        if name not in existing_columns
+    }
+    if not missing_columns:
+        logger.info("  All HR columns already exist")
+        return
+
+    # One transaction so the schema changes commit together
+    if is_postgres:
+        # PostgreSQL accepts several ADD COLUMN clauses in one ALTER TABLE
+        add_clauses = ", ".join(
+            f"ADD COLUMN {name} {col_type}" for name, col_type in missing_columns.items()
+        )
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE users {add_clauses}"))
+            logger.info(f"  [OK] Added columns: {', '.join(missing_columns)}")
+        except Exception as e:
+            logger.warning(f"  [WARNING] Could not add HR columns: {e}")
+    else:
+        with engine.begin() as conn:
+            for column_name, column_type in missing_columns.items():
                 try:
                     conn.execute(text(f"ALTER TABLE users ADD COLUMN {column_name} {column_type}"))
-                    conn.commit()
                     logger.info(f"  [OK] Added column: {column_name}")
                 except Exception as e:
                     logger.warning(f"  [WARNING] Could not add {column_name}: {e}")
@@ -204,10 +267,13 @@ def main():
         # Step 3: Create new HR tables
         create_new_tables(engine)
 
-        # Step 4: Migrate existing category data
+        # Step 4: Index conversation history lookups
+        create_history_index(engine)
+
+        # Step 5: Migrate existing category data
         migrate_category_data(engine)
 
-        # Step 5: Verify migration
+        # Step 6: Verify migration
         success = verify_migration(engine)
 
         if success:
@@ -7,47 +7,128 @@ This script runs during Railway deployment to:
 2. Run migrations
 3. Initialize knowledge base if needed
 4. Verify health check
+5. Warm up runtime caches
 
 Usage:
     python scripts/railway_init.py
 """
 
+import asyncio
 import os
+import socket
 import sys
-import time
+from functools import lru_cache
 from pathlib import Path
 
-# Add project root to path
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
+from sqlalchemy import text
+from sqlalchemy.exc import (
+    ArgumentError,
+    DBAPIError,
+    OperationalError,
+    ProgrammingError,
+)
+from tenacity import (
+    RetryCallState,
+    Retrying,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
+
+# Add project root to path (once, even if this module is imported again)
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
-from src.database.connection import init_db, get_db
 from src.utils.logger import app_logger
 
+# The database engine, workflow and API app are imported inside the steps
+# that use them, so importing this module stays cheap
 
-def check_database_connection(max_retries=5, retry_delay=5):
-    """Check database connection with retry logic"""
+REQUIRED_VARS = ["DATABASE_URL", "GROQ_API_KEY"]
+OPTIONAL_VARS = ["PORT", "ENVIRONMENT", "SECRET_KEY"]
+
+
+@lru_cache(maxsize=4)
+def _env_snapshot(environment):
+    """Read all deployment variables once per ENVIRONMENT value"""
+    return {var: os.environ.get(var) for var in REQUIRED_VARS + OPTIONAL_VARS}
+
+
+def get_env_snapshot():
+    """Get the deployment variables, re-read whenever ENVIRONMENT changes"""
+    return _env_snapshot(os.environ.get("ENVIRONMENT"))
+
+
+def is_recoverable_db_error(error: Exception) -> bool:
+    """Return True for transient connection errors worth retrying"""
+    # Bad SQL or bad configuration won't fix itself on retry
+    if isinstance(error, (ProgrammingError, ArgumentError)):
+        return False
+    if isinstance(error, OperationalError):
+        return True
+    if isinstance(error, DBAPIError):
+        return error.connection_invalidated
+    return isinstance(error, (socket.timeout, ConnectionError))
+
+
+def _ping_database():
+    """Check out a pooled connection and run a trivial query"""
+    from src.database.connection import engine
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+def _log_db_retry(retry_state: RetryCallState):
+    """Log a failed connection attempt before tenacity sleeps"""
+    app_logger.warning(
+        f"Database connection attempt {retry_state.attempt_number} failed: "
+        f"{retry_state.outcome.exception()}"
+    )
+    app_logger.info(f"Retrying in {retry_state.upcoming_sleep:.1f} seconds...")
+
+
+def check_database_connection(max_retries=5, base_delay=1.0, max_delay=30.0, jitter=0.5):
+    """
+    Check database connection with exponential backoff and jitter
+
+    Only transient errors (see is_recoverable_db_error) are retried; bad SQL
+    or configuration fails on the first attempt.
+
+    Args:
+        max_retries: Maximum number of connection attempts
+        base_delay: Delay before the first retry in seconds (doubles per attempt)
+        max_delay: Upper bound for the backoff delay in seconds
+        jitter: Maximum random number of seconds added to each delay
+
+    Returns:
+        True if the database answered, False otherwise
+    """
     app_logger.info("Checking database connection...")
 
-    for attempt in range(1, max_retries + 1):
-        try:
-            db = next(get_db())
-            db.execute("SELECT 1")
-            db.close()
-            app_logger.info(f"Database connection successful on attempt {attempt}")
-            return True
-        except Exception as e:
-            app_logger.warning(
-                f"Database connection attempt {attempt}/{max_retries} failed: {e}"
-            )
-            if attempt < max_retries:
-                app_logger.info(f"Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-            else:
-                app_logger.error("Max retries reached. Database connection failed.")
-                return False
+    retryer = Retrying(
+        stop=stop_after_attempt(max_retries),
+        wait=wait_exponential_jitter(initial=base_delay, max=max_delay, jitter=jitter),
+        retry=retry_if_exception(is_recoverable_db_error),
+        before_sleep=_log_db_retry,
+        reraise=True,
+    )
+
+    try:
+        retryer(_ping_database)
+    except Exception as e:
+        if is_recoverable_db_error(e):
+            app_logger.error(f"Max retries reached. Database connection failed: {e}")
+        else:
+            app_logger.error(f"Unrecoverable database error, not retrying: {e}")
+        return False
 
-    return False
+    app_logger.info(
+        f"Database connection successful on attempt "
+        f"{retryer.statistics['attempt_number']}"
+    )
+    return True
 
 
 def initialize_database():
@@ -55,6 +136,8 @@ def initialize_database():
     app_logger.info("Initializing database tables...")
 
     try:
+        from src.database.connection import init_db
+
         init_db()
         app_logger.info("Database tables initialized successfully")
         return True
@@ -68,26 +151,22 @@ def initialize_knowledge_base():
     app_logger.info("Checking knowledge base initialization...")
 
     try:
-        from src.knowledge_base.vector_store import VectorStore
+        from src.knowledge_base.vector_store import VectorStore, read_kb_sentinel
 
-        # Check if knowledge base needs initialization
+        # Marker file written on save - avoids loading the encoder and index
+        count = read_kb_sentinel()
+        if count:
+            app_logger.info(f"Knowledge base already initialized with {count} documents")
+            return True
+
+        # No marker (first deploy or older index) - inspect the store itself
         vector_store = VectorStore()
+        count = len(vector_store.documents)
 
-        # Check if collection exists and has data
-        try:
-            collection = vector_store.client.get_collection(
-                name=vector_store.collection_name
-            )
-            count = collection.count()
-
-            if count > 0:
-                app_logger.info(
-                    f"Knowledge base already initialized with {count} documents"
-                )
-                return True
-        except Exception:
-            app_logger.info("Knowledge base collection not found, will be created on first use")
-            return True
+        if count > 0:
+            app_logger.info(f"Knowledge base already initialized with {count} documents")
+        else:
+            app_logger.info("Knowledge base is empty, will be created on first use")
 
         app_logger.info("Knowledge base checked successfully")
         return True
@@ -103,17 +182,16 @@ def verify_environment_variables():
     """Verify required environment variables are set"""
     app_logger.info("Verifying environment variables...")
 
-    required_vars = ["DATABASE_URL", "GROQ_API_KEY"]
-    optional_vars = ["PORT", "ENVIRONMENT", "SECRET_KEY"]
+    env = get_env_snapshot()
 
     missing_vars = []
-    for var in required_vars:
-        if not os.getenv(var):
+    for var in REQUIRED_VARS:
+        if not env[var]:
             missing_vars.append(var)
             app_logger.error(f"Required environment variable missing: {var}")
 
-    for var in optional_vars:
-        if os.getenv(var):
+    for var in OPTIONAL_VARS:
+        if env[var]:
             app_logger.info(f"Optional variable set: {var}")
         else:
             app_logger.warning(f"Optional variable not set: {var} (using default)")
@@ -132,22 +210,21 @@ def run_health_check():
 
     try:
         # Check Python version
-        import sys
-
         python_version = sys.version_info
         app_logger.info(f"Python version: {python_version.major}.{python_version.minor}.{python_version.micro}")
 
         # Check critical imports
-        from src.agents import workflow
-        from src.api import app
+        from src.agents import workflow  # noqa: F401
+        from src.api import app  # noqa: F401
+        from src.database.connection import engine
 
         app_logger.info("Critical imports successful")
 
         # Check database
-        db = next(get_db())
-        db.execute("SELECT 1")
-        db.close()
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
         app_logger.info("Database query successful")
+        app_logger.info(f"Connection pool: {engine.pool.status()}")
 
         app_logger.info("Health check passed")
         return True
@@ -157,54 +234,137 @@ def run_health_check():
         return False
 
 
-def main():
-    """Main initialization flow"""
-    app_logger.info("=" * 60)
-    app_logger.info("RAILWAY INITIALIZATION STARTED")
-    app_logger.info("=" * 60)
+def warm_up_runtime():
+    """
+    Build the graph, KB retriever and LLM client once before serving
 
-    # Track success of each step
+    Failures are only warnings - the server initializes them lazily anyway.
+    What outlives this process is on disk (embedding model download and
+    export, bytecode caches), so the first request in each worker doesn't
+    pay for it.
+
+    Returns:
+        Always True
+    """
+    app_logger.info("Warming up runtime caches...")
+
+    from src.agents.llm_manager import get_llm_manager
+    from src.agents.workflow import get_workflow
+    from src.knowledge_base.retriever import get_kb_retriever
+
+    warmups = [
+        ("Workflow graph", get_workflow),
+        ("Knowledge base retriever", get_kb_retriever),
+        ("LLM client", get_llm_manager),
+    ]
+    for name, warm in warmups:
+        try:
+            warm()
+            app_logger.info(f"Warmed up: {name}")
+        except Exception as e:
+            app_logger.warning(f"Warmup of {name} failed (continuing): {e}")
+
+    return True
+
+
+# Per-step timeouts in seconds (None: bounded by the step's own retry budget)
+STEP_TIMEOUTS = {
+    "Environment Variables": 5,
+    "Database Connection": None,
+    "Database Initialization": None,
+    "Knowledge Base": 60,
+    "Health Check": 60,  # Includes importing the workflow and API app
+    "Warmup": 180,
+}
+
+
+async def run_step(name, func):
+    """
+    Run a blocking init step in a worker thread with its timeout
+
+    Args:
+        name: Step name (key into STEP_TIMEOUTS)
+        func: Blocking callable returning True/False
+
+    Returns:
+        Step result, False on timeout or error
+    """
+    timeout = STEP_TIMEOUTS.get(name)
+    try:
+        return await asyncio.wait_for(asyncio.to_thread(func), timeout=timeout)
+    except asyncio.TimeoutError:
+        app_logger.error(f"{name} timed out after {timeout} seconds")
+        return False
+    except Exception as e:
+        app_logger.error(f"{name} failed: {e}")
+        return False
+
+
+async def run_initialization():
+    """
+    Run the init steps, overlapping the ones that don't depend on each other
+
+    Returns:
+        List of (step name, success) tuples
+    """
     steps = []
 
-    # Step 1: Verify environment variables
-    app_logger.info("\n[Step 1/5] Verifying environment variables...")
-    env_check = verify_environment_variables()
+    # Steps 1-2: Verify environment variables and check database connection
+    app_logger.info(
+        "\n[Steps 1-2/6] Verifying environment variables and database connection..."
+    )
+    env_check, db_connection = await asyncio.gather(
+        run_step("Environment Variables", verify_environment_variables),
+        run_step("Database Connection", check_database_connection),
+    )
     steps.append(("Environment Variables", env_check))
+    steps.append(("Database Connection", db_connection))
 
     if not env_check:
         app_logger.error("Environment variable verification failed!")
         app_logger.error("Please set required environment variables in Railway dashboard")
         sys.exit(1)
 
-    # Step 2: Check database connection
-    app_logger.info("\n[Step 2/5] Checking database connection...")
-    db_connection = check_database_connection()
-    steps.append(("Database Connection", db_connection))
-
     if not db_connection:
         app_logger.error("Database connection failed!")
         sys.exit(1)
 
-    # Step 3: Initialize database
-    app_logger.info("\n[Step 3/5] Initializing database...")
-    db_init = initialize_database()
+    # Step 3: Initialize database (everything after depends on it)
+    app_logger.info("\n[Step 3/6] Initializing database...")
+    db_init = await run_step("Database Initialization", initialize_database)
     steps.append(("Database Initialization", db_init))
 
     if not db_init:
         app_logger.error("Database initialization failed!")
         sys.exit(1)
 
-    # Step 4: Initialize knowledge base (optional)
-    app_logger.info("\n[Step 4/5] Initializing knowledge base...")
-    kb_init = initialize_knowledge_base()
+    # Steps 4-5: Knowledge base (optional) and health check are independent
+    app_logger.info("\n[Steps 4-5/6] Initializing knowledge base and running health check...")
+    kb_init, health = await asyncio.gather(
+        run_step("Knowledge Base", initialize_knowledge_base),
+        run_step("Health Check", run_health_check),
+    )
     steps.append(("Knowledge Base", kb_init))
     # Don't fail if KB init fails - it's optional
-
-    # Step 5: Run health check
-    app_logger.info("\n[Step 5/5] Running health check...")
-    health = run_health_check()
     steps.append(("Health Check", health))
 
+    # Step 6: Warm up caches once the app is known to be healthy (optional)
+    if health:
+        app_logger.info("\n[Step 6/6] Warming up runtime caches...")
+        steps.append(("Warmup", await run_step("Warmup", warm_up_runtime)))
+
+    return steps
+
+
+def main():
+    """Main initialization flow"""
+    app_logger.info("=" * 60)
+    app_logger.info("RAILWAY INITIALIZATION STARTED")
+    app_logger.info("=" * 60)
+
+    # Track success of each step
+    steps = asyncio.run(run_initialization())
+
     # Summary
     app_logger.info("\n" + "=" * 60)
     app_logger.info("INITIALIZATION SUMMARY")
@@ -0,0 +1,121 @@
+"""
+Shared agent service for Multi-Agent HR Intelligence Platform
+
+Runs one CustomerSupportAgent (embedding model, FAISS index, LLM clients)
+in a long-lived process and lets scripts attach to it instead of loading
+their own copy.
+
+Start the service (requires AGENT_SERVICE_AUTHKEY):
+    python -m src.agent_service
+
+The service unpickles whatever clients send, so it only listens on a Unix
+socket readable by its owner and rejects clients without the authkey.
+"""
+
+import os
+import stat
+from multiprocessing.managers import BaseManager
+
+from src.utils.config import settings
+from src.utils.logger import app_logger
+
+
+class AgentManager(BaseManager):
+    """Client-side manager for connecting to the agent service"""
+
+
+class _AgentServerManager(BaseManager):
+    """Server-side manager that owns the agent instance"""
+
+
+AgentManager.register("get_agent")
+
+# Placeholder shipped in .env.example, never accepted as a real key
+EXAMPLE_AUTHKEY = "change-this-to-a-random-agent-service-key"
+
+
+def _get_address() -> str:
+    """Get the Unix socket path the service listens on"""
+    return os.path.abspath(settings.agent_service_socket)
+
+
+def _get_authkey() -> bytes:
+    """
+    Get the key clients must present to connect
+
+    Raises:
+        RuntimeError: If AGENT_SERVICE_AUTHKEY is unset or the example value
+    """
+    authkey = settings.agent_service_authkey
+    if not authkey or authkey == EXAMPLE_AUTHKEY:
+        raise RuntimeError(
+            "AGENT_SERVICE_AUTHKEY is not set; set it to a random value, "
+            "e.g. python -c 'import secrets; print(secrets.token_hex(32))'"
+        )
+    return authkey.encode("utf-8")
+
+
+def serve() -> None:
+    """Load the agent once and serve it until interrupted"""
+    from src.database import init_db
+    from src.main import get_customer_support_agent
+
+    # Refuse to start before loading anything if the key is missing
+    authkey = _get_authkey()
+    address = _get_address()
+
+    init_db()
+    agent = get_customer_support_agent()
+    agent.load_models()
+
+    _AgentServerManager.register("get_agent", callable=lambda: agent)
+    manager = _AgentServerManager(address=address, authkey=authkey)
+
+    # Remove a socket left behind by a service that did not shut down cleanly
+    if os.path.exists(address) and stat.S_ISSOCK(os.stat(address).st_mode):
+        os.unlink(address)
+
+    # Create the socket owner-only (0600) from the start, not chmod'ed later
+    old_umask = os.umask(0o177)
+    try:
+        server = manager.get_server()
+    finally:
+        os.umask(old_umask)
+    os.chmod(address, 0o600)
+
+    app_logger.info("Agent service listening on {}", address)
+    try:
+        server.serve_forever()
+    finally:
+        agent.shutdown()
+        if os.path.exists(address):
+            os.unlink(address)
+
+
+def get_agent_client():
+    """
+    Get a handle to the shared agent
+
+    Connects to a running agent service; if none is reachable (or no
+    AGENT_SERVICE_AUTHKEY is configured), falls back to the in-process
+    agent singleton.
+
+    Returns:
+        Proxy (or local instance) exposing ``process_query`` and
+        ``get_conversation_history``
+    """
+    try:
+        manager = AgentManager(address=_get_address(), authkey=_get_authkey())
+        manager.connect()
+    except (OSError, RuntimeError):
+        from src.main import get_customer_support_agent
+
+        app_logger.info("Agent service not running, loading agent in-process")
+        return get_customer_support_agent()
+
+    app_logger.info("Connected to shared agent service")
+    return manager.get_agent()
+
+
+if __name__ == "__main__":
+    serve()
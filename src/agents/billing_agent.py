@@ -4,33 +4,50 @@ Billing support response agent
 
 from langchain_core.prompts import ChatPromptTemplate
 
-from src.agents.state import AgentState
+from src.agents.context_builder import (
+    build_history_context,
+    build_kb_context,
+    get_word_budget,
+    word_budget_to_max_tokens,
+)
+from src.agents.exceptions import AgentTransientError
+from src.agents.state import AgentState, get_query_preview
 from src.agents.llm_manager import get_llm_manager
+from src.utils.helpers import compile_keyword_pattern
 from src.utils.logger import app_logger
 
 
+# Queries mentioning these may need escalation (compiled once, single pass)
+ESCALATION_PATTERN = compile_keyword_pattern(
+    ["refund", "dispute", "chargeback", "cancel subscription"]
+)
+
+
 # Billing support prompt
 BILLING_PROMPT = ChatPromptTemplate.from_template(
     """You are an expert billing and payment support agent with knowledge of invoices, subscriptions, refunds, and payment systems.
 
+Instructions:
+1. Address billing concerns clearly and accurately
+2. Explain charges, payment processes, or refund policies
+3. If sentiment is negative, show empathy and apologize for inconvenience
+4. Provide specific next steps for resolution
+5. Reference relevant policies when appropriate
+6. Escalate for refund requests or disputes if needed
+7. Keep response professional and concise, within the response length given below
+
+---
+
 Customer Query: {query}
 
 Customer Sentiment: {sentiment}
 Priority Level: {priority}
+Response Length: {word_budget} words
 
 {context}
 
 {kb_context}
 
-Instructions:
-1. Address billing concerns clearly and accurately
-2. Explain charges, payment processes, or refund policies
-3. If sentiment is negative, show empathy and apologize for inconvenience
-4. Provide specific next steps for resolution
-5. Reference relevant policies when appropriate
-6. Escalate for refund requests or disputes if needed
-7. Keep response professional and concise (200-300 words)
-
 Response:"""
 )
 
@@ -44,61 +61,64 @@ def handle_billing(state: AgentState) -> AgentState:
 
     Returns:
         Updated state with response
+
+    Raises:
+        AgentFatalError: On LLM errors that a fallback response would hide
     """
-    app_logger.info(f"Generating billing response for: {state['query'][:50]}...")
+    query = state["query"]
+    history = state.get("conversation_history")
+    kb_results = state.get("kb_results")
+
+    app_logger.info("Generating billing response for: {}", get_query_preview(state))
 
     try:
         llm_manager = get_llm_manager()
 
-        # Prepare conversation context
-        context = ""
-        if state.get("conversation_history"):
-            context = "Previous conversation:\n"
-            for msg in state["conversation_history"][-5:]:
-                context += f"{msg['role'].capitalize()}: {msg['content']}\n"
-            context += "\n"
-
-        # Prepare knowledge base context
-        kb_context = ""
-        if state.get("kb_results"):
-            kb_context = "Relevant billing policies:\n"
-            for i, kb in enumerate(state["kb_results"][:2], 1):
-                kb_context += (
-                    f"{i}. {kb.get('title', 'N/A')}: {kb.get('content', '')[:200]}...\n"
-                )
-            kb_context += "\n"
+        # Prepare conversation and knowledge base context
+        context = build_history_context(history, summary=state.get("history_summary"))
+        kb_context = build_kb_context(kb_results, "Relevant billing policies")
+        word_budget = get_word_budget(state, "200-300")
+        max_tokens = word_budget_to_max_tokens(word_budget)
+
+        prompt_input = {
+            "query": query,
+            "sentiment": state.get("sentiment", "Neutral"),
+            "priority": state.get("priority_score", 5),
+            "word_budget": word_budget,
+            "context": context,
+            "kb_context": kb_context,
+        }
+
+        # Check if refund/dispute mentioned - may need escalation
+        if ESCALATION_PATTERN.search(query):
+            state["extra_metadata"] = {
+                **(state.get("extra_metadata") or {}),
+                "may_need_escalation": True,
+            }
+
+        if state.get("stream"):
+            # Hand the caller a token stream instead of waiting for the full text
+            state["response_stream"] = llm_manager.stream_with_retry(
+                BILLING_PROMPT, prompt_input, max_tokens=max_tokens
+            )
+            state["next_action"] = "complete"
+            app_logger.info("Billing response stream started")
+            return state
 
         # Invoke LLM
         response = llm_manager.invoke_with_retry(
-            BILLING_PROMPT,
-            {
-                "query": state["query"],
-                "sentiment": state.get("sentiment", "Neutral"),
-                "priority": state.get("priority_score", 5),
-                "context": context,
-                "kb_context": kb_context,
-            },
+            BILLING_PROMPT, prompt_input, max_tokens=max_tokens
         )
 
         app_logger.info("Billing response generated successfully")
 
-        # Check if refund/dispute mentioned - may need escalation
-        query_lower = state["query"].lower()
-        if any(
-            word in query_lower
-            for word in ["refund", "dispute", "chargeback", "cancel subscription"]
-        ):
-            if not state.get("extra_metadata"):
-                state["extra_metadata"] = {}
-            state["extra_metadata"]["may_need_escalation"] = True
-
         # Update state
         state["response"] = response
         state["next_action"] = "complete"
 
         return state
 
-    except Exception as e:
+    except AgentTransientError as e:
         app_logger.error(f"Error in handle_billing: {e}")
         state["response"] = (
             "I apologize for the inconvenience. For billing matters, please contact our billing department directly for immediate assistance."
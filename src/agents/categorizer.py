@@ -2,14 +2,116 @@
 Query categorization agent
 """
 
+import queue
+import time
+from concurrent.futures import Future
+from threading import Lock, Thread
+from typing import List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage
 from langchain_core.prompts import ChatPromptTemplate
 
-from src.agents.state import AgentState
-from src.agents.llm_manager import get_llm_manager
-from src.utils.helpers import parse_llm_category
+from src.agents.exceptions import AgentTransientError, to_agent_error
+from src.agents.state import AgentState, get_query_preview, recent_messages
+from src.agents.llm_manager import format_prompt, get_llm_manager
+from src.utils.config import settings
+from src.utils.helpers import compile_keyword_pattern, parse_llm_category
 from src.utils.logger import app_logger
 
 
+# Unambiguous category keywords, checked before calling the LLM
+CATEGORY_KEYWORDS = {
+    "Payroll": [
+        "W-2",
+        "W2",
+        "paycheck",
+        "pay stub",
+        "payslip",
+        "pay slip",
+        "payroll",
+        "direct deposit",
+        "tax withholding",
+    ],
+    "Benefits": [
+        "401(k)",
+        "401k",
+        "health insurance",
+        "dental insurance",
+        "life insurance",
+        "open enrollment",
+        "HSA",
+        "FSA",
+        "PTO accrual",
+    ],
+    "LeaveManagement": [
+        "PTO",
+        "FMLA",
+        "sick leave",
+        "bereavement leave",
+        "jury duty",
+        "leave of absence",
+        "sabbatical",
+        "time-off balance",
+    ],
+    "Recruitment": [
+        "job application",
+        "job opening",
+        "offer letter",
+        "interview",
+        "visa sponsorship",
+        "candidate referral",
+    ],
+    "Performance": [
+        "performance review",
+        "PIP",
+        "performance improvement plan",
+        "promotion",
+        "mentorship",
+    ],
+    "Policy": [
+        "employee handbook",
+        "dress code",
+        "code of conduct",
+        "remote work policy",
+        "expense report",
+    ],
+}
+
+# Keyword (lowercase, single-spaced) -> category
+_KEYWORD_CATEGORIES = {
+    " ".join(keyword.lower().split()): category
+    for category, keywords in CATEGORY_KEYWORDS.items()
+    for keyword in keywords
+}
+
+# Every category's keywords in one pattern, so a query is scanned once
+CATEGORY_HINT_PATTERN = compile_keyword_pattern(_KEYWORD_CATEGORIES, whole_words=True)
+
+
+def match_category_hint(query: str) -> Optional[str]:
+    """
+    Categorize a query from keywords alone
+
+    Where keywords overlap (e.g. "PTO accrual" and "PTO"), the longer,
+    more specific one decides.
+
+    Args:
+        query: User query
+
+    Returns:
+        Category if exactly one category's keywords match, otherwise None
+        (no match or ambiguous - leave it to the LLM)
+    """
+    found = None
+    for match in CATEGORY_HINT_PATTERN.finditer(query):
+        category = _KEYWORD_CATEGORIES[" ".join(match.group().lower().split())]
+        if found is None:
+            found = category
+        elif category != found:
+            return None
+    return found
+
+
 # Categorization prompt - HR Domain
 CATEGORIZATION_PROMPT = ChatPromptTemplate.from_template(
     """You are an expert HR query classifier for employee support.
@@ -24,15 +126,148 @@ Categorize the following employee query into ONE of these categories:
 - Performance: Performance reviews, annual goals, promotions, feedback, professional development, PIPs, career growth, mentorship, training
 - General: General HR inquiries, employee portal access, HR contacts, onboarding process, company information, miscellaneous HR questions
 
+Respond with ONLY the category name (Recruitment, Payroll, Benefits, Policy, LeaveManagement, Performance, or General).
+
+---
+
 Query: {query}
 
 {context}
 
-Respond with ONLY the category name (Recruitment, Payroll, Benefits, Policy, LeaveManagement, Performance, or General).
 Category:"""
 )
 
 
+class CategorizerBatcher:
+    """
+    Coalesce concurrent categorization requests into one LLM batch call
+
+    Callers block on a future while a background thread collects up to
+    ``max_batch`` prompts, or waits at most ``max_wait`` seconds after the
+    first one, then sends them in a single batch and hands each response
+    back in order.
+    """
+
+    def __init__(self, max_batch: int = 16, max_wait: float = 0.025):
+        """
+        Initialize the batcher
+
+        Args:
+            max_batch: Maximum number of prompts per batch call
+            max_wait: Maximum time in seconds to wait for a batch to fill
+        """
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[Tuple[List[BaseMessage], Future]]" = queue.Queue()
+        self._worker: Optional[Thread] = None
+        self._lock = Lock()
+
+    def submit(self, messages: List[BaseMessage]) -> str:
+        """
+        Queue a formatted categorization prompt and wait for its response
+
+        Args:
+            messages: Formatted chat messages
+
+        Returns:
+            Raw LLM response
+
+        Raises:
+            Exception: The error the prompt failed with in the batch call
+        """
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((messages, future))
+        return future.result()
+
+    def _ensure_worker(self) -> None:
+        """Start the background batching thread on first use"""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = Thread(
+                    target=self._run, name="categorizer-batcher", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        """Collect queued prompts into batches and dispatch them"""
+        while True:
+            pending = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+
+            while len(pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    pending.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._dispatch(pending)
+
+    def _dispatch(self, pending: List[Tuple[List[BaseMessage], Future]]) -> None:
+        """Send one batch and resolve each caller's future"""
+        try:
+            responses = get_llm_manager().batch_formatted(
+                [messages for messages, _ in pending]
+            )
+        except Exception as e:
+            responses = [to_agent_error(e)] * len(pending)
+
+        if len(pending) > 1:
+            app_logger.debug("Categorized {} queries in one batch", len(pending))
+
+        for (_, future), response in zip(pending, responses):
+            if isinstance(response, Exception):
+                future.set_exception(response)
+            else:
+                future.set_result(response)
+
+
+# Global batcher instance
+_batcher: Optional[CategorizerBatcher] = None
+_batcher_lock = Lock()
+
+
+def get_categorizer_batcher() -> CategorizerBatcher:
+    """Get or create categorizer batcher singleton"""
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = CategorizerBatcher(
+                max_batch=settings.categorizer_batch_size,
+                max_wait=settings.categorizer_batch_wait_ms / 1000,
+            )
+    return _batcher
+
+
+def classify_with_llm(query: str, context: str) -> str:
+    """
+    Ask the LLM for a raw category, batched with concurrent requests
+
+    Args:
+        query: User query
+        context: Formatted conversation context
+
+    Returns:
+        Raw LLM response
+    """
+    llm_manager = get_llm_manager()
+    input_data = {"query": query, "context": context}
+
+    if settings.categorizer_batch_size <= 1:
+        return llm_manager.invoke_with_retry(CATEGORIZATION_PROMPT, input_data)
+
+    messages = format_prompt(CATEGORIZATION_PROMPT, input_data)
+    try:
+        return get_categorizer_batcher().submit(messages).strip()
+    except AgentTransientError as e:
+        # Retry on its own with the usual backoff
+        app_logger.warning(f"Batched categorization failed, retrying alone: {e}")
+        return llm_manager.invoke_formatted(messages)
+
+
 def categorize_query(state: AgentState) -> AgentState:
     """
     Categorize customer query
@@ -42,40 +277,56 @@ def categorize_query(state: AgentState) -> AgentState:
 
     Returns:
         Updated state with category
+
+    Raises:
+        AgentFatalError: On LLM errors that a fallback response would hide
     """
-    app_logger.info(f"Categorizing query: {state['query'][:50]}...")
+    query = state["query"]
+    history = state.get("conversation_history")
+    # Copied, since analyze_sentiment updates the same dict in parallel
+    metadata = dict(state.get("extra_metadata") or {})
 
-    try:
-        llm_manager = get_llm_manager()
+    app_logger.info("Categorizing query: {}", get_query_preview(state))
 
+    # Fast path: obvious keywords skip the LLM round-trip
+    hinted_category = match_category_hint(query)
+    if hinted_category:
+        app_logger.info("Query categorized as: {} (keyword match)", hinted_category)
+        state["category"] = hinted_category
+        metadata["category_source"] = "fastpath"
+        state["extra_metadata"] = metadata
+        return state
+
+    try:
         # Prepare context
         context = ""
-        if state.get("conversation_history"):
-            context = "Previous conversation context:\n"
-            for msg in state["conversation_history"][-3:]:
-                context += f"{msg['role']}: {msg['content'][:100]}\n"
+        if history:
+            parts = ["Previous conversation context:"]
+            parts.extend(
+                f"{msg['role']}: {msg['content'][:100]}"
+                for msg in recent_messages(history, 3)
+            )
+            context = "\n".join(parts) + "\n"
 
         # Invoke LLM
-        raw_category = llm_manager.invoke_with_retry(
-            CATEGORIZATION_PROMPT, {"query": state["query"], "context": context}
-        )
+        raw_category = classify_with_llm(query, context)
 
         # Parse and standardize category
         category = parse_llm_category(raw_category)
 
-        app_logger.info(f"Query categorized as: {category}")
+        app_logger.info("Query categorized as: {}", category)
 
         # Update state
         state["category"] = category
 
         # Update metadata
-        if not state.get("extra_metadata"):
-            state["extra_metadata"] = {}
-        state["extra_metadata"]["raw_category"] = raw_category
+        metadata["raw_category"] = raw_category
+        metadata["category_source"] = "llm"
+        state["extra_metadata"] = metadata
 
         return state
 
-    except Exception as e:
+    except AgentTransientError as e:
         app_logger.error(f"Error in categorize_query: {e}")
         # Fallback to General category
         state["category"] = "General"
@@ -0,0 +1,144 @@
+"""
+Prompt context builders shared by the response agents
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.agents.state import AgentState, HISTORY_WINDOW, format_recent_messages
+from src.utils.config import settings
+
+# Characters of each KB article's content shown in response prompts
+KB_PREVIEW_LENGTH = 200
+
+# KB articles shown in response prompts
+KB_TOP_K = 2
+
+# Word budget for routine answers (calm sentiment, low priority)
+CONCISE_WORD_BUDGET = "80-120"
+
+# Sentiments that get the concise budget when priority is low
+CONCISE_SENTIMENTS = {"Positive", "Neutral"}
+CONCISE_MAX_PRIORITY = 4
+
+# Output tokens allowed per budgeted word, plus headroom for formatting
+TOKENS_PER_WORD = 1.5
+TOKEN_HEADROOM = 50
+
+
+def build_history_context(
+    history: Optional[Sequence[Dict[str, str]]],
+    limit: int = HISTORY_WINDOW,
+    summary: Optional[str] = None,
+) -> str:
+    """
+    Format recent conversation messages for a response prompt
+
+    Args:
+        history: Conversation history messages
+        limit: Number of most recent messages to include
+        summary: Summary of the older messages; if given, only the
+            latest settings.history_recent_messages are included verbatim
+
+    Returns:
+        Formatted context block, or an empty string without history
+    """
+    if not history:
+        return ""
+
+    if summary:
+        limit = settings.history_recent_messages
+        parts = [f"Summary of earlier conversation: {summary}", "Recent messages:"]
+    else:
+        parts = ["Previous conversation:"]
+    parts.extend(format_recent_messages(history, limit))
+    return "\n".join(parts) + "\n\n"
+
+
+def get_content_preview(kb: Dict[str, Any]) -> str:
+    """Get a KB result's prompt preview, precomputed at retrieval if possible"""
+    preview = kb.get("content_preview")
+    if preview is None:
+        preview = kb.get("content", "")[:KB_PREVIEW_LENGTH]
+    return preview
+
+
+def build_kb_context(
+    kb_results: Optional[List[Dict[str, Any]]], header: str, limit: int = KB_TOP_K
+) -> str:
+    """
+    Format the top knowledge base results for a response prompt
+
+    Args:
+        kb_results: Retrieved KB articles
+        header: Heading line for the block (without colon)
+        limit: Number of articles to include
+
+    Returns:
+        Formatted context block, or an empty string without results
+    """
+    if not kb_results:
+        return ""
+
+    parts = [f"{header}:"]
+    parts.extend(
+        f"{i}. {kb.get('title', 'N/A')}: {get_content_preview(kb)}..."
+        for i, kb in enumerate(kb_results[:limit], 1)
+    )
+    return "\n".join(parts) + "\n\n"
+
+
+def build_contexts(state: AgentState, kb_header: str) -> Tuple[str, str]:
+    """
+    Build the conversation and knowledge base context blocks for a prompt
+
+    Args:
+        state: Current agent state
+        kb_header: Heading line for the knowledge base block
+
+    Returns:
+        Tuple of (conversation context, knowledge base context)
+    """
+    return (
+        build_history_context(
+            state.get("conversation_history"), summary=state.get("history_summary")
+        ),
+        build_kb_context(state.get("kb_results"), kb_header),
+    )
+
+
+def get_word_budget(state: AgentState, full_budget: str) -> str:
+    """
+    Choose the response length for a query
+
+    Routine queries (positive or neutral, low priority) get a short answer;
+    upset or high-priority employees get the agent's full-length response.
+
+    Args:
+        state: Current agent state (sentiment and priority already set)
+        full_budget: The agent's full word budget, e.g. "200-300"
+
+    Returns:
+        Word budget range, e.g. "80-120"
+    """
+    if (
+        state.get("sentiment", "Neutral") in CONCISE_SENTIMENTS
+        and state.get("priority_score", 5) <= CONCISE_MAX_PRIORITY
+    ):
+        return CONCISE_WORD_BUDGET
+    return full_budget
+
+
+def word_budget_to_max_tokens(word_budget: str) -> int:
+    """
+    Convert a word budget to an output token limit
+
+    Args:
+        word_budget: Word budget range, e.g. "80-120"
+
+    Returns:
+        Output token limit, capped at settings.llm_max_tokens
+    """
+    max_words = int(word_budget.rsplit("-", 1)[-1])
+    return min(
+        int(max_words * TOKENS_PER_WORD) + TOKEN_HEADROOM, settings.llm_max_tokens
+    )
@@ -0,0 +1,57 @@
+"""
+Agent exceptions
+"""
+
+import groq
+
+
+class AgentError(Exception):
+    """Base class for errors raised by the agent layer"""
+
+
+class AgentTransientError(AgentError):
+    """Temporary failure (rate limit, network, timeout, server error)"""
+
+
+class AgentFatalError(AgentError):
+    """Failure that will not go away on retry (bad request, auth, prompt bug)"""
+
+
+# LLM client errors worth retrying
+TRANSIENT_LLM_ERRORS = (
+    groq.APIConnectionError,  # Includes APITimeoutError
+    groq.RateLimitError,
+    groq.InternalServerError,
+    TimeoutError,
+    ConnectionError,
+)
+
+
+def is_transient_llm_error(error: Exception) -> bool:
+    """Return True if an LLM call that raised ``error`` may succeed on retry"""
+    if isinstance(error, AgentError):
+        return isinstance(error, AgentTransientError)
+    if isinstance(error, TRANSIENT_LLM_ERRORS):
+        return True
+    return isinstance(error, groq.APIStatusError) and error.status_code >= 500
+
+
+def to_agent_error(error: Exception) -> AgentError:
+    """
+    Wrap an LLM client error in the matching agent error
+
+    Args:
+        error: Exception raised by the LLM call
+
+    Returns:
+        AgentTransientError or AgentFatalError (``error`` itself if it
+        already is an agent error)
+    """
+    if isinstance(error, AgentError):
+        return error
+    error_type = (
+        AgentTransientError if is_transient_llm_error(error) else AgentFatalError
+    )
+    wrapped = error_type(f"{type(error).__name__}: {error}")
+    wrapped.__cause__ = error
+    return wrapped
@@ -0,0 +1,78 @@
+"""
+Conversation history summarizer
+
+Condenses older conversation turns into a short summary so response
+prompts carry the summary plus the latest turns instead of every message.
+"""
+
+from langchain_core.prompts import ChatPromptTemplate
+
+from src.agents.state import AgentState
+from src.agents.llm_manager import get_llm_manager
+from src.utils.config import settings
+from src.utils.logger import app_logger
+
+
+# Characters of each older message passed to the summarizer
+SUMMARY_MESSAGE_LENGTH = 500
+
+
+# History summarization prompt
+SUMMARY_PROMPT = ChatPromptTemplate.from_template(
+    """You summarize HR support conversations for the agent answering the employee's next question.
+
+Summarize the conversation below in one or two sentences.
+Keep facts the agent may need (topics raised, dates, amounts, unresolved issues); drop greetings and filler.
+Respond with ONLY the summary.
+
+---
+
+Conversation:
+{conversation}
+
+Summary:"""
+)
+
+
+async def summarize_history(state: AgentState) -> AgentState:
+    """
+    Summarize conversation turns older than the most recent ones
+
+    Runs alongside categorization and sentiment analysis. It is an extra
+    LLM call: when both of those take their keyword/lexicon fast paths,
+    the escalation check waits on the summary.
+
+    Args:
+        state: Current agent state
+
+    Returns:
+        Updated state with history_summary (None if the history is short
+        or summarization failed, in which case prompts use raw messages)
+    """
+    history = state.get("conversation_history") or ()
+
+    if (
+        not settings.history_summary_enabled
+        or len(history) <= settings.history_summary_min_messages
+    ):
+        state["history_summary"] = None
+        return state
+
+    older = list(history)[: -settings.history_recent_messages]
+    conversation = "\n".join(
+        f"{msg['role'].capitalize()}: {msg['content'][:SUMMARY_MESSAGE_LENGTH]}"
+        for msg in older
+    )
+
+    try:
+        state["history_summary"] = await get_llm_manager().ainvoke_with_retry(
+            SUMMARY_PROMPT,
+            {"conversation": conversation},
+            max_tokens=settings.history_summary_max_tokens,
+        )
+        app_logger.info("Summarized {} older conversation messages", len(older))
+    except Exception as e:
+        app_logger.warning(f"History summarization failed, using raw messages: {e}")
+        state["history_summary"] = None
+
+    return state
@@ -3,11 +3,33 @@ Knowledge Base Retrieval Agent
 Searches knowledge base for relevant FAQs before generating response
 """
 
-from src.agents.state import AgentState
+from src.agents.context_builder import KB_PREVIEW_LENGTH
+from src.agents.state import AgentState, get_query_preview
 from src.knowledge_base.retriever import get_kb_retriever
 from src.utils.logger import app_logger
 
 
+# Number of FAQs handed to the response agents
+KB_RESULT_COUNT = 3
+
+
+def prefetch_query_embedding(state: AgentState) -> AgentState:
+    """
+    Encode the query for KB search while it is still being categorized
+
+    Args:
+        state: Current agent state
+
+    Returns:
+        Unchanged state (on failure, retrieval encodes the query itself)
+    """
+    try:
+        get_kb_retriever().prefetch(state.get("query", ""))
+    except Exception as e:
+        app_logger.warning(f"KB prefetch failed, will encode after categorization: {e}")
+    return state
+
+
 def retrieve_from_kb(state: AgentState) -> AgentState:
     """
     Retrieve relevant FAQs from knowledge base
@@ -22,7 +44,9 @@ def retrieve_from_kb(state: AgentState) -> AgentState:
     category = state.get("category", "General")
 
     app_logger.info(
-        f"Retrieving from KB for category: {category}, query: {query[:50]}..."
+        "Retrieving from KB for category: {}, query: {}",
+        category,
+        get_query_preview(state),
     )
 
     try:
@@ -33,7 +57,7 @@ def retrieve_from_kb(state: AgentState) -> AgentState:
         # Get 3 results, filter by category for better relevance
         results = kb_retriever.retrieve(
             query=query,
-            k=3,
+            k=KB_RESULT_COUNT,
             category=category,  # Filter by detected category
             min_score=0.3,  # Minimum similarity threshold
         )
@@ -41,10 +65,13 @@ def retrieve_from_kb(state: AgentState) -> AgentState:
         # Format results for agents
         kb_results = []
         for result in results:
+            content = result.get("answer", "")
             kb_results.append(
                 {
                     "title": result.get("question", ""),
-                    "content": result.get("answer", ""),
+                    "content": content,
+                    # Sliced once here rather than by every prompt builder
+                    "content_preview": content[:KB_PREVIEW_LENGTH],
                     "category": result.get("category", ""),
                     "score": result.get("similarity_score", 0.0),
                 }
@@ -53,20 +80,21 @@ def retrieve_from_kb(state: AgentState) -> AgentState:
         # Update state
         state["kb_results"] = kb_results
 
-        app_logger.info(f"Retrieved {len(kb_results)} FAQs from knowledge base")
+        app_logger.info("Retrieved {} FAQs from knowledge base", len(kb_results))
 
-        # Log top result if found
+        # Log top result if found (lazy: only evaluated when INFO is enabled)
         if kb_results:
             top_result = kb_results[0]
-            app_logger.info(
-                f"Top result (score: {top_result['score']:.3f}): "
-                f"{top_result['title'][:100]}..."
+            app_logger.opt(lazy=True).info(
+                "Top result (score: {:.3f}): {}...",
+                lambda: top_result["score"],
+                lambda: top_result["title"][:100],
             )
 
         return state
 
     except Exception as e:
-        app_logger.error(f"Error retrieving from knowledge base: {e}", exc_info=True)
+        app_logger.exception(f"Error retrieving from knowledge base: {e}")
         # Don't fail the workflow, just set empty results
         state["kb_results"] = []
         return state
@@ -3,44 +3,244 @@ LLM wrapper and utilities
 """
 
 from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from typing import Optional, Dict, Any
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.prompts import (
+    ChatPromptTemplate,
+    HumanMessagePromptTemplate,
+    PromptTemplate,
+    SystemMessagePromptTemplate,
+)
+from langchain_core.runnables import Runnable
+import httpx
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+import asyncio
+import hashlib
+import importlib.util
 import time
+from string import Formatter
+from threading import Lock
 
+from src.agents.exceptions import AgentFatalError, to_agent_error
 from src.utils.config import settings
 from src.utils.logger import app_logger
+from src.utils.response_cache import ResponseCache
+
+
+# Groq endpoint used when no custom API base is configured
+DEFAULT_GROQ_API_BASE = "https://api.groq.com"
+
+# Seconds to wait for the connection warm-up request
+WARM_UP_TIMEOUT = 5.0
+
+# (literal text, variable name) pairs; the last pair's variable is None
+PromptSegments = List[Tuple[str, Optional[str]]]
+
+# Message templates format_prompt can compile, and the messages they produce
+_COMPILABLE_MESSAGES: Dict[type, Type[BaseMessage]] = {
+    SystemMessagePromptTemplate: SystemMessage,
+    HumanMessagePromptTemplate: HumanMessage,
+}
+
+# Compiled (message class, segments, prerendered message) per prompt message,
+# keyed by id(prompt); None if the prompt can't be compiled. Messages without
+# variables (static instructions) are rendered once and reused as is.
+CompiledPrompt = List[Tuple[Type[BaseMessage], PromptSegments, Optional[BaseMessage]]]
+_compiled_prompts: Dict[int, Tuple[ChatPromptTemplate, Optional[CompiledPrompt]]] = {}
+
+# Model tiers a caller can ask for; "balanced" is settings.llm_model
+MODEL_TIERS = ("fast", "balanced", "strong")
+
+
+def _compile_message(template: PromptTemplate) -> Optional[PromptSegments]:
+    """Split one f-string template into (literal, variable) segments"""
+    if (
+        not isinstance(template, PromptTemplate)
+        or template.template_format != "f-string"
+    ):
+        return None
+
+    segments = []
+    for literal, field, spec, conversion in Formatter().parse(template.template):
+        if field is not None and (not field.isidentifier() or spec or conversion):
+            return None
+        segments.append((literal, field))
+    return segments
+
+
+def _compile_prompt(prompt: ChatPromptTemplate) -> Optional[CompiledPrompt]:
+    """
+    Split the system and human messages of a prompt into segments
+
+    Returns:
+        Message class, segments to render with ``"".join`` and, for
+        messages without variables, the prerendered message; None if the
+        prompt has other message types, format specs or non-f-string
+        templates
+    """
+    compiled = []
+    for message in prompt.messages:
+        message_class = _COMPILABLE_MESSAGES.get(type(message))
+        if message_class is None:
+            return None
+        segments = _compile_message(message.prompt)
+        if segments is None:
+            return None
+        static_message = None
+        if all(field is None for _, field in segments):
+            static_message = message_class(
+                content="".join(literal for literal, _ in segments)
+            )
+        compiled.append((message_class, segments, static_message))
+    return compiled
+
+
+def format_prompt(
+    prompt: ChatPromptTemplate, input_data: Dict[str, Any]
+) -> List[BaseMessage]:
+    """
+    Format a prompt into chat messages
+
+    Prompts made of system and human f-string messages (all of ours) are
+    split into literal and variable segments on first use, so later calls
+    just concatenate strings instead of re-parsing the templates. Static
+    messages, such as the instruction block, are not rendered again at all.
+
+    Args:
+        prompt: Chat prompt template
+        input_data: Input variables for the prompt
+
+    Returns:
+        Formatted chat messages
+
+    Raises:
+        AgentFatalError: If a prompt variable is missing
+    """
+    entry = _compiled_prompts.get(id(prompt))
+    if entry is None or entry[0] is not prompt:
+        entry = (prompt, _compile_prompt(prompt))
+        _compiled_prompts[id(prompt)] = entry
+
+    compiled = entry[1]
+    try:
+        if compiled is None:
+            return prompt.format_messages(**input_data)
+        return [
+            static_message
+            or message_class(
+                content="".join(
+                    literal if field is None else literal + str(input_data[field])
+                    for literal, field in segments
+                )
+            )
+            for message_class, segments, static_message in compiled
+        ]
+    except KeyError as e:
+        raise AgentFatalError(f"Missing prompt variable: {e}") from e
+
+
+def get_tier_model(tier: Optional[str] = None) -> str:
+    """
+    Get the model name for a tier
+
+    Args:
+        tier: One of MODEL_TIERS (None: "balanced")
+
+    Returns:
+        Groq model name (always settings.llm_model with tiers disabled)
+    """
+    if not settings.llm_model_tiers_enabled:
+        return settings.llm_model
+    if tier == "fast":
+        return settings.llm_fast_model
+    if tier == "strong":
+        return settings.llm_strong_model
+    return settings.llm_model
 
 
 class LLMManager:
     """Manages LLM initialization and interactions"""
 
+    # Responses to identical formatted prompts (None: caching disabled)
+    response_cache: Optional[ResponseCache] = None
+
     def __init__(self):
         """Initialize LLM"""
         self.llm = self._initialize_llm()
-        self.parser = StrOutputParser()
+        # Models bound to another model name and/or a per-call output token
+        # limit, keyed by (model name, limit). Prompts are formatted with
+        # format_prompt and the model is called directly; the reply text is
+        # read from message.content, no parser.
+        self._bound_models: Dict[Tuple[Optional[str], Optional[int]], Runnable] = {}
+
+        if settings.llm_response_cache_enabled:
+            self.response_cache = ResponseCache(
+                max_size=settings.llm_response_cache_max_size,
+                ttl_seconds=settings.llm_response_cache_ttl_seconds,
+            )
 
     def _initialize_llm(self) -> ChatGroq:
         """Initialize the Groq LLM"""
         try:
+            http_client, http_async_client = self._create_http_clients()
             llm = ChatGroq(
                 temperature=settings.llm_temperature,
                 groq_api_key=settings.groq_api_key,
                 model_name=settings.llm_model,
                 max_tokens=settings.llm_max_tokens,
+                # Without this the Groq client would wait on a request forever
+                request_timeout=http_client.timeout,
+                http_client=http_client,
+                http_async_client=http_async_client,
             )
-            app_logger.info(f"LLM initialized: {settings.llm_model}")
+            app_logger.info("LLM initialized: {}", settings.llm_model)
             return llm
         except Exception as e:
             app_logger.error(f"Error initializing LLM: {e}")
             raise
 
+    @staticmethod
+    def _create_http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+        """
+        Create the pooled HTTP clients shared by every LLM call
+
+        Concurrent requests reuse kept-alive connections (multiplexed as
+        HTTP/2 streams when h2 is installed) instead of each paying for
+        its own TCP and TLS handshake.
+
+        Returns:
+            Tuple of (sync client, async client)
+        """
+        limits = httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+        )
+        timeout = httpx.Timeout(
+            settings.llm_request_timeout, connect=settings.llm_connect_timeout
+        )
+        http2 = settings.llm_http2 and importlib.util.find_spec("h2") is not None
+        return (
+            httpx.Client(limits=limits, timeout=timeout, http2=http2),
+            httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2),
+        )
+
     def invoke_with_retry(
         self,
         prompt: ChatPromptTemplate,
         input_data: Dict[str, Any],
         max_retries: int = 3,
         retry_delay: float = 1.0,
+        max_tokens: Optional[int] = None,
+        tier: Optional[str] = None,
     ) -> str:
         """
         Invoke LLM with retry logic
@@ -50,25 +250,405 @@ class LLMManager:
             input_data: Input variables for the prompt
             max_retries: Maximum number of retry attempts
             retry_delay: Delay between retries in seconds
+            max_tokens: Output token limit (default: settings.llm_max_tokens)
+            tier: Model tier, one of MODEL_TIERS (default: "balanced")
+
+        Returns:
+            LLM response as string
+
+        Raises:
+            AgentTransientError: If every attempt failed with a temporary error
+            AgentFatalError: On errors that retrying can't fix
+        """
+        return self.invoke_formatted(
+            self._format(prompt, input_data), max_retries, retry_delay, max_tokens, tier
+        )
+
+    def _get_model(
+        self, max_tokens: Optional[int] = None, model_name: Optional[str] = None
+    ) -> Runnable:
+        """
+        Get the model for an output token limit and model name
+
+        The default model (settings.llm_model, default token limit) is the
+        LLM itself; others share its HTTP clients through bound arguments.
+        """
+        if model_name == settings.llm_model:
+            model_name = None
+        if max_tokens is None and model_name is None:
+            return self.llm
+
+        key = (model_name, max_tokens)
+        model = self._bound_models.get(key)
+        if model is None:
+            kwargs: Dict[str, Any] = {}
+            if model_name is not None:
+                kwargs["model"] = model_name
+            if max_tokens is not None:
+                kwargs["max_tokens"] = max_tokens
+            model = self.llm.bind(**kwargs)
+            self._bound_models[key] = model
+        return model
+
+    @staticmethod
+    def _cache_key(
+        messages: List[BaseMessage],
+        max_tokens: Optional[int] = None,
+        model_name: Optional[str] = None,
+    ) -> bytes:
+        """Digest of the formatted messages, used as the response cache key"""
+        digest = hashlib.blake2b(digest_size=16)
+        model_name = model_name or settings.llm_model
+        digest.update(f"{model_name}|{max_tokens}".encode("utf-8"))
+        for message in messages:
+            digest.update(message.type.encode("utf-8"))
+            digest.update(b"\0")
+            digest.update(str(message.content).encode("utf-8"))
+            digest.update(b"\0")
+        return digest.digest()
+
+    @staticmethod
+    def _format(
+        prompt: ChatPromptTemplate, input_data: Dict[str, Any]
+    ) -> List[BaseMessage]:
+        """Format a prompt, reporting missing variables as fatal"""
+        return format_prompt(prompt, input_data)
+
+    def invoke_formatted(
+        self,
+        messages: List[BaseMessage],
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+        max_tokens: Optional[int] = None,
+        tier: Optional[str] = None,
+    ) -> str:
+        """
+        Invoke LLM on already formatted messages, with retry logic
+
+        Args:
+            messages: Chat messages, e.g. from ``format_prompt(...)``
+            max_retries: Maximum number of retry attempts
+            retry_delay: Delay between retries in seconds
+            max_tokens: Output token limit (default: settings.llm_max_tokens)
+            tier: Model tier, one of MODEL_TIERS (default: "balanced")
 
         Returns:
             LLM response as string
+
+        Raises:
+            AgentTransientError: If every attempt failed with a temporary error
+            AgentFatalError: On errors that retrying can't fix
         """
-        chain = prompt | self.llm | self.parser
+        model_name = get_tier_model(tier)
+        model = self._get_model(max_tokens, model_name)
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = self._cache_key(messages, max_tokens, model_name)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
 
         for attempt in range(max_retries):
             try:
-                response = chain.invoke(input_data)
-                return response.strip()
+                response = model.invoke(messages).content.strip()
+                if cache_key is not None:
+                    self.response_cache.put(cache_key, response)
+                return response
 
             except Exception as e:
+                error = to_agent_error(e)
+                if isinstance(error, AgentFatalError):
+                    app_logger.error(f"LLM invocation failed, not retrying: {e}")
+                    raise error
+
                 app_logger.warning(f"LLM invocation attempt {attempt + 1} failed: {e}")
 
                 if attempt < max_retries - 1:
                     time.sleep(retry_delay * (attempt + 1))  # Exponential backoff
                 else:
                     app_logger.error(f"All LLM invocation attempts failed: {e}")
-                    raise
+                    raise error
+
+    async def ainvoke_with_retry(
+        self,
+        prompt: ChatPromptTemplate,
+        input_data: Dict[str, Any],
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+        max_tokens: Optional[int] = None,
+        tier: Optional[str] = None,
+    ) -> str:
+        """
+        Async version of ``invoke_with_retry``
+
+        Awaits the model call instead of blocking, so the event loop keeps
+        serving other requests while the LLM responds.
+
+        Args:
+            prompt: Chat prompt template
+            input_data: Input variables for the prompt
+            max_retries: Maximum number of retry attempts
+            retry_delay: Delay between retries in seconds
+            max_tokens: Output token limit (default: settings.llm_max_tokens)
+            tier: Model tier, one of MODEL_TIERS (default: "balanced")
+
+        Returns:
+            LLM response as string
+
+        Raises:
+            AgentTransientError: If every attempt failed with a temporary error
+            AgentFatalError: On errors that retrying can't fix
+        """
+        return await self.ainvoke_formatted(
+            self._format(prompt, input_data), max_retries, retry_delay, max_tokens, tier
+        )
+
+    async def ainvoke_formatted(
+        self,
+        messages: List[BaseMessage],
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+        max_tokens: Optional[int] = None,
+        tier: Optional[str] = None,
+    ) -> str:
+        """
+        Async version of ``invoke_formatted``
+
+        Args:
+            messages: Chat messages, e.g. from ``format_prompt(...)``
+            max_retries: Maximum number of retry attempts
+            retry_delay: Delay between retries in seconds
+            max_tokens: Output token limit (default: settings.llm_max_tokens)
+            tier: Model tier, one of MODEL_TIERS (default: "balanced")
+
+        Returns:
+            LLM response as string
+
+        Raises:
+            AgentTransientError: If every attempt failed with a temporary error
+            AgentFatalError: On errors that retrying can't fix
+        """
+        model_name = get_tier_model(tier)
+        model = self._get_model(max_tokens, model_name)
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = self._cache_key(messages, max_tokens, model_name)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        for attempt in range(max_retries):
+            try:
+                response = (await model.ainvoke(messages)).content.strip()
+                if cache_key is not None:
+                    self.response_cache.put(cache_key, response)
+                return response
+
+            except Exception as e:
+                error = to_agent_error(e)
+                if isinstance(error, AgentFatalError):
+                    app_logger.error(f"LLM invocation failed, not retrying: {e}")
+                    raise error
+
+                app_logger.warning(f"LLM invocation attempt {attempt + 1} failed: {e}")
+
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(retry_delay * (attempt + 1))
+                else:
+                    app_logger.error(f"All LLM invocation attempts failed: {e}")
+                    raise error
+
+    def batch_formatted(
+        self, messages_batch: List[List[BaseMessage]]
+    ) -> List[Union[str, Exception]]:
+        """
+        Invoke LLM on several formatted prompts in one batch call
+
+        Args:
+            messages_batch: One list of chat messages per prompt
+
+        Returns:
+            Response string per prompt, or the agent error it failed with
+        """
+        results: List[Union[str, Exception, None]] = [None] * len(messages_batch)
+        keys: List[Optional[bytes]] = [None] * len(messages_batch)
+
+        # Serve cached prompts, send only the rest
+        if self.response_cache is not None:
+            for i, messages in enumerate(messages_batch):
+                keys[i] = self._cache_key(messages)
+                results[i] = self.response_cache.get(keys[i])
+        pending = [i for i, result in enumerate(results) if result is None]
+
+        if pending:
+            responses = self.llm.batch(
+                [messages_batch[i] for i in pending], return_exceptions=True
+            )
+            for i, response in zip(pending, responses):
+                if isinstance(response, Exception):
+                    results[i] = to_agent_error(response)
+                    continue
+                results[i] = response.content.strip()
+                if keys[i] is not None:
+                    self.response_cache.put(keys[i], results[i])
+
+        return results
+
+    def stream_with_retry(
+        self,
+        prompt: ChatPromptTemplate,
+        input_data: Dict[str, Any],
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+        max_tokens: Optional[int] = None,
+        tier: Optional[str] = None,
+    ) -> Iterator[str]:
+        """
+        Stream LLM output chunk by chunk, with retry logic
+
+        Failures before the first chunk are retried like invoke_with_retry;
+        once output has been yielded an error is raised to the caller, since
+        the partial response can't be taken back.
+
+        Args:
+            prompt: Chat prompt template
+            input_data: Input variables for the prompt
+            max_retries: Maximum number of retry attempts
+            retry_delay: Delay between retries in seconds
+            max_tokens: Output token limit (default: settings.llm_max_tokens)
+            tier: Model tier, one of MODEL_TIERS (default: "balanced")
+
+        Yields:
+            Response text chunks
+
+        Raises:
+            AgentTransientError: If every attempt failed with a temporary error
+            AgentFatalError: On errors that retrying can't fix
+        """
+        messages = self._format(prompt, input_data)
+        model = self._get_model(max_tokens, get_tier_model(tier))
+
+        for attempt in range(max_retries):
+            started = False
+            try:
+                for chunk in model.stream(messages):
+                    if chunk.content:
+                        started = True
+                        yield chunk.content
+                return
+
+            except Exception as e:
+                error = to_agent_error(e)
+                if started:
+                    app_logger.error(f"LLM stream failed mid-response: {e}")
+                    raise error
+                if isinstance(error, AgentFatalError):
+                    app_logger.error(f"LLM stream failed, not retrying: {e}")
+                    raise error
+
+                app_logger.warning(f"LLM stream attempt {attempt + 1} failed: {e}")
+
+                if attempt < max_retries - 1:
+                    time.sleep(retry_delay * (attempt + 1))
+                else:
+                    app_logger.error(f"All LLM stream attempts failed: {e}")
+                    raise error
+
+    async def astream_with_retry(
+        self,
+        prompt: ChatPromptTemplate,
+        input_data: Dict[str, Any],
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+        max_tokens: Optional[int] = None,
+        tier: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Async version of ``stream_with_retry``
+
+        Args:
+            prompt: Chat prompt template
+            input_data: Input variables for the prompt
+            max_retries: Maximum number of retry attempts
+            retry_delay: Delay between retries in seconds
+            max_tokens: Output token limit (default: settings.llm_max_tokens)
+            tier: Model tier, one of MODEL_TIERS (default: "balanced")
+
+        Yields:
+            Response text chunks
+
+        Raises:
+            AgentTransientError: If every attempt failed with a temporary error
+            AgentFatalError: On errors that retrying can't fix
+        """
+        messages = self._format(prompt, input_data)
+        model = self._get_model(max_tokens, get_tier_model(tier))
+
+        for attempt in range(max_retries):
+            started = False
+            try:
+                async for chunk in model.astream(messages):
+                    if chunk.content:
+                        started = True
+                        yield chunk.content
+                return
+
+            except Exception as e:
+                error = to_agent_error(e)
+                if started:
+                    app_logger.error(f"LLM stream failed mid-response: {e}")
+                    raise error
+                if isinstance(error, AgentFatalError):
+                    app_logger.error(f"LLM stream failed, not retrying: {e}")
+                    raise error
+
+                app_logger.warning(f"LLM stream attempt {attempt + 1} failed: {e}")
+
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(retry_delay * (attempt + 1))
+                else:
+                    app_logger.error(f"All LLM stream attempts failed: {e}")
+                    raise error
+
+    def _warm_up_url(self) -> str:
+        """URL requested to open a connection to the LLM API"""
+        return self.llm.groq_api_base or DEFAULT_GROQ_API_BASE
+
+    def warm_up(self) -> None:
+        """
+        Open a pooled connection to the LLM API before the first query
+
+        Sends a bare HEAD request (no tokens spent) so the TCP and TLS
+        handshakes are done at startup. Failures are only logged.
+        """
+        try:
+            self.llm.http_client.head(self._warm_up_url(), timeout=WARM_UP_TIMEOUT)
+            app_logger.info("LLM connection pool warmed up")
+        except Exception as e:
+            app_logger.warning(f"LLM connection warm-up failed: {e}")
+
+    async def awarm_up(self) -> None:
+        """Async version of ``warm_up``, for the async client's pool"""
+        try:
+            await self.llm.http_async_client.head(
+                self._warm_up_url(), timeout=WARM_UP_TIMEOUT
+            )
+            app_logger.info("Async LLM connection pool warmed up")
+        except Exception as e:
+            app_logger.warning(f"Async LLM connection warm-up failed: {e}")
+
+    def close(self) -> None:
+        """Close the pooled sync HTTP client"""
+        self.llm.http_client.close()
+
+    async def aclose(self) -> None:
+        """
+        Close the pooled async HTTP client
+
+        Must run on the event loop that used the client, since its
+        connections are bound to that loop.
+        """
+        await self.llm.http_async_client.aclose()
 
     def get_llm(self) -> ChatGroq:
         """Get the LLM instance"""
@@ -77,11 +657,15 @@ class LLMManager:
 
 # Global LLM manager instance
 _llm_manager: Optional[LLMManager] = None
+_llm_manager_lock = Lock()
 
 
 def get_llm_manager() -> LLMManager:
     """Get or create LLM manager singleton"""
     global _llm_manager
     if _llm_manager is None:
-        _llm_manager = LLMManager()
+        # Concurrent first requests must not each build a client and pool
+        with _llm_manager_lock:
+            if _llm_manager is None:
+                _llm_manager = LLMManager()
     return _llm_manager
@@ -4,24 +4,22 @@ Payroll specialist response agent for HR inquiries
 
 from langchain_core.prompts import ChatPromptTemplate
 
+from src.agents.specialist import Specialist, handle_specialist
 from src.agents.state import AgentState
-from src.agents.llm_manager import get_llm_manager
+from src.utils.helpers import compile_keyword_pattern
 from src.utils.logger import app_logger
 
 
+# Possible payment errors - auto-escalate (compiled once, single pass)
+PAYMENT_ERROR_PATTERN = compile_keyword_pattern(
+    ["incorrect", "wrong", "missing", "error", "not paid", "didn't receive"]
+)
+
+
 # Payroll specialist prompt
 PAYROLL_PROMPT = ChatPromptTemplate.from_template(
     """You are an expert HR Payroll specialist with deep knowledge of compensation, tax withholdings, and payroll processes.
 
-Employee Query: {query}
-
-Employee Sentiment: {sentiment}
-Priority Level: {priority}
-
-{context}
-
-{kb_context}
-
 Instructions:
 1. Provide clear, accurate guidance on payroll matters (pay schedules, direct deposit, tax forms, deductions)
 2. Include specific steps, deadlines, and portal links (e.g., payroll.company.com)
@@ -29,16 +27,41 @@ Instructions:
 4. For SENSITIVE inquiries about specific salary amounts or personal compensation, recommend contacting payroll@company.com directly
 5. Address questions about: paychecks, pay slips, W-2 forms, direct deposit, tax withholdings, overtime, payment errors
 6. Offer to escalate to payroll team for payment discrepancies or urgent issues
-7. Keep response professional and reassuring (200-300 words)
+7. Keep response professional and reassuring, within the response length given below
 8. Be precise with numbers, dates, and deadlines - accuracy is critical in payroll
 
 IMPORTANT: For specific salary inquiries or payment disputes, always escalate to the payroll team.
 
+---
+
+Employee Query: {query}
+
+Employee Sentiment: {sentiment}
+Priority Level: {priority}
+Response Length: {word_budget} words
+
+{context}
+
+{kb_context}
+
 Response:"""
 )
 
 
-def handle_payroll(state: AgentState) -> AgentState:
+PAYROLL = Specialist(
+    name="payroll",
+    prompt=PAYROLL_PROMPT,
+    kb_header="Relevant HR knowledge base articles",
+    word_budget="200-300",
+    fallback_response=(
+        "I apologize, but I'm experiencing technical difficulties. "
+        "For urgent payroll matters, please contact payroll@company.com or call ext. 2200 immediately."
+    ),
+    escalate_on_error=True,
+)
+
+
+async def handle_payroll(state: AgentState) -> AgentState:
     """
     Generate payroll specialist response
 
@@ -48,62 +71,10 @@ def handle_payroll(state: AgentState) -> AgentState:
     Returns:
         Updated state with response
     """
-    app_logger.info(f"Generating payroll response for: {state['query'][:50]}...")
-
-    try:
-        llm_manager = get_llm_manager()
-
-        # Prepare conversation context
-        context = ""
-        if state.get("conversation_history"):
-            context = "Previous conversation:\n"
-            for msg in state["conversation_history"][-5:]:
-                context += f"{msg['role'].capitalize()}: {msg['content']}\n"
-            context += "\n"
-
-        # Prepare knowledge base context
-        kb_context = ""
-        if state.get("kb_results"):
-            kb_context = "Relevant HR knowledge base articles:\n"
-            for i, kb in enumerate(state["kb_results"][:2], 1):
-                kb_context += (
-                    f"{i}. {kb.get('title', 'N/A')}: {kb.get('content', '')[:200]}...\n"
-                )
-            kb_context += "\n"
-
-        # Check for payment error keywords - auto-escalate
-        query_lower = state["query"].lower()
-        if any(keyword in query_lower for keyword in ["incorrect", "wrong", "missing", "error", "not paid", "didn't receive"]):
-            state["should_escalate"] = True
-            state["escalation_reason"] = "Potential payroll error requiring immediate attention"
-            app_logger.info("Auto-escalating potential payroll error")
-
-        # Invoke LLM
-        response = llm_manager.invoke_with_retry(
-            PAYROLL_PROMPT,
-            {
-                "query": state["query"],
-                "sentiment": state.get("sentiment", "Neutral"),
-                "priority": state.get("priority_score", 5),
-                "context": context,
-                "kb_context": kb_context,
-            },
-        )
-
-        app_logger.info("Payroll response generated successfully")
-
-        # Update state
-        state["response"] = response
-        state["next_action"] = "complete"
-
-        return state
-
-    except Exception as e:
-        app_logger.error(f"Error in handle_payroll: {e}")
-        state["response"] = (
-            "I apologize, but I'm experiencing technical difficulties. "
-            "For urgent payroll matters, please contact payroll@company.com or call ext. 2200 immediately."
-        )
+    # Check for payment error keywords - auto-escalate
+    if PAYMENT_ERROR_PATTERN.search(state["query"]):
         state["should_escalate"] = True
-        state["escalation_reason"] = "System error during response generation"
-        return state
+        state["escalation_reason"] = "Potential payroll error requiring immediate attention"
+        app_logger.info("Auto-escalating potential payroll error")
+
+    return await handle_specialist(state, PAYROLL)
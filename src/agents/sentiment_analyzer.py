@@ -2,14 +2,235 @@
 Sentiment analysis agent
 """
 
+import asyncio
+import os
+import platform
+import shutil
+import tempfile
+from pathlib import Path
+from threading import Lock
+from typing import Any, Optional, Tuple
+
 from langchain_core.prompts import ChatPromptTemplate
 
-from src.agents.state import AgentState
+from src.agents.state import AgentState, get_query_preview, recent_messages
 from src.agents.llm_manager import get_llm_manager
+from src.utils.config import settings
 from src.utils.helpers import parse_llm_sentiment, calculate_priority_score
 from src.utils.logger import app_logger
 
 
+# Local classifier labels trusted without asking the LLM. Negative queries
+# still go to the LLM, which separates Negative from Angry (escalation).
+LOCAL_SENTIMENT_LABELS = {"positive": "Positive", "neutral": "Neutral"}
+
+# Loaded local classifier pipeline; False once loading has failed
+_classifier: Any = None
+_classifier_lock = Lock()
+
+# File written by ORTQuantizer into the cached model directory
+QUANTIZED_MODEL_FILE = "model_quantized.onnx"
+
+# VADER lexicon analyzer; False once loading has failed
+_lexicon_analyzer: Any = None
+_lexicon_lock = Lock()
+
+
+def get_lexicon_analyzer() -> Optional[Any]:
+    """
+    Get or load the VADER lexicon analyzer
+
+    Returns:
+        SentimentIntensityAnalyzer, or None if lexicon scoring is disabled
+        or vaderSentiment is not installed
+    """
+    global _lexicon_analyzer
+    if not settings.sentiment_lexicon_enabled:
+        return None
+
+    with _lexicon_lock:
+        if _lexicon_analyzer is None:
+            try:
+                from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+                _lexicon_analyzer = SentimentIntensityAnalyzer()
+            except Exception as e:
+                app_logger.warning(f"Sentiment lexicon unavailable: {e}")
+                _lexicon_analyzer = False
+
+    return _lexicon_analyzer or None
+
+
+def classify_sentiment_lexically(text: str) -> Optional[Tuple[str, float]]:
+    """
+    Classify sentiment with the VADER lexicon
+
+    Only settles the clear case: short queries without a single negative
+    word and a compound score above the threshold are Positive. Anything
+    else is left to the next stage, including scores near 0: threats and
+    complaints without lexicon words ("I will sue the company") score 0.
+
+    Args:
+        text: Text to classify
+
+    Returns:
+        Tuple of (sentiment label, compound score), or None
+    """
+    analyzer = get_lexicon_analyzer()
+    if analyzer is None or len(text.split()) > settings.sentiment_lexicon_max_words:
+        return None
+
+    scores = analyzer.polarity_scores(text)
+    if scores["neg"] > 0:
+        return None
+
+    compound = scores["compound"]
+    if compound >= settings.sentiment_lexicon_positive_threshold:
+        return "Positive", compound
+    return None
+
+
+def get_sentiment_classifier() -> Optional[Any]:
+    """
+    Get or load the local sentiment classifier
+
+    Uses the int8-quantized ONNX Runtime export of ``settings.sentiment_model``
+    when ``settings.sentiment_backend`` is "onnx" and optimum is installed,
+    otherwise the PyTorch model with dynamic int8 quantization. Loaded at
+    application startup; the first call blocks until the model is ready.
+
+    Returns:
+        Text classification pipeline, or None if local classification is
+        disabled or the model could not be loaded
+    """
+    global _classifier
+    if not settings.sentiment_model_enabled:
+        return None
+
+    with _classifier_lock:
+        if _classifier is None:
+            try:
+                _classifier = _load_classifier(
+                    settings.sentiment_model, settings.sentiment_backend
+                )
+            except Exception as e:
+                app_logger.warning(f"Local sentiment model unavailable, using LLM: {e}")
+                _classifier = False
+
+    return _classifier or None
+
+
+def _load_classifier(model_name: str, backend: str) -> Any:
+    """Load a text classification pipeline for the given backend"""
+    # Deferred: transformers pulls in torch
+    from transformers import AutoTokenizer, pipeline
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+    if backend == "onnx":
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+
+            model_dir = get_quantized_onnx_model(model_name)
+            app_logger.info("Loading sentiment model: {} (onnx int8)", model_dir)
+            model = ORTModelForSequenceClassification.from_pretrained(
+                model_dir,
+                file_name=QUANTIZED_MODEL_FILE,
+                provider="CPUExecutionProvider",
+            )
+            return pipeline("text-classification", model=model, tokenizer=tokenizer)
+        except Exception as e:
+            app_logger.warning(
+                f"Could not load onnx sentiment model, falling back to torch: {e}"
+            )
+
+    import torch
+    from transformers import AutoModelForSequenceClassification
+
+    app_logger.info("Loading sentiment model: {}", model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model = torch.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+    return pipeline("text-classification", model=model, tokenizer=tokenizer)
+
+
+def get_quantized_onnx_model(model_name: str) -> Path:
+    """
+    Get the directory of the model's int8 ONNX export, creating it once
+
+    The first run exports the model to ONNX and applies dynamic int8
+    quantization under ``settings.sentiment_model_dir``; later runs and
+    other processes load the cached files.
+
+    Args:
+        model_name: Hugging Face model name
+
+    Returns:
+        Directory holding QUANTIZED_MODEL_FILE and the model config
+    """
+    model_dir = Path(settings.sentiment_model_dir) / model_name.replace("/", "--")
+    if (model_dir / QUANTIZED_MODEL_FILE).exists():
+        return model_dir
+
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    app_logger.info("Exporting sentiment model to int8 ONNX: {}", model_name)
+    model_dir.parent.mkdir(parents=True, exist_ok=True)
+    work_dir = Path(tempfile.mkdtemp(dir=model_dir.parent, prefix=".export-"))
+    try:
+        export_dir = work_dir / "fp32"
+        ORTModelForSequenceClassification.from_pretrained(
+            model_name, export=True
+        ).save_pretrained(export_dir)
+
+        if platform.machine().lower() in ("arm64", "aarch64"):
+            qconfig = AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+        else:
+            qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        quantized_dir = work_dir / "int8"
+        ORTQuantizer.from_pretrained(export_dir).quantize(
+            save_dir=quantized_dir, quantization_config=qconfig
+        )
+        shutil.copy2(export_dir / "config.json", quantized_dir / "config.json")
+
+        # Another process may have finished the same export first
+        try:
+            os.rename(quantized_dir, model_dir)
+        except OSError:
+            if not (model_dir / QUANTIZED_MODEL_FILE).exists():
+                raise
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return model_dir
+
+
+def classify_sentiment_locally(text: str) -> Optional[Tuple[str, float]]:
+    """
+    Classify sentiment with the local model
+
+    Args:
+        text: Text to classify
+
+    Returns:
+        Tuple of (sentiment label, confidence) if the model is confident
+        enough and the label doesn't need the LLM, otherwise None
+    """
+    classifier = get_sentiment_classifier()
+    if classifier is None:
+        return None
+
+    prediction = classifier(text, truncation=True)[0]
+    label = LOCAL_SENTIMENT_LABELS.get(prediction["label"].lower())
+    score = float(prediction["score"])
+
+    if label is None or score < settings.sentiment_model_min_confidence:
+        return None
+    return label, score
+
+
 # Sentiment analysis prompt
 SENTIMENT_PROMPT = ChatPromptTemplate.from_template(
     """You are an expert at analyzing customer sentiment and emotions.
@@ -21,17 +242,19 @@ Analyze the sentiment of the following customer query and classify it as ONE of
 - Angry: Very upset, furious, demanding, threatening
 
 Consider the tone, word choice, and emotional indicators in the text.
+Respond with ONLY the sentiment label (Positive, Neutral, Negative, or Angry).
+
+---
 
 Query: {query}
 
 {context}
 
-Respond with ONLY the sentiment label (Positive, Neutral, Negative, or Angry).
 Sentiment:"""
 )
 
 
-def analyze_sentiment(state: AgentState) -> AgentState:
+async def analyze_sentiment(state: AgentState) -> AgentState:
     """
     Analyze sentiment of customer query
 
@@ -41,28 +264,54 @@ def analyze_sentiment(state: AgentState) -> AgentState:
     Returns:
         Updated state with sentiment and priority score
     """
-    app_logger.info(f"Analyzing sentiment for query: {state['query'][:50]}...")
+    app_logger.info("Analyzing sentiment for query: {}", get_query_preview(state))
 
     try:
-        llm_manager = get_llm_manager()
-
-        # Prepare context
-        context = ""
-        if state.get("conversation_history"):
-            context = "Conversation tone progression:\n"
-            for msg in state["conversation_history"][-3:]:
-                if msg["role"] == "user":
-                    context += f"User: {msg['content'][:100]}\n"
-
-        # Invoke LLM
-        raw_sentiment = llm_manager.invoke_with_retry(
-            SENTIMENT_PROMPT, {"query": state["query"], "context": context}
-        )
+        # Fastest path: lexicon scoring settles clearly positive queries
+        try:
+            lexicon_result = classify_sentiment_lexically(state["query"])
+        except Exception as e:
+            app_logger.warning(f"Lexicon sentiment scoring failed: {e}")
+            lexicon_result = None
+
+        # Fast path: confident local classification skips the LLM round-trip
+        local_result = None
+        if lexicon_result is None:
+            try:
+                # Model inference is CPU-bound, keep it off the event loop
+                local_result = await asyncio.to_thread(
+                    classify_sentiment_locally, state["query"]
+                )
+            except Exception as e:
+                app_logger.warning(f"Local sentiment classification failed: {e}")
+
+        if lexicon_result is not None:
+            sentiment, compound = lexicon_result
+            raw_sentiment = f"{sentiment} (lexicon, {compound:.2f})"
+        elif local_result is not None:
+            sentiment, confidence = local_result
+            raw_sentiment = f"{sentiment} (local model, {confidence:.2f})"
+        else:
+            llm_manager = get_llm_manager()
+
+            # Prepare context
+            context = ""
+            if state.get("conversation_history"):
+                context = "Conversation tone progression:\n" + "".join(
+                    f"User: {msg['content'][:100]}\n"
+                    for msg in recent_messages(state["conversation_history"], 3)
+                    if msg["role"] == "user"
+                )
+
+            # Invoke LLM
+            raw_sentiment = await llm_manager.ainvoke_with_retry(
+                SENTIMENT_PROMPT, {"query": state["query"], "context": context}
+            )
 
-        # Parse and standardize sentiment
-        sentiment = parse_llm_sentiment(raw_sentiment)
+            # Parse and standardize sentiment
+            sentiment = parse_llm_sentiment(raw_sentiment)
 
-        app_logger.info(f"Sentiment analyzed as: {sentiment}")
+        app_logger.info("Sentiment analyzed as: {}", sentiment)
 
         # Calculate priority score
         user_context = state.get("user_context", {})
@@ -76,16 +325,17 @@ def analyze_sentiment(state: AgentState) -> AgentState:
             is_vip=is_vip,
         )
 
-        app_logger.info(f"Priority score calculated: {priority_score}")
+        app_logger.info("Priority score calculated: {}", priority_score)
 
         # Update state
         state["sentiment"] = sentiment
         state["priority_score"] = priority_score
 
         # Update metadata
-        if not state.get("extra_metadata"):
-            state["extra_metadata"] = {}
-        state["extra_metadata"]["raw_sentiment"] = raw_sentiment
+        state["extra_metadata"] = {
+            **(state.get("extra_metadata") or {}),
+            "raw_sentiment": raw_sentiment,
+        }
 
         return state
 
@@ -0,0 +1,102 @@
+"""
+Shared response generation for the HR specialist agents
+"""
+
+from typing import NamedTuple
+
+from langchain_core.prompts import ChatPromptTemplate
+
+from src.agents.context_builder import (
+    build_contexts,
+    get_word_budget,
+    word_budget_to_max_tokens,
+)
+from src.agents.state import AgentState, get_query_preview
+from src.agents.llm_manager import get_llm_manager
+from src.utils.logger import app_logger
+
+
+class Specialist(NamedTuple):
+    """What differs between the specialist response agents"""
+
+    name: str  # Used in log messages, e.g. "leave management"
+    prompt: ChatPromptTemplate
+    kb_header: str  # Heading for the knowledge base context block
+    word_budget: str  # Full-length word budget, e.g. "200-300"
+    fallback_response: str  # Sent when the LLM call fails
+    escalate_on_error: bool = False
+    # "fast" for FAQ-like one-shot answers, "strong" where reasoning matters
+    model_tier: str = "balanced"
+
+
+async def handle_specialist(state: AgentState, specialist: Specialist) -> AgentState:
+    """
+    Generate a specialist response
+
+    Args:
+        state: Current agent state
+        specialist: Prompt and settings of the specialist answering
+
+    Returns:
+        Updated state with response
+    """
+    name = specialist.name
+    app_logger.info("Generating {} response for: {}", name, get_query_preview(state))
+
+    try:
+        llm_manager = get_llm_manager()
+
+        # Prepare conversation and knowledge base context
+        context, kb_context = build_contexts(state, specialist.kb_header)
+        word_budget = get_word_budget(state, specialist.word_budget)
+
+        input_data = {
+            "query": state["query"],
+            "sentiment": state.get("sentiment", "Neutral"),
+            "priority": state.get("priority_score", 5),
+            "word_budget": word_budget,
+            "context": context,
+            "kb_context": kb_context,
+        }
+        max_tokens = word_budget_to_max_tokens(word_budget)
+
+        if state.get("stream"):
+            # Hand the caller a token stream instead of waiting for the full text
+            state["response_stream"] = llm_manager.astream_with_retry(
+                specialist.prompt,
+                input_data,
+                max_tokens=max_tokens,
+                tier=specialist.model_tier,
+            )
+            state["next_action"] = "complete"
+            app_logger.info("{} response stream started", name.capitalize())
+            return state
+
+        # Invoke LLM
+        response = await llm_manager.ainvoke_with_retry(
+            specialist.prompt,
+            input_data,
+            max_tokens=max_tokens,
+            tier=specialist.model_tier,
+        )
+
+        app_logger.info("{} response generated successfully", name.capitalize())
+
+        # Update state
+        state["response"] = response
+        state["next_action"] = "complete"
+
+        return state
+
+    except Exception as e:
+        app_logger.error(f"Error in {name} agent: {e}")
+        state["response"] = specialist.fallback_response
+        # Marks the response as a stand-in, e.g. so it is never cached
+        state["extra_metadata"] = {
+            **(state.get("extra_metadata") or {}),
+            "fallback": True,
+        }
+        if specialist.escalate_on_error:
+            state["should_escalate"] = True
+            state["escalation_reason"] = "System error during response generation"
+        return state
@@ -2,8 +2,40 @@
 State management for Multi-Agent HR Intelligence Platform agent workflow
 """
 
-from typing import TypedDict, Optional, List, Dict, Any
-from datetime import datetime
+from collections import deque
+from itertools import islice
+from typing import (
+    Annotated,
+    TypedDict,
+    Optional,
+    List,
+    Dict,
+    Any,
+    AsyncIterator,
+    Deque,
+    Iterable,
+    Iterator,
+    Sequence,
+    Union,
+)
+import time
+
+
+# Characters of the query shown in log lines
+QUERY_PREVIEW_LENGTH = 50
+
+# Conversation history messages kept per query; older ones are dropped
+MAX_HISTORY_MESSAGES = 20
+
+# Most recent messages shown verbatim in response prompts
+HISTORY_WINDOW = 5
+
+
+def merge_metadata(
+    current: Optional[Dict[str, Any]], update: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Merge a node's extra metadata into the state's (parallel nodes both write it)"""
+    return {**(current or {}), **(update or {})}
 
 
 class AgentState(TypedDict):
@@ -15,6 +47,7 @@ class AgentState(TypedDict):
 
     # Input
     query: str
+    query_preview: str  # Truncated query for log lines, computed once
     user_id: str
     conversation_id: str
 
@@ -25,13 +58,17 @@ class AgentState(TypedDict):
 
     # Context
     user_context: Optional[Dict[str, Any]]  # User history, VIP status, etc.
-    conversation_history: Optional[List[Dict[str, str]]]  # Previous messages
+    conversation_history: Optional[Sequence[Dict[str, str]]]  # Previous messages
+    history_summary: Optional[str]  # Summary of messages older than the last few
 
     # Knowledge base
     kb_results: Optional[List[Dict[str, Any]]]  # Retrieved KB articles
 
     # Response
     response: Optional[str]
+    stream: bool  # Caller wants the response as a token stream
+    # Set instead of response when streaming
+    response_stream: Optional[Union[Iterator[str], AsyncIterator[str]]]
 
     # Routing decisions
     should_escalate: bool
@@ -40,6 +77,9 @@ class AgentState(TypedDict):
 
     # Metadata
     metadata: Optional[Dict[str, Any]]
+    # Stored with the conversation; categorize and analyze_sentiment both
+    # write it in the same step, so updates are merged instead of replaced
+    extra_metadata: Annotated[Dict[str, Any], merge_metadata]
     processing_time: Optional[float]
 
     # Database IDs
@@ -47,6 +87,42 @@ class AgentState(TypedDict):
     conversation_db_id: Optional[int]
 
 
+def make_query_preview(query: str) -> str:
+    """Shorten a query for log lines"""
+    if len(query) <= QUERY_PREVIEW_LENGTH:
+        return query
+    return f"{query[:QUERY_PREVIEW_LENGTH]}..."
+
+
+def get_query_preview(state: AgentState) -> str:
+    """Get the log preview of the state's query, computing it if missing"""
+    return state.get("query_preview") or make_query_preview(state.get("query", ""))
+
+
+def new_history(messages: Iterable[Dict[str, str]] = ()) -> Deque[Dict[str, str]]:
+    """Create a conversation history that keeps the last MAX_HISTORY_MESSAGES"""
+    return deque(messages, maxlen=MAX_HISTORY_MESSAGES)
+
+
+def recent_messages(
+    history: Optional[Sequence[Dict[str, str]]], limit: int
+) -> Iterator[Dict[str, str]]:
+    """Iterate over the last ``limit`` messages without copying the history"""
+    if not history:
+        return iter(())
+    return islice(history, max(0, len(history) - limit), None)
+
+
+def format_recent_messages(
+    history: Optional[Sequence[Dict[str, str]]], limit: int
+) -> List[str]:
+    """Format the last ``limit`` messages as "Role: content" lines"""
+    return [
+        f"{msg['role'].capitalize()}: {msg['content']}"
+        for msg in recent_messages(history, limit)
+    ]
+
+
 class ConversationContext:
     """Helper class to manage conversation context"""
 
@@ -56,32 +132,37 @@ class ConversationContext:
         user_id: str,
         conversation_id: str,
         user_context: Dict[str, Any] = None,
-        conversation_history: List[Dict[str, str]] = None,
+        conversation_history: Iterable[Dict[str, str]] = None,
     ):
         self.query = query
         self.user_id = user_id
         self.conversation_id = conversation_id
         self.user_context = user_context or {}
-        self.conversation_history = conversation_history or []
-        self.start_time = datetime.now()
+        self.conversation_history = new_history(conversation_history or ())
+        self.start_time = time.perf_counter()
 
     def to_state(self) -> AgentState:
         """Convert to AgentState"""
         return AgentState(
             query=self.query,
+            query_preview=make_query_preview(self.query),
             user_id=self.user_id,
             conversation_id=self.conversation_id,
             user_context=self.user_context,
             conversation_history=self.conversation_history,
+            history_summary=None,
             category=None,
             sentiment=None,
             priority_score=None,
             kb_results=None,
             response=None,
+            stream=False,
+            response_stream=None,
             should_escalate=False,
             escalation_reason=None,
             next_action=None,
             metadata={},
+            extra_metadata={},
             processing_time=None,
             user_db_id=None,
             conversation_db_id=None,
@@ -89,17 +170,16 @@ class ConversationContext:
 
     def get_processing_time(self) -> float:
         """Get elapsed processing time"""
-        return (datetime.now() - self.start_time).total_seconds()
+        return time.perf_counter() - self.start_time
 
     def format_history_for_llm(self) -> str:
         """Format conversation history for LLM context"""
         if not self.conversation_history:
             return ""
 
-        formatted = ["Previous conversation:"]
-        for msg in self.conversation_history[-5:]:  # Last 5 messages
-            role = msg.get("role", "unknown")
-            content = msg.get("content", "")
-            formatted.append(f"{role.capitalize()}: {content}")
-
-        return "\n".join(formatted)
+        return "\n".join(
+            [
+                "Previous conversation:",
+                *format_recent_messages(self.conversation_history, HISTORY_WINDOW),
+            ]
+        )
@@ -4,33 +4,48 @@ Technical support response agent
 
 from langchain_core.prompts import ChatPromptTemplate
 
-from src.agents.state import AgentState
+from src.agents.context_builder import (
+    build_contexts,
+    get_word_budget,
+    word_budget_to_max_tokens,
+)
+from src.agents.state import AgentState, get_query_preview
 from src.agents.llm_manager import get_llm_manager
 from src.utils.logger import app_logger
 
 
-# Technical support prompt
-TECHNICAL_PROMPT = ChatPromptTemplate.from_template(
-    """You are an expert technical support agent with deep knowledge of software, hardware, and IT systems.
+# Technical support prompt. The instructions form a byte-identical system
+# message and everything per-request follows in the user message, so the
+# provider's automatic prefix caching can reuse the instruction tokens.
+TECHNICAL_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            """You are an expert technical support agent with deep knowledge of software, hardware, and IT systems.
 
-Customer Query: {query}
+Instructions:
+1. Provide a clear, step-by-step technical solution
+2. Use simple language while being technically accurate
+3. If the sentiment is negative or angry, start with empathy
+4. Include troubleshooting steps if applicable
+5. Offer to escalate if the issue is complex
+6. Keep response concise but comprehensive, within the response length given below""",
+        ),
+        (
+            "human",
+            """Customer Query: {query}
 
 Customer Sentiment: {sentiment}
 Priority Level: {priority}
+Response Length: {word_budget} words
 
 {context}
 
 {kb_context}
 
-Instructions:
-1. Provide a clear, step-by-step technical solution
-2. Use simple language while being technically accurate
-3. If the sentiment is negative or angry, start with empathy
-4. Include troubleshooting steps if applicable
-5. Offer to escalate if the issue is complex
-6. Keep response concise but comprehensive (200-300 words)
-
-Response:"""
+Response:""",
+        ),
+    ]
 )
 
 
@@ -44,28 +59,14 @@ def handle_technical(state: AgentState) -> AgentState:
     Returns:
         Updated state with response
     """
-    app_logger.info(f"Generating technical response for: {state['query'][:50]}...")
+    app_logger.info("Generating technical response for: {}", get_query_preview(state))
 
     try:
         llm_manager = get_llm_manager()
 
-        # Prepare conversation context
-        context = ""
-        if state.get("conversation_history"):
-            context = "Previous conversation:\n"
-            for msg in state["conversation_history"][-5:]:
-                context += f"{msg['role'].capitalize()}: {msg['content']}\n"
-            context += "\n"
-
-        # Prepare knowledge base context
-        kb_context = ""
-        if state.get("kb_results"):
-            kb_context = "Relevant knowledge base articles:\n"
-            for i, kb in enumerate(state["kb_results"][:2], 1):
-                kb_context += (
-                    f"{i}. {kb.get('title', 'N/A')}: {kb.get('content', '')[:200]}...\n"
-                )
-            kb_context += "\n"
+        # Prepare conversation and knowledge base context
+        context, kb_context = build_contexts(state, "Relevant knowledge base articles")
+        word_budget = get_word_budget(state, "200-300")
 
         # Invoke LLM
         response = llm_manager.invoke_with_retry(
@@ -74,9 +75,11 @@ def handle_technical(state: AgentState) -> AgentState:
                 "query": state["query"],
                 "sentiment": state.get("sentiment", "Neutral"),
                 "priority": state.get("priority_score", 5),
+                "word_budget": word_budget,
                 "context": context,
                 "kb_context": kb_context,
             },
+            max_tokens=word_budget_to_max_tokens(word_budget),
         )
 
         app_logger.info("Technical response generated successfully")
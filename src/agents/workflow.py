@@ -3,13 +3,16 @@ Multi-Agent HR Workflow Orchestrator using LangGraph
 Version: 3.0.0
 """
 
-from langgraph.graph import StateGraph, END
-from typing import Literal
+from langgraph.graph import StateGraph, START, END
+from functools import wraps
+import inspect
+from typing import Any, Callable, Dict, Literal
 
 from src.agents.state import AgentState
 from src.agents.categorizer import categorize_query
 from src.agents.sentiment_analyzer import analyze_sentiment
-from src.agents.kb_retrieval import retrieve_from_kb
+from src.agents.kb_retrieval import prefetch_query_embedding, retrieve_from_kb
+from src.agents.history_summarizer import summarize_history
 from src.agents.recruitment_agent import handle_recruitment
 from src.agents.payroll_agent import handle_payroll
 from src.agents.general_agent import (
@@ -23,6 +26,60 @@ from src.agents.escalation_agent import check_escalation, escalate_to_human
 from src.utils.logger import app_logger
 
 
+# HR category -> specialist node
+ROUTE_MAP = {
+    "Recruitment": "recruitment",
+    "Payroll": "payroll",
+    "Benefits": "benefits",
+    "Policy": "policy",
+    "LeaveManagement": "leave_management",
+    "Performance": "performance",
+    "General": "general",
+}
+
+
+def updates_only(node: Callable[[AgentState], AgentState]) -> Callable:
+    """
+    Wrap a node so it returns only the state keys it changed
+
+    Nodes that run in the same step (parallel branches) must not both
+    write the same key, so they cannot hand back the whole state.
+
+    Args:
+        node: Node function (sync or async) that mutates and returns the state
+
+    Returns:
+        Node function returning a partial state update
+    """
+
+    def changed(before: Dict[str, Any], after: AgentState) -> Dict[str, Any]:
+        # Identity first: untouched values (history, KB results) are the
+        # same objects, so they are skipped without a deep comparison
+        return {
+            key: value
+            for key, value in after.items()
+            if key not in before or (before[key] is not value and before[key] != value)
+        }
+
+    # LangGraph builds a fresh input dict for every node run, so the node
+    # can mutate it directly; only the snapshot needs a copy
+    if inspect.iscoroutinefunction(node):
+
+        @wraps(node)
+        async def async_wrapper(state: AgentState) -> Dict[str, Any]:
+            before = dict(state)
+            return changed(before, await node(state))
+
+        return async_wrapper
+
+    @wraps(node)
+    def wrapper(state: AgentState) -> Dict[str, Any]:
+        before = dict(state)
+        return changed(before, node(state))
+
+    return wrapper
+
+
 def route_query(
     state: AgentState,
 ) -> Literal[
@@ -51,19 +108,8 @@ def route_query(
 
     # Route based on HR category
     category = state.get("category", "General")
-
-    route_map = {
-        "Recruitment": "recruitment",
-        "Payroll": "payroll",
-        "Benefits": "benefits",
-        "Policy": "policy",
-        "LeaveManagement": "leave_management",
-        "Performance": "performance",
-        "General": "general",
-    }
-
-    route = route_map.get(category, "general")
-    app_logger.info(f"Routing to {route} agent (category: {category})")
+    route = ROUTE_MAP.get(category, "general")
+    app_logger.info("Routing to {} agent (category: {})", route, category)
     return route
 
 
@@ -79,9 +125,12 @@ def create_workflow() -> StateGraph:
     # Initialize workflow
     workflow = StateGraph(AgentState)
 
-    # Add nodes
-    workflow.add_node("categorize", categorize_query)
-    workflow.add_node("analyze_sentiment", analyze_sentiment)
+    # Add nodes (categorize, analyze_sentiment, prefetch_kb and
+    # summarize_history run in parallel)
+    workflow.add_node("categorize", updates_only(categorize_query))
+    workflow.add_node("analyze_sentiment", updates_only(analyze_sentiment))
+    workflow.add_node("prefetch_kb", updates_only(prefetch_query_embedding))
+    workflow.add_node("summarize_history", updates_only(summarize_history))
     workflow.add_node("retrieve_kb", retrieve_from_kb)
     workflow.add_node("check_escalation", check_escalation)
 
@@ -97,13 +146,20 @@ def create_workflow() -> StateGraph:
     # Escalation node
     workflow.add_node("escalate", escalate_to_human)
 
-    # Set entry point
-    workflow.set_entry_point("categorize")
-
-    # Add edges
-    workflow.add_edge("categorize", "analyze_sentiment")
-    workflow.add_edge("analyze_sentiment", "retrieve_kb")
-    workflow.add_edge("retrieve_kb", "check_escalation")
+    # Fan out: neither sentiment nor the KB search depends on the category,
+    # so both LLM calls and the query embedding run concurrently; KB
+    # retrieval then runs a category-filtered search with the cached embedding
+    workflow.add_edge(START, "categorize")
+    workflow.add_edge(START, "analyze_sentiment")
+    workflow.add_edge(START, "prefetch_kb")
+    workflow.add_edge(START, "summarize_history")
+    workflow.add_edge(["categorize", "prefetch_kb"], "retrieve_kb")
+
+    # Fan in: escalation needs both the KB results and the sentiment, and
+    # the response agents after it need the history summary
+    workflow.add_edge(
+        ["retrieve_kb", "analyze_sentiment", "summarize_history"], "check_escalation"
+    )
 
     # Add conditional routing after escalation check
     workflow.add_conditional_edges(
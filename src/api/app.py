@@ -7,15 +7,67 @@ Version: 3.0.0
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 from pathlib import Path
+import asyncio
 import uvicorn
 
-from src.api.routes import router
+from src.api.http_pool import close_http_client
+from src.api.routes import router, get_agent
+from src.api.webhook_delivery import start_webhook_workers, stop_webhook_workers
+from src.main import shutdown_customer_support_agent
 from src.api.webhooks import router as webhooks_router
 from src.database import init_db
-from src.utils import app_logger
+from src.utils import app_logger, settings
+
+
+async def startup_event():
+    """Initialize on startup"""
+    app_logger.info("Starting Multi-Agent HR Intelligence Platform FastAPI application...")
+
+    try:
+        # Initialize database
+        init_db()
+        app_logger.info("Database initialized successfully")
+    except Exception as e:
+        app_logger.warning(f"Database initialization warning: {e}")
+
+    # Webhook events from requests are delivered by these workers
+    start_webhook_workers()
+
+    try:
+        # Load the agent here so each worker process builds its own
+        agent = get_agent()
+        app_logger.info("Agent loaded successfully")
+    except Exception as e:
+        app_logger.warning(f"Agent preload failed, will load on first request: {e}")
+        return
+
+    # Load (on first start, export) the local sentiment model off the loop
+    await asyncio.to_thread(agent.load_models)
+
+    if settings.llm_warmup_enabled:
+        # Connect to the LLM API now instead of on the first user query
+        await asyncio.to_thread(agent.warm_up)
+
+
+async def shutdown_event():
+    """Flush queued webhooks and release the connection pools on shutdown"""
+    # In a worker thread: the agent closes its async pool on its own loop
+    await asyncio.to_thread(shutdown_customer_support_agent)
+    await stop_webhook_workers()
+    await close_http_client()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run startup before serving requests and shutdown after the last one"""
+    await startup_event()
+    yield
+    await shutdown_event()
+
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -24,13 +76,20 @@ app = FastAPI(
     version="2.2.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
+    # orjson serializes the nested query responses much faster than json
+    default_response_class=ORJSONResponse,
 )
 
-# CORS middleware
+# CORS middleware: explicit origins are matched with a set lookup; a
+# wildcard may not be combined with credentials
+cors_origins = [
+    origin.strip() for origin in settings.cors_origins.split(",") if origin.strip()
+]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
+    allow_origins=cors_origins,
+    allow_credentials="*" not in cors_origins,
     allow_methods=["*"],
     allow_headers=["*"],
 )
@@ -51,19 +110,6 @@ app.include_router(router)
 app.include_router(webhooks_router, tags=["Webhooks"])
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize on startup"""
-    app_logger.info("Starting Multi-Agent HR Intelligence Platform FastAPI application...")
-
-    try:
-        # Initialize database
-        init_db()
-        app_logger.info("Database initialized successfully")
-    except Exception as e:
-        app_logger.warning(f"Database initialization warning: {e}")
-
-
 @app.get("/", response_class=HTMLResponse)
 async def root(request: Request):
     """Serve the main UI"""
@@ -78,11 +124,30 @@ async def health():
     return {"status": "ok"}
 
 
-def run_server(host: str = "127.0.0.1", port: int = 8000, reload: bool = False):
-    """Run the FastAPI server"""
-    app_logger.info(f"Starting server on http://{host}:{port}")
+def run_server(
+    host: str = "127.0.0.1", port: int = 8000, reload: bool = False, workers: int = 1
+):
+    """
+    Run the FastAPI server
+
+    Args:
+        host: Host to bind to
+        port: Port to bind to
+        reload: Enable auto-reload (development only, forces a single worker)
+        workers: Number of worker processes
+    """
+    if reload:
+        workers = 1
+    app_logger.info(
+        "Starting server on http://{}:{} with {} worker(s)", host, port, workers
+    )
     uvicorn.run(
-        "src.api.app:app", host=host, port=port, reload=reload, log_level="info"
+        "src.api.app:app",
+        host=host,
+        port=port,
+        reload=reload,
+        workers=workers,
+        log_level="info",
     )
 
 
@@ -0,0 +1,53 @@
+"""
+Shared outbound HTTP client for webhook delivery
+"""
+
+import importlib.util
+from typing import Optional
+
+import httpx
+
+from src.utils.config import settings
+
+
+# Headers sent with every webhook delivery
+WEBHOOK_HEADERS = {
+    "Content-Type": "application/json",
+    "User-Agent": "Multi-Agent HR Intelligence Platform-Webhook/1.0",
+}
+
+# Global client instance, bound to the API's event loop
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get or create the pooled HTTP client
+
+    Deliveries to the same webhook host reuse kept-alive connections
+    (multiplexed as HTTP/2 streams when h2 is installed) instead of each
+    paying for its own TCP and TLS handshake.
+
+    Returns:
+        httpx.AsyncClient instance
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.webhook_max_connections,
+                max_keepalive_connections=settings.webhook_max_keepalive_connections,
+            ),
+            timeout=settings.webhook_timeout,
+            headers=WEBHOOK_HEADERS,
+            http2=importlib.util.find_spec("h2") is not None,
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the pooled HTTP client, if it was created"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
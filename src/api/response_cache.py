@@ -0,0 +1,60 @@
+"""
+Exact-match cache for API query responses
+
+Repeats of a question a user just asked are answered without running the
+agent (database, embedding and LLM calls). A repeat is not stored as a new
+conversation: it gets the earlier response, conversation_id included.
+Its webhook events are still sent.
+"""
+
+import hashlib
+from threading import Lock
+from typing import Optional
+
+from src.utils.config import settings
+from src.utils.response_cache import ResponseCache
+
+
+# Global cache instance
+_query_response_cache: Optional[ResponseCache] = None
+_query_response_cache_lock = Lock()
+
+
+def get_query_response_cache() -> Optional[ResponseCache]:
+    """
+    Get or create the query response cache singleton
+
+    Returns:
+        ResponseCache instance, or None if the cache is disabled
+    """
+    global _query_response_cache
+    if not settings.query_response_cache_enabled:
+        return None
+
+    if _query_response_cache is None:
+        with _query_response_cache_lock:
+            if _query_response_cache is None:
+                _query_response_cache = ResponseCache(
+                    max_size=settings.query_response_cache_max_size,
+                    ttl_seconds=settings.query_response_cache_ttl_seconds,
+                )
+    return _query_response_cache
+
+
+def make_query_cache_key(user_id: str, query: str) -> str:
+    """
+    Build the cache key for a user's query
+
+    Queries differing only in case or whitespace share a key.
+
+    Args:
+        user_id: User identifier
+        query: User message
+
+    Returns:
+        Hex digest of the user ID and normalized query
+    """
+    normalized = " ".join(query.lower().split())
+    return hashlib.blake2b(
+        f"{user_id}|{normalized}".encode("utf-8"), digest_size=16
+    ).hexdigest()
@@ -2,9 +2,10 @@
 FastAPI routes for Multi-Agent HR Intelligence Platform
 """
 
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
-from typing import Dict, Any
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, Any
+import orjson
 import time
 
 from src.api.schemas import (
@@ -15,9 +16,9 @@ from src.api.schemas import (
     QueryMetadata,
 )
 from src.main import get_customer_support_agent
+from src.api.response_cache import get_query_response_cache, make_query_cache_key
 from src.utils import app_logger
-from src.database.connection import get_db
-from src.api.webhook_delivery import trigger_webhooks
+from src.api.webhook_delivery import enqueue_webhook_event, has_subscribers
 from src.api.webhook_events import (
     create_query_created_payload,
     create_query_escalated_payload,
@@ -26,77 +27,96 @@ from src.api.webhook_events import (
 
 router = APIRouter(prefix="/api/v1", tags=["api"])
 
-# Global agent instance
-_agent = None
-
 
 def get_agent():
-    """Get or create agent instance"""
-    global _agent
-    if _agent is None:
-        _agent = get_customer_support_agent()
-    return _agent
+    """Get or create agent instance (loaded at application startup)"""
+    return get_customer_support_agent()
 
 
-@router.post("/query", response_model=QueryResponse)
-async def process_query(
-    request: QueryRequest,
-    background_tasks: BackgroundTasks,
-    agent=Depends(get_agent),
-    db: Session = Depends(get_db),
-):
+def build_query_response(result: Dict[str, Any], start_time: float) -> QueryResponse:
     """
-    Process a user query and return AI response with metadata
+    Convert an agent result into the API response model
+
+    Args:
+        result: Response dictionary from the agent
+        start_time: time.perf_counter() when the request started
+
+    Returns:
+        QueryResponse with metadata and KB results
     """
-    try:
-        app_logger.info(f"Processing query from user: {request.user_id}")
-        start_time = time.time()
-
-        # Process query through agent
-        result = agent.process_query(query=request.message, user_id=request.user_id)
-
-        # Extract metadata
-        metadata_dict = result.get("metadata", {})
-        kb_results_raw = metadata_dict.get("kb_results", [])
-
-        # Convert KB results to schema format
-        kb_results = [
-            KBResult(
-                title=kb.get("title", kb.get("question", "N/A")),
-                content=kb.get("content", kb.get("answer", "")),
-                category=kb.get("category", "General"),
-                score=kb.get("score", kb.get("similarity_score", 0.0)),
-            )
-            for kb in kb_results_raw
-        ]
-
-        # Build metadata response
-        metadata = QueryMetadata(
-            processing_time=metadata_dict.get(
-                "processing_time", time.time() - start_time
-            ),
-            escalated=metadata_dict.get("escalated", False),
-            escalation_reason=metadata_dict.get("escalation_reason"),
-            kb_results=kb_results,
-        )
+    # Extract metadata
+    metadata_dict = result.get("metadata", {})
+    kb_results_raw = metadata_dict.get("kb_results", [])
 
-        # Build response
-        response = QueryResponse(
-            conversation_id=result.get("conversation_id", "unknown"),
-            response=result.get("response", "I apologize, but I encountered an error."),
-            category=result.get("category", "General"),
-            sentiment=result.get("sentiment", "Neutral"),
-            priority=result.get("priority", 5),
-            timestamp=result.get("timestamp", ""),
-            metadata=metadata,
+    # Convert KB results to schema format. The agent's own output is
+    # trusted, so the models are built without running validation.
+    kb_results = [
+        KBResult.model_construct(
+            title=kb.get("title", kb.get("question", "N/A")),
+            content=kb.get("content", kb.get("answer", "")),
+            category=kb.get("category", "General"),
+            score=float(kb.get("score", kb.get("similarity_score", 0.0))),
         )
+        for kb in kb_results_raw
+    ]
+
+    # Build metadata response
+    metadata = QueryMetadata.model_construct(
+        processing_time=metadata_dict.get(
+            "processing_time", time.perf_counter() - start_time
+        ),
+        escalated=metadata_dict.get("escalated", False),
+        escalation_reason=metadata_dict.get("escalation_reason"),
+        kb_results=kb_results,
+    )
+
+    # Build response
+    return QueryResponse.model_construct(
+        conversation_id=result.get("conversation_id", "unknown"),
+        response=result.get("response", "I apologize, but I encountered an error."),
+        category=result.get("category", "General"),
+        sentiment=result.get("sentiment", "Neutral"),
+        priority=result.get("priority", 5),
+        timestamp=result.get("timestamp", ""),
+        metadata=metadata,
+    )
+
+
+def is_cacheable(result: Dict[str, Any], response: QueryResponse) -> bool:
+    """
+    Check whether a response may be replayed to repeats of the query
+
+    Escalations hand the query to a human, and error responses come from
+    failures that may be transient, so neither is cached.
+
+    Args:
+        result: Response dictionary from the agent
+        response: Response built from it
+
+    Returns:
+        True if the response can be cached
+    """
+    metadata = result.get("metadata") or {}
+    return (
+        not response.metadata.escalated
+        and result.get("category") != "Error"
+        and "error" not in metadata
+        and metadata.get("success") is not False
+    )
 
-        app_logger.info(
-            f"Query processed successfully in {metadata.processing_time:.2f}s"
-        )
 
-        # Trigger webhooks in background (non-blocking)
-        # Query created event
+def schedule_query_webhooks(request: QueryRequest, response: QueryResponse) -> None:
+    """
+    Queue the query webhook events for the delivery workers (non-blocking)
+
+    Args:
+        request: Original query request
+        response: Response returned to the user
+    """
+    metadata = response.metadata
+
+    # Payloads are only built for events someone is subscribed to
+    if has_subscribers(WebhookEvents.QUERY_CREATED):
         query_created_payload = create_query_created_payload(
             webhook_id="",  # Will be set for each webhook
             query_id=response.conversation_id,
@@ -107,46 +127,141 @@ async def process_query(
             priority=response.priority,
             metadata={
                 "processing_time": metadata.processing_time,
-                "kb_results_count": len(kb_results),
+                "kb_results_count": len(metadata.kb_results),
             },
         )
 
-        background_tasks.add_task(
-            trigger_webhooks, db, WebhookEvents.QUERY_CREATED, query_created_payload
+        enqueue_webhook_event(WebhookEvents.QUERY_CREATED, query_created_payload)
+
+    # If escalated, trigger escalation event
+    if metadata.escalated and has_subscribers(WebhookEvents.QUERY_ESCALATED):
+        query_escalated_payload = create_query_escalated_payload(
+            webhook_id="",  # Will be set for each webhook
+            query_id=response.conversation_id,
+            user_id=request.user_id,
+            category=response.category,
+            sentiment=response.sentiment,
+            priority=response.priority,
+            escalation_reason=metadata.escalation_reason or "Unknown",
+            query=request.message,
+            metadata={
+                "processing_time": metadata.processing_time,
+            },
         )
 
-        # If escalated, trigger escalation event
-        if metadata.escalated:
-            query_escalated_payload = create_query_escalated_payload(
-                webhook_id="",  # Will be set for each webhook
-                query_id=response.conversation_id,
-                user_id=request.user_id,
-                category=response.category,
-                sentiment=response.sentiment,
-                priority=response.priority,
-                escalation_reason=metadata.escalation_reason or "Unknown",
-                query=request.message,
-                metadata={
-                    "processing_time": metadata.processing_time,
-                },
-            )
+        enqueue_webhook_event(WebhookEvents.QUERY_ESCALATED, query_escalated_payload)
 
-            background_tasks.add_task(
-                trigger_webhooks,
-                db,
-                WebhookEvents.QUERY_ESCALATED,
-                query_escalated_payload,
-            )
+
+@router.post("/query", response_model=QueryResponse)
+async def process_query(request: QueryRequest):
+    """
+    Process a user query and return AI response with metadata
+    """
+    try:
+        # Called directly: as a sync dependency, FastAPI would resolve the
+        # already-loaded agent on a threadpool worker for every request
+        agent = get_agent()
+
+        app_logger.info("Processing query from user: {}", request.user_id)
+        start_time = time.perf_counter()
+
+        # Answer repeats of a question the user just asked from cache. The
+        # repeat is not stored as a new conversation (it keeps the earlier
+        # conversation_id), but subscribers still get its webhook events.
+        response_cache = get_query_response_cache()
+        if response_cache is not None:
+            cache_key = make_query_cache_key(request.user_id, request.message)
+            cached_response = response_cache.get(cache_key)
+            if cached_response is not None:
+                app_logger.info(
+                    "Query response cache hit for user: {}", request.user_id
+                )
+                schedule_query_webhooks(request, cached_response)
+                return cached_response
+
+        # Process query through agent without blocking the event loop
+        result = await agent.aprocess_query(
+            query=request.message, user_id=request.user_id
+        )
+
+        response = build_query_response(result, start_time)
+
+        app_logger.info(
+            "Query processed successfully in {:.2f}s", response.metadata.processing_time
+        )
+
+        if response_cache is not None and is_cacheable(result, response):
+            response_cache.put(cache_key, response)
+
+        schedule_query_webhooks(request, response)
 
         return response
 
     except Exception as e:
-        app_logger.error(f"Error processing query: {e}")
-        import traceback
+        app_logger.exception(f"Error processing query: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 
-        traceback.print_exc()
+def format_sse(payload: Dict[str, Any]) -> bytes:
+    """Encode one server-sent event frame"""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
+@router.post("/query/stream")
+async def stream_query(request: QueryRequest):
+    """
+    Process a user query, streaming the response as server-sent events
+
+    Sends ``{"token": ...}`` events as the response is generated, then a
+    final ``{"metadata": ...}`` event holding the complete QueryResponse.
+    """
+    try:
+        agent = get_agent()
+    except Exception as e:
+        app_logger.error(f"Error processing query: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+    app_logger.info("Streaming query from user: {}", request.user_id)
+    start_time = time.perf_counter()
+
+    async def events() -> AsyncIterator[bytes]:
+        # Cache hits are handled as in process_query
+        response_cache = get_query_response_cache()
+        if response_cache is not None:
+            cache_key = make_query_cache_key(request.user_id, request.message)
+            cached_response = response_cache.get(cache_key)
+            if cached_response is not None:
+                app_logger.info(
+                    "Query response cache hit for user: {}", request.user_id
+                )
+                schedule_query_webhooks(request, cached_response)
+                yield format_sse({"token": cached_response.response})
+                yield format_sse({"metadata": cached_response.model_dump(mode="json")})
+                return
+
+        async for item in agent.astream_query(
+            query=request.message, user_id=request.user_id
+        ):
+            if isinstance(item, str):
+                yield format_sse({"token": item})
+                continue
+
+            # The final item is the complete result
+            response = build_query_response(item, start_time)
+            app_logger.info(
+                "Query streamed successfully in {:.2f}s",
+                response.metadata.processing_time,
+            )
+
+            if response_cache is not None and is_cacheable(item, response):
+                response_cache.put(cache_key, response)
+
+            schedule_query_webhooks(request, response)
+
+            yield format_sse({"metadata": response.model_dump(mode="json")})
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
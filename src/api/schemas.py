@@ -2,6 +2,7 @@
 Pydantic schemas for FastAPI request/response models
 """
 
+from datetime import datetime
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
 
@@ -106,10 +107,10 @@ class WebhookResponse(BaseModel):
     is_active: bool
     delivery_count: int
     failure_count: int
-    last_delivery_at: Optional[str] = None
-    last_failure_at: Optional[str] = None
-    created_at: str
-    updated_at: str
+    last_delivery_at: Optional[datetime] = None
+    last_failure_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
 
     class Config:
         from_attributes = True
@@ -145,8 +146,8 @@ class WebhookDeliveryLogResponse(BaseModel):
     response_body: Optional[str] = None
     error_message: Optional[str] = None
     attempt_count: int
-    created_at: str
-    delivered_at: Optional[str] = None
+    created_at: datetime
+    delivered_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -7,16 +7,103 @@ import hashlib
 import hmac
 import json
 import time
-from typing import Dict, Any, Optional
-from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta
 
 import httpx
 
-from src.database.models import Webhook
+from src.api.http_pool import get_http_client
+from src.database.connection import get_db_context
+from src.database.models import Webhook, WebhookDelivery
 from src.database.webhook_queries import WebhookQueries
+from src.utils.config import settings
 from src.utils.logger import app_logger
 
 
+# Queued (event type, payload) pairs and the workers delivering them,
+# bound to the API's event loop
+_webhook_queue: Optional["asyncio.Queue[Tuple[str, Dict[str, Any]]]"] = None
+_webhook_workers: List[asyncio.Task] = []
+
+# Deliveries in flight across all workers, bound to the API's event loop
+_delivery_semaphore: Optional[asyncio.Semaphore] = None
+
+# Bytes of an endpoint's response body kept for the delivery log
+RESPONSE_BODY_LIMIT = 1000
+
+# Event type -> (expiry on the monotonic clock, has active subscribers)
+_subscriber_cache: Dict[str, Tuple[float, bool]] = {}
+
+
+def serialize_webhook_payload(payload: Dict[str, Any]) -> bytes:
+    """
+    Serialize a webhook payload to the canonical JSON that is signed and sent
+
+    Args:
+        payload: Webhook payload dict
+
+    Returns:
+        Compact, key-sorted JSON as UTF-8 bytes
+    """
+    return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def serialize_webhook_payloads(
+    payload: Dict[str, Any], webhook_ids: List[str]
+) -> List[bytes]:
+    """
+    Serialize an event payload for each subscribed webhook
+
+    The payloads only differ in webhook_id, which sorts after the standard
+    payload keys, so the shared part is serialized once and each body just
+    appends its webhook_id. Payloads with other keys are serialized in full.
+
+    Args:
+        payload: Event payload
+        webhook_ids: IDs of the webhooks receiving the event
+
+    Returns:
+        Canonical body for each webhook, in the order of webhook_ids
+    """
+    shared = {key: value for key, value in payload.items() if key != "webhook_id"}
+
+    if not shared or not all(key < "webhook_id" for key in shared):
+        return [
+            serialize_webhook_payload({**payload, "webhook_id": webhook_id})
+            for webhook_id in webhook_ids
+        ]
+
+    prefix = serialize_webhook_payload(shared)[:-1] + b',"webhook_id":'
+    return [
+        prefix + json.dumps(webhook_id).encode("utf-8") + b"}"
+        for webhook_id in webhook_ids
+    ]
+
+
+@lru_cache(maxsize=1024)
+def _keyed_hmac(secret_key: str) -> hmac.HMAC:
+    """HMAC-SHA256 state with the webhook's key already absorbed (never updated)"""
+    return hmac.new(secret_key.encode("utf-8"), digestmod=hashlib.sha256)
+
+
+def generate_webhook_signature_bytes(body: bytes, secret_key: str) -> str:
+    """
+    Generate HMAC-SHA256 signature for a serialized webhook payload
+
+    Args:
+        body: Payload from serialize_webhook_payload
+        secret_key: Webhook secret key
+
+    Returns:
+        HMAC signature as hex string
+    """
+    # Copying the keyed state skips hashing the padded key on every delivery
+    signer = _keyed_hmac(secret_key).copy()
+    signer.update(body)
+    return signer.hexdigest()
+
+
 def generate_webhook_signature(payload: Dict[str, Any], secret_key: str) -> str:
     """
     Generate HMAC-SHA256 signature for webhook payload
@@ -28,24 +115,41 @@ def generate_webhook_signature(payload: Dict[str, Any], secret_key: str) -> str:
     Returns:
         HMAC signature as hex string
     """
-    # Convert payload to JSON string
-    payload_str = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return generate_webhook_signature_bytes(
+        serialize_webhook_payload(payload), secret_key
+    )
 
-    # Generate HMAC-SHA256 signature
-    signature = hmac.new(
-        key=secret_key.encode("utf-8"),
-        msg=payload_str.encode("utf-8"),
-        digestmod=hashlib.sha256,
-    ).hexdigest()
 
-    return signature
+async def read_response_text(
+    response: httpx.Response, limit: int = RESPONSE_BODY_LIMIT
+) -> str:
+    """
+    Read the start of a streamed webhook response body
+
+    Stops reading after limit bytes, so an endpoint answering with a huge
+    body costs neither the memory nor the decoding of all of it.
+
+    Args:
+        response: Response opened with stream=True
+        limit: Maximum number of bytes to keep
+
+    Returns:
+        Decoded body, truncated to limit bytes
+    """
+    content = bytearray()
+    async for chunk in response.aiter_bytes():
+        content += chunk
+        if len(content) >= limit:
+            break
+    return content[:limit].decode(response.encoding or "utf-8", errors="replace")
 
 
 async def deliver_webhook(
     webhook: Webhook,
     payload: Dict[str, Any],
     max_retries: int = 3,
-    timeout: int = 10,
+    timeout: Optional[float] = None,
+    body: Optional[bytes] = None,
 ) -> Dict[str, Any]:
     """
     Deliver webhook with retry logic
@@ -54,7 +158,10 @@ async def deliver_webhook(
         webhook: Webhook instance
         payload: Event payload
         max_retries: Maximum number of delivery attempts
-        timeout: Timeout for each attempt in seconds
+        timeout: Timeout for each attempt in seconds; defaults to
+            settings.webhook_timeout
+        body: Payload already serialized with serialize_webhook_payload;
+            serialized here if not given
 
     Returns:
         Dict with delivery status:
@@ -67,80 +174,90 @@ async def deliver_webhook(
             "response_time_ms": float
         }
     """
-    # Generate signature
-    signature = generate_webhook_signature(payload, webhook.secret_key)
+    # The signed bytes are sent as-is, so every attempt posts the same body
+    if body is None:
+        body = serialize_webhook_payload(payload)
+    signature = generate_webhook_signature_bytes(body, webhook.secret_key)
     timestamp = datetime.utcnow().isoformat() + "Z"
 
-    # Prepare headers
+    # Per-delivery headers; the client adds the constant WEBHOOK_HEADERS
     headers = {
-        "Content-Type": "application/json",
         "X-Webhook-Signature": signature,
         "X-Webhook-Timestamp": timestamp,
         "X-Webhook-ID": webhook.id,
-        "User-Agent": "Multi-Agent HR Intelligence Platform-Webhook/1.0",
     }
 
+    if timeout is None:
+        timeout = settings.webhook_timeout
+
     # Retry logic with exponential backoff
     for attempt in range(1, max_retries + 1):
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(
-                    webhook.url, json=payload, headers=headers
+            client = get_http_client()
+            request = client.build_request(
+                "POST", webhook.url, content=body, headers=headers, timeout=timeout
+            )
+            response = await client.send(request, stream=True)
+            try:
+                response_text = await read_response_text(response)
+            finally:
+                await response.aclose()
+
+            response_time_ms = (time.perf_counter() - start_time) * 1000
+
+            # Check if successful (2xx status codes)
+            if 200 <= response.status_code < 300:
+                app_logger.info(
+                    "Webhook {} delivered successfully on attempt {}",
+                    webhook.id,
+                    attempt,
                 )
 
-                response_time_ms = (time.time() - start_time) * 1000
+                return {
+                    "success": True,
+                    "status_code": response.status_code,
+                    "response_body": response_text,
+                    "error": None,
+                    "attempts": attempt,
+                    "response_time_ms": response_time_ms,
+                }
+            else:
+                error_msg = f"HTTP {response.status_code}: {response_text[:200]}"
+                app_logger.warning(
+                    f"Webhook {webhook.id} failed on attempt {attempt}: {error_msg}"
+                )
 
-                # Check if successful (2xx status codes)
-                if 200 <= response.status_code < 300:
+                # Don't retry for client errors (4xx)
+                if 400 <= response.status_code < 500:
+                    return {
+                        "success": False,
+                        "status_code": response.status_code,
+                        "response_body": response_text,
+                        "error": error_msg,
+                        "attempts": attempt,
+                        "response_time_ms": response_time_ms,
+                    }
+
+                # Retry for server errors (5xx)
+                if attempt < max_retries:
+                    # Exponential backoff: 1s, 2s, 4s
+                    backoff_seconds = 2 ** (attempt - 1)
                     app_logger.info(
-                        f"Webhook {webhook.id} delivered successfully on attempt {attempt}"
+                        "Retrying webhook {} in {}s...", webhook.id, backoff_seconds
                     )
-
+                    await asyncio.sleep(backoff_seconds)
+                    continue
+                else:
                     return {
-                        "success": True,
+                        "success": False,
                         "status_code": response.status_code,
-                        "response_body": response.text[:1000],  # Limit to 1000 chars
-                        "error": None,
+                        "response_body": response_text,
+                        "error": error_msg,
                         "attempts": attempt,
                         "response_time_ms": response_time_ms,
                     }
-                else:
-                    error_msg = f"HTTP {response.status_code}: {response.text[:200]}"
-                    app_logger.warning(
-                        f"Webhook {webhook.id} failed on attempt {attempt}: {error_msg}"
-                    )
-
-                    # Don't retry for client errors (4xx)
-                    if 400 <= response.status_code < 500:
-                        return {
-                            "success": False,
-                            "status_code": response.status_code,
-                            "response_body": response.text[:1000],
-                            "error": error_msg,
-                            "attempts": attempt,
-                            "response_time_ms": response_time_ms,
-                        }
-
-                    # Retry for server errors (5xx)
-                    if attempt < max_retries:
-                        # Exponential backoff: 1s, 2s, 4s
-                        backoff_seconds = 2 ** (attempt - 1)
-                        app_logger.info(
-                            f"Retrying webhook {webhook.id} in {backoff_seconds}s..."
-                        )
-                        await asyncio.sleep(backoff_seconds)
-                        continue
-                    else:
-                        return {
-                            "success": False,
-                            "status_code": response.status_code,
-                            "response_body": response.text[:1000],
-                            "error": error_msg,
-                            "attempts": attempt,
-                            "response_time_ms": response_time_ms,
-                        }
 
         except httpx.TimeoutException as e:
             error_msg = f"Timeout after {timeout}s: {str(e)}"
@@ -159,7 +276,7 @@ async def deliver_webhook(
                     "response_body": None,
                     "error": error_msg,
                     "attempts": attempt,
-                    "response_time_ms": (time.time() - start_time) * 1000,
+                    "response_time_ms": (time.perf_counter() - start_time) * 1000,
                 }
 
         except Exception as e:
@@ -179,7 +296,7 @@ async def deliver_webhook(
                     "response_body": None,
                     "error": error_msg,
                     "attempts": attempt,
-                    "response_time_ms": (time.time() - start_time) * 1000,
+                    "response_time_ms": (time.perf_counter() - start_time) * 1000,
                 }
 
     # Should never reach here, but just in case
@@ -200,7 +317,11 @@ async def trigger_webhooks(
     log_delivery: bool = True,
 ) -> None:
     """
-    Trigger all webhooks subscribed to an event (non-blocking)
+    Deliver an event to all webhooks subscribed to it
+
+    Deliveries run concurrently; returns once all of them have finished.
+    Request handlers queue events with enqueue_webhook_event instead of
+    awaiting this.
 
     Args:
         db_session: Database session
@@ -212,31 +333,63 @@ async def trigger_webhooks(
     webhooks = WebhookQueries.get_active_webhooks_for_event(db_session, event_type)
 
     if not webhooks:
-        app_logger.debug(f"No active webhooks for event: {event_type}")
+        app_logger.debug("No active webhooks for event: {}", event_type)
         return
 
-    app_logger.info(
-        f"Triggering {len(webhooks)} webhook(s) for event: {event_type}"
-    )
+    app_logger.info("Triggering {} webhook(s) for event: {}", len(webhooks), event_type)
 
-    # Deliver to each webhook (in parallel, non-blocking)
+    # Deliver to each webhook in parallel, without outrunning the client pool
+    semaphore = _delivery_semaphore or asyncio.Semaphore(
+        settings.webhook_max_concurrent_deliveries
+    )
     delivery_tasks = []
+    bodies = serialize_webhook_payloads(payload, [webhook.id for webhook in webhooks])
 
-    for webhook in webhooks:
+    for webhook, body in zip(webhooks, bodies):
         # Create payload for this specific webhook
         webhook_payload = payload.copy()
         webhook_payload["webhook_id"] = webhook.id
 
         # Create delivery task
-        task = deliver_webhook_and_log(
-            db_session, webhook, webhook_payload, event_type, log_delivery
+        task = _deliver_bounded(
+            semaphore,
+            deliver_webhook_and_log(
+                db_session, webhook, webhook_payload, event_type, log_delivery, body
+            ),
         )
         delivery_tasks.append(task)
 
-    # Fire and forget (don't wait for completion)
-    # This ensures webhook delivery doesn't block the main request
-    if delivery_tasks:
-        asyncio.create_task(asyncio.gather(*delivery_tasks, return_exceptions=True))
+    await asyncio.gather(*delivery_tasks, return_exceptions=True)
+
+
+async def _deliver_bounded(semaphore: asyncio.Semaphore, delivery) -> None:
+    """Run a delivery once the semaphore has a free slot"""
+    async with semaphore:
+        await delivery
+
+
+def _next_retry_at(result: Dict[str, Any], attempts: int) -> Optional[datetime]:
+    """
+    Decide when to retry a delivery attempt
+
+    Args:
+        result: Result of the latest attempt, from deliver_webhook
+        attempts: Attempts made so far, including the latest one
+
+    Returns:
+        Retry time, or None if the delivery succeeded, was rejected with a
+        client error (4xx) or has used all settings.webhook_max_attempts
+    """
+    status_code = result.get("status_code")
+    if (
+        result["success"]
+        or (status_code is not None and 400 <= status_code < 500)
+        or attempts >= settings.webhook_max_attempts
+    ):
+        return None
+
+    backoff_seconds = settings.webhook_retry_backoff_seconds * 2 ** (attempts - 1)
+    return datetime.utcnow() + timedelta(seconds=backoff_seconds)
 
 
 async def deliver_webhook_and_log(
@@ -245,30 +398,37 @@ async def deliver_webhook_and_log(
     payload: Dict[str, Any],
     event_type: str,
     log_delivery: bool,
+    body: Optional[bytes] = None,
 ) -> None:
     """
     Deliver webhook and log the result
 
+    Makes a single attempt. A failed attempt that may succeed later is
+    logged as 'pending' (whether or not log_delivery is set) and retried
+    by the retry worker, so an unreachable endpoint doesn't hold a
+    delivery slot through its backoff.
+
     Args:
         db_session: Database session
         webhook: Webhook instance
         payload: Event payload
         event_type: Event type
         log_delivery: Whether to log delivery
+        body: Serialized payload, if already built
     """
     try:
         # Deliver webhook
-        result = await deliver_webhook(webhook, payload)
-
-        # Update webhook statistics
-        WebhookQueries.update_delivery_stats(
-            db_session, webhook.id, result["success"]
-        )
-
-        # Log delivery if requested
-        if log_delivery:
-            status = "success" if result["success"] else "failed"
-            WebhookQueries.create_delivery_log(
+        result = await deliver_webhook(webhook, payload, max_retries=1, body=body)
+        next_retry_at = _next_retry_at(result, 1)
+
+        # Log entry and statistics share a commit; statistics count each
+        # delivery once, when it is settled
+        if log_delivery or next_retry_at is not None:
+            if result["success"]:
+                status = "success"
+            else:
+                status = "pending" if next_retry_at is not None else "failed"
+            WebhookQueries.record_delivery(
                 db=db_session,
                 webhook_id=webhook.id,
                 event_type=event_type,
@@ -278,11 +438,21 @@ async def deliver_webhook_and_log(
                 response_body=result.get("response_body"),
                 error_message=result.get("error"),
                 attempt_count=result.get("attempts", 1),
+                next_retry_at=next_retry_at,
+            )
+        else:
+            WebhookQueries.update_delivery_stats(
+                db_session, webhook.id, result["success"]
             )
 
         if result["success"]:
             app_logger.info(
-                f"Webhook {webhook.id} delivered successfully to {webhook.url}"
+                "Webhook {} delivered successfully to {}", webhook.id, webhook.url
+            )
+        elif next_retry_at is not None:
+            app_logger.warning(
+                f"Webhook {webhook.id} delivery failed, retrying at "
+                f"{next_retry_at.isoformat()}Z: {result.get('error')}"
             )
         else:
             app_logger.error(
@@ -295,6 +465,209 @@ async def deliver_webhook_and_log(
         WebhookQueries.update_delivery_stats(db_session, webhook.id, False)
 
 
+async def retry_delivery(db_session, delivery_id: int, due_at: datetime) -> None:
+    """
+    Retry a due 'pending' delivery and record the outcome
+
+    Args:
+        db_session: Database session, used for this delivery only
+        delivery_id: Delivery log entry to retry
+        due_at: Its retry time, as read by get_due_deliveries
+    """
+    # Long enough for the attempt to finish before another worker retries it
+    lease_until = datetime.utcnow() + timedelta(seconds=2 * settings.webhook_timeout)
+    delivery = WebhookQueries.claim_delivery(
+        db_session, delivery_id, due_at, lease_until
+    )
+    if delivery is None:
+        return
+
+    webhook = delivery.webhook
+    if webhook is None or not webhook.is_active:
+        WebhookQueries.update_delivery_log(
+            db_session, delivery, "failed", error_message="Webhook is not active"
+        )
+        return
+
+    try:
+        result = await deliver_webhook(webhook, delivery.payload, max_retries=1)
+        next_retry_at = _next_retry_at(result, delivery.attempt_count + 1)
+
+        if result["success"]:
+            status = "success"
+        else:
+            status = "pending" if next_retry_at is not None else "failed"
+        WebhookQueries.update_delivery_log(
+            db_session,
+            delivery,
+            status,
+            status_code=result.get("status_code"),
+            response_body=result.get("response_body"),
+            error_message=result.get("error"),
+            next_retry_at=next_retry_at,
+        )
+
+        if next_retry_at is None and not result["success"]:
+            app_logger.error(
+                f"Webhook {webhook.id} delivery failed after "
+                f"{delivery.attempt_count} attempts: {result.get('error')}"
+            )
+
+    except Exception as e:
+        app_logger.error(f"Error retrying webhook delivery {delivery.id}: {str(e)}")
+
+
+async def _webhook_worker(queue: "asyncio.Queue[Tuple[str, Dict[str, Any]]]") -> None:
+    """Deliver queued events one at a time until cancelled"""
+    while True:
+        event_type, payload = await queue.get()
+        try:
+            # Each event gets its own session: the request's is closed by now
+            with get_db_context() as db:
+                await trigger_webhooks(db, event_type, payload)
+        except Exception as e:
+            app_logger.error(f"Error triggering webhooks for {event_type}: {e}")
+        finally:
+            queue.task_done()
+
+
+async def _retry_due_delivery(delivery_id: int, due_at: datetime) -> None:
+    """Retry one due delivery in its own session"""
+    # Retries run concurrently, and a shared session's commits would
+    # reload the other deliveries' retry times mid-claim
+    with get_db_context() as db:
+        await retry_delivery(db, delivery_id, due_at)
+
+
+async def _webhook_retry_worker(semaphore: asyncio.Semaphore) -> None:
+    """Retry due deliveries from the delivery log until cancelled"""
+    while True:
+        await asyncio.sleep(settings.webhook_retry_poll_seconds)
+        try:
+            with get_db_context() as db:
+                due = WebhookQueries.get_due_deliveries(
+                    db,
+                    datetime.utcnow(),
+                    limit=settings.webhook_max_concurrent_deliveries,
+                )
+            await asyncio.gather(
+                *(
+                    _deliver_bounded(semaphore, _retry_due_delivery(*entry))
+                    for entry in due
+                ),
+                return_exceptions=True,
+            )
+        except Exception as e:
+            app_logger.error(f"Error retrying webhook deliveries: {e}")
+
+
+def start_webhook_workers() -> None:
+    """
+    Create the webhook event queue and its delivery workers
+
+    Must be called from the API's event loop. settings.webhook_workers
+    bounds how many events are delivered at once, however bursty the
+    traffic that produced them, and settings.webhook_max_concurrent_deliveries
+    bounds the requests those events fan out to. A further worker retries
+    failed deliveries from the delivery log.
+    """
+    global _webhook_queue, _delivery_semaphore
+    if _webhook_queue is not None:
+        return
+
+    _webhook_queue = asyncio.Queue(maxsize=settings.webhook_queue_size)
+    _delivery_semaphore = asyncio.Semaphore(settings.webhook_max_concurrent_deliveries)
+    for _ in range(settings.webhook_workers):
+        _webhook_workers.append(asyncio.create_task(_webhook_worker(_webhook_queue)))
+    _webhook_workers.append(
+        asyncio.create_task(_webhook_retry_worker(_delivery_semaphore))
+    )
+    app_logger.info("Started {} webhook delivery workers", settings.webhook_workers)
+
+
+async def stop_webhook_workers() -> None:
+    """Deliver the events still queued (within the webhook timeout), then stop"""
+    global _webhook_queue, _delivery_semaphore
+    if _webhook_queue is None:
+        return
+
+    try:
+        await asyncio.wait_for(_webhook_queue.join(), timeout=settings.webhook_timeout)
+    except asyncio.TimeoutError:
+        app_logger.warning(
+            f"Dropping {_webhook_queue.qsize()} undelivered webhook event(s)"
+        )
+
+    for worker in _webhook_workers:
+        worker.cancel()
+    await asyncio.gather(*_webhook_workers, return_exceptions=True)
+    _webhook_workers.clear()
+    _webhook_queue = None
+    _delivery_semaphore = None
+
+
+def has_subscribers(event_type: str) -> bool:
+    """
+    Check whether any active webhook is subscribed to an event
+
+    Cached for settings.webhook_subscriber_cache_ttl_seconds so requests
+    can skip building payloads nobody receives without a database query
+    each time. Webhook changes made through this process clear the cache;
+    other workers see them once their entry expires.
+
+    Args:
+        event_type: Event type (e.g., 'query.created')
+
+    Returns:
+        True if the event has subscribers, or if the lookup failed
+    """
+    now = time.monotonic()
+    cached = _subscriber_cache.get(event_type)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    try:
+        with get_db_context() as db:
+            subscribed = bool(
+                WebhookQueries.get_active_webhooks_for_event(db, event_type)
+            )
+    except Exception as e:
+        # Let the delivery worker look the webhooks up instead
+        app_logger.warning(f"Webhook subscriber lookup failed for {event_type}: {e}")
+        return True
+
+    _subscriber_cache[event_type] = (
+        now + settings.webhook_subscriber_cache_ttl_seconds,
+        subscribed,
+    )
+    return subscribed
+
+
+def invalidate_subscriber_cache() -> None:
+    """Forget cached subscriber lookups after webhooks change"""
+    _subscriber_cache.clear()
+
+
+def enqueue_webhook_event(event_type: str, payload: Dict[str, Any]) -> bool:
+    """
+    Queue an event for delivery by the webhook workers (non-blocking)
+
+    Args:
+        event_type: Event type (e.g., 'query.created')
+        payload: Event payload
+
+    Returns:
+        True if queued, False if the queue is full and the event was dropped
+    """
+    start_webhook_workers()
+    try:
+        _webhook_queue.put_nowait((event_type, payload))
+        return True
+    except asyncio.QueueFull:
+        app_logger.warning(f"Webhook queue full, dropping {event_type} event")
+        return False
+
+
 def verify_webhook_signature(
     payload: Dict[str, Any], signature: str, secret_key: str
 ) -> bool:
@@ -28,7 +28,11 @@ class WebhookEvents:
     @classmethod
     def is_valid_event(cls, event: str) -> bool:
         """Check if event type is valid"""
-        return event in cls.all_events()
+        return event in VALID_EVENTS
+
+
+# Set of all event types, for validation
+VALID_EVENTS = frozenset(WebhookEvents.all_events())
 
 
 def create_webhook_payload(
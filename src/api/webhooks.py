@@ -4,6 +4,7 @@ Webhook management API endpoints
 
 import time
 from typing import List
+from urllib.parse import urlsplit
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
@@ -18,12 +19,24 @@ from src.api.schemas import (
     WebhookDeliveryLogsResponse,
     WebhookDeliveryLogResponse,
 )
-from src.api.webhook_delivery import deliver_webhook
+from src.api.webhook_delivery import deliver_webhook, invalidate_subscriber_cache
 from src.api.webhook_events import WebhookEvents, create_webhook_payload
 from src.utils.logger import app_logger
 
 router = APIRouter(prefix="/api/v1/webhooks", tags=["webhooks"])
 
+# URL schemes webhooks can be delivered to
+WEBHOOK_URL_SCHEMES = frozenset({"http", "https"})
+
+
+def is_valid_webhook_url(url: str) -> bool:
+    """Check that a webhook URL is http(s) and names a host"""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return False
+    return parts.scheme in WEBHOOK_URL_SCHEMES and bool(parts.hostname)
+
 
 @router.post("/", response_model=WebhookResponse, status_code=status.HTTP_201_CREATED)
 async def create_webhook(
@@ -38,10 +51,10 @@ async def create_webhook(
     Returns the webhook with generated secret_key for signature verification.
     """
     # Validate URL format
-    if not webhook_data.url.startswith(("http://", "https://")):
+    if not is_valid_webhook_url(webhook_data.url):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="URL must start with http:// or https://",
+            detail="URL must start with http:// or https:// and include a host",
         )
 
     # Validate events
@@ -56,26 +69,11 @@ async def create_webhook(
     webhook = WebhookQueries.create_webhook(
         db=db, url=webhook_data.url, events=webhook_data.events
     )
+    invalidate_subscriber_cache()
 
-    app_logger.info(f"Created webhook {webhook.id} for URL: {webhook.url}")
-
-    return WebhookResponse(
-        id=webhook.id,
-        url=webhook.url,
-        events=webhook.events,
-        secret_key=webhook.secret_key,
-        is_active=webhook.is_active,
-        delivery_count=webhook.delivery_count,
-        failure_count=webhook.failure_count,
-        last_delivery_at=(
-            webhook.last_delivery_at.isoformat() if webhook.last_delivery_at else None
-        ),
-        last_failure_at=(
-            webhook.last_failure_at.isoformat() if webhook.last_failure_at else None
-        ),
-        created_at=webhook.created_at.isoformat(),
-        updated_at=webhook.updated_at.isoformat(),
-    )
+    app_logger.info("Created webhook {} for URL: {}", webhook.id, webhook.url)
+
+    return WebhookResponse.model_validate(webhook)
 
 
 @router.get("/", response_model=WebhookListResponse)
@@ -96,22 +94,7 @@ async def list_webhooks(
         db=db, skip=skip, limit=limit, is_active=is_active
     )
 
-    webhook_responses = [
-        WebhookResponse(
-            id=w.id,
-            url=w.url,
-            events=w.events,
-            secret_key=w.secret_key,
-            is_active=w.is_active,
-            delivery_count=w.delivery_count,
-            failure_count=w.failure_count,
-            last_delivery_at=w.last_delivery_at.isoformat() if w.last_delivery_at else None,
-            last_failure_at=w.last_failure_at.isoformat() if w.last_failure_at else None,
-            created_at=w.created_at.isoformat(),
-            updated_at=w.updated_at.isoformat(),
-        )
-        for w in webhooks
-    ]
+    webhook_responses = [WebhookResponse.model_validate(w) for w in webhooks]
 
     return WebhookListResponse(
         webhooks=webhook_responses,
@@ -133,23 +116,7 @@ async def get_webhook(webhook_id: str, db: Session = Depends(get_db)):
             status_code=status.HTTP_404_NOT_FOUND, detail="Webhook not found"
         )
 
-    return WebhookResponse(
-        id=webhook.id,
-        url=webhook.url,
-        events=webhook.events,
-        secret_key=webhook.secret_key,
-        is_active=webhook.is_active,
-        delivery_count=webhook.delivery_count,
-        failure_count=webhook.failure_count,
-        last_delivery_at=(
-            webhook.last_delivery_at.isoformat() if webhook.last_delivery_at else None
-        ),
-        last_failure_at=(
-            webhook.last_failure_at.isoformat() if webhook.last_failure_at else None
-        ),
-        created_at=webhook.created_at.isoformat(),
-        updated_at=webhook.updated_at.isoformat(),
-    )
+    return WebhookResponse.model_validate(webhook)
 
 
 @router.put("/{webhook_id}", response_model=WebhookResponse)
@@ -164,12 +131,10 @@ async def update_webhook(
     - **is_active**: Enable/disable webhook (optional)
     """
     # Validate URL if provided
-    if webhook_data.url and not webhook_data.url.startswith(
-        ("http://", "https://")
-    ):
+    if webhook_data.url and not is_valid_webhook_url(webhook_data.url):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="URL must start with http:// or https://",
+            detail="URL must start with http:// or https:// and include a host",
         )
 
     # Validate events if provided
@@ -193,26 +158,11 @@ async def update_webhook(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Webhook not found"
         )
+    invalidate_subscriber_cache()
 
-    app_logger.info(f"Updated webhook {webhook_id}")
-
-    return WebhookResponse(
-        id=webhook.id,
-        url=webhook.url,
-        events=webhook.events,
-        secret_key=webhook.secret_key,
-        is_active=webhook.is_active,
-        delivery_count=webhook.delivery_count,
-        failure_count=webhook.failure_count,
-        last_delivery_at=(
-            webhook.last_delivery_at.isoformat() if webhook.last_delivery_at else None
-        ),
-        last_failure_at=(
-            webhook.last_failure_at.isoformat() if webhook.last_failure_at else None
-        ),
-        created_at=webhook.created_at.isoformat(),
-        updated_at=webhook.updated_at.isoformat(),
-    )
+    app_logger.info("Updated webhook {}", webhook_id)
+
+    return WebhookResponse.model_validate(webhook)
 
 
 @router.delete("/{webhook_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -226,8 +176,9 @@ async def delete_webhook(webhook_id: str, db: Session = Depends(get_db)):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Webhook not found"
         )
+    invalidate_subscriber_cache()
 
-    app_logger.info(f"Deleted webhook {webhook_id}")
+    app_logger.info("Deleted webhook {}", webhook_id)
     return None
 
 
@@ -256,11 +207,11 @@ async def test_webhook(webhook_id: str, db: Session = Depends(get_db)):
     )
 
     # Deliver webhook
-    start_time = time.time()
+    start_time = time.perf_counter()
     result = await deliver_webhook(webhook, test_payload, max_retries=1, timeout=10)
-    response_time_ms = (time.time() - start_time) * 1000
+    response_time_ms = (time.perf_counter() - start_time) * 1000
 
-    app_logger.info(f"Test webhook {webhook_id} delivery result: {result}")
+    app_logger.info("Test webhook {} delivery result: {}", webhook_id, result)
 
     return WebhookTestResponse(
         success=result["success"],
@@ -294,22 +245,7 @@ async def get_webhook_deliveries(
         db=db, webhook_id=webhook_id, skip=skip, limit=limit
     )
 
-    log_responses = [
-        WebhookDeliveryLogResponse(
-            id=log.id,
-            webhook_id=log.webhook_id,
-            event_type=log.event_type,
-            payload=log.payload,
-            status=log.status,
-            status_code=log.status_code,
-            response_body=log.response_body,
-            error_message=log.error_message,
-            attempt_count=log.attempt_count,
-            created_at=log.created_at.isoformat(),
-            delivered_at=log.delivered_at.isoformat() if log.delivered_at else None,
-        )
-        for log in logs
-    ]
+    log_responses = [WebhookDeliveryLogResponse.model_validate(log) for log in logs]
 
     return WebhookDeliveryLogsResponse(
         logs=log_responses,
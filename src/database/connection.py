@@ -3,7 +3,7 @@ Database connection management
 """
 
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 from contextlib import contextmanager
@@ -14,6 +14,26 @@ from src.utils.config import settings
 from src.utils.logger import app_logger
 
 
+# Applied to every new SQLite connection: WAL lets history reads run
+# alongside writes, and synchronous=NORMAL drops the fsync per commit
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Configure journaling and caching on a new SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
 # Create engine
 if settings.database_url.startswith("sqlite"):
     # SQLite specific configuration (local development)
@@ -23,6 +43,7 @@ if settings.database_url.startswith("sqlite"):
         poolclass=StaticPool,
         echo=settings.debug,
     )
+    event.listen(engine, "connect", _set_sqlite_pragmas)
     app_logger.info("Using SQLite database (local development)")
 else:
     # PostgreSQL configuration (production/Railway)
@@ -39,10 +60,10 @@ else:
     engine = create_engine(
         settings.database_url,
         connect_args=connect_args,
-        pool_pre_ping=True,  # Verify connections before using
-        pool_size=10,  # Number of connections to maintain
-        max_overflow=20,  # Maximum overflow connections
-        pool_recycle=3600,  # Recycle connections after 1 hour
+        pool_pre_ping=settings.db_pool_pre_ping,  # SELECT 1 on every checkout
+        pool_size=settings.db_pool_size,  # Number of connections to maintain
+        max_overflow=settings.db_max_overflow,  # Maximum overflow connections
+        pool_recycle=settings.db_pool_recycle,  # Recycle connections (seconds)
         echo=settings.debug,
     )
 
@@ -53,7 +74,9 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 def init_db():
     """Initialize database - create all tables"""
     try:
-        Base.metadata.create_all(bind=engine)
+        # One transaction so all CREATE statements commit together
+        with engine.begin() as conn:
+            Base.metadata.create_all(bind=conn)
         app_logger.info("Database initialized successfully")
     except Exception as e:
         app_logger.error(f"Error initializing database: {e}")
@@ -13,6 +13,7 @@ from sqlalchemy import (
     ForeignKey,
     JSON,
     Enum,
+    Index,
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -197,6 +198,14 @@ class Conversation(Base):
     feedback = relationship("Feedback", back_populates="conversation", uselist=False)
 
 
+# Composite index for per-user history lookups (newest first)
+conversation_user_created_index = Index(
+    "ix_conv_user_created",
+    Conversation.user_id,
+    Conversation.created_at.desc(),
+)
+
+
 class Message(Base):
     """Individual message in a conversation"""
 
@@ -355,7 +364,7 @@ class WebhookDelivery(Base):
 
     # Retry information
     attempt_count = Column(Integer, default=1)
-    next_retry_at = Column(DateTime)
+    next_retry_at = Column(DateTime, index=True)  # Set while status is 'pending'
 
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -4,7 +4,7 @@ Database query operations
 
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy import func, and_, or_
 
 from src.database.models import (
@@ -34,7 +34,7 @@ class UserQueries:
         db.add(user)
         db.commit()
         db.refresh(user)
-        app_logger.info(f"Created user: {user_id}")
+        app_logger.info("Created user: {}", user_id)
         return user
 
     @staticmethod
@@ -78,7 +78,7 @@ class ConversationQueries:
         db.add(conversation)
         db.commit()
         db.refresh(conversation)
-        app_logger.info(f"Created conversation: {conversation_id}")
+        app_logger.info("Created conversation: {}", conversation_id)
         return conversation
 
     @staticmethod
@@ -114,7 +114,7 @@ class ConversationQueries:
 
             db.commit()
             db.refresh(conversation)
-            app_logger.info(f"Updated conversation: {conversation_id}")
+            app_logger.info("Updated conversation: {}", conversation_id)
 
         return conversation
 
@@ -129,12 +129,19 @@ class ConversationQueries:
 
     @staticmethod
     def get_user_conversations(
-        db: Session, user_id: int, limit: int = 10
+        db: Session, user_id: int, limit: int = 10, columns: List = None
     ) -> List[Conversation]:
-        """Get recent conversations for a user"""
+        """
+        Get recent conversations for a user
+
+        Served by the (user_id, created_at DESC) index. Pass ``columns`` to
+        load only those attributes instead of every column.
+        """
+        query = db.query(Conversation)
+        if columns:
+            query = query.options(load_only(*columns))
         return (
-            db.query(Conversation)
-            .filter(Conversation.user_id == user_id)
+            query.filter(Conversation.user_id == user_id)
             .order_by(Conversation.created_at.desc())
             .limit(limit)
             .all()
@@ -171,14 +178,25 @@ class MessageQueries:
         return message
 
     @staticmethod
-    def get_conversation_messages(db: Session, conversation_id: int) -> List[Message]:
-        """Get all messages for a conversation"""
-        return (
-            db.query(Message)
-            .filter(Message.conversation_id == conversation_id)
-            .order_by(Message.created_at.asc())
+    def get_conversation_messages(
+        db: Session, conversation_id: int, limit: Optional[int] = None
+    ) -> List[Message]:
+        """
+        Get messages for a conversation, oldest first
+
+        Pass ``limit`` to load only the latest messages instead of the
+        whole conversation.
+        """
+        query = db.query(Message).filter(Message.conversation_id == conversation_id)
+        if limit is None:
+            return query.order_by(Message.created_at.asc()).all()
+        latest = (
+            query.order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(limit)
             .all()
         )
+        latest.reverse()
+        return latest
 
 
 class FeedbackQueries:
@@ -206,7 +224,7 @@ class FeedbackQueries:
         db.add(feedback)
         db.commit()
         db.refresh(feedback)
-        app_logger.info(f"Created feedback for conversation: {conversation_id}")
+        app_logger.info("Created feedback for conversation: {}", conversation_id)
         return feedback
 
     @staticmethod
@@ -379,7 +397,7 @@ class KnowledgeBaseQueries:
         db.add(article)
         db.commit()
         db.refresh(article)
-        app_logger.info(f"Created KB article: {title}")
+        app_logger.info("Created KB article: {}", title)
         return article
 
     @staticmethod
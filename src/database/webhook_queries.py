@@ -5,7 +5,8 @@ Database queries for webhook operations
 import uuid
 import secrets
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from sqlalchemy import Row, select
 from sqlalchemy.orm import Session
 
 from src.database.models import Webhook, WebhookDelivery
@@ -49,7 +50,7 @@ class WebhookQueries:
         db.commit()
         db.refresh(webhook)
 
-        app_logger.info(f"Created webhook {webhook_id} for URL: {url}")
+        app_logger.info("Created webhook {} for URL: {}", webhook_id, url)
         return webhook
 
     @staticmethod
@@ -72,10 +73,13 @@ class WebhookQueries:
         skip: int = 0,
         limit: int = 100,
         is_active: Optional[bool] = None,
-    ) -> List[Webhook]:
+    ) -> List[Row]:
         """
         List webhooks with pagination
 
+        Selects the table's columns directly, skipping ORM instance
+        construction and identity-map bookkeeping for each row.
+
         Args:
             db: Database session
             skip: Number of records to skip
@@ -83,14 +87,14 @@ class WebhookQueries:
             is_active: Filter by active status (None = all)
 
         Returns:
-            List of webhooks
+            List of read-only webhook rows (columns as attributes)
         """
-        query = db.query(Webhook)
+        query = select(Webhook.__table__)
 
         if is_active is not None:
-            query = query.filter(Webhook.is_active == is_active)
+            query = query.where(Webhook.is_active == is_active)
 
-        return query.offset(skip).limit(limit).all()
+        return db.execute(query.offset(skip).limit(limit)).all()
 
     @staticmethod
     def update_webhook(
@@ -128,7 +132,7 @@ class WebhookQueries:
         db.commit()
         db.refresh(webhook)
 
-        app_logger.info(f"Updated webhook {webhook_id}")
+        app_logger.info("Updated webhook {}", webhook_id)
         return webhook
 
     @staticmethod
@@ -150,7 +154,7 @@ class WebhookQueries:
         db.delete(webhook)
         db.commit()
 
-        app_logger.info(f"Deleted webhook {webhook_id}")
+        app_logger.info("Deleted webhook {}", webhook_id)
         return True
 
     @staticmethod
@@ -180,6 +184,21 @@ class WebhookQueries:
 
         return matching_webhooks
 
+    @staticmethod
+    def _count_delivery(db: Session, webhook_id: str, success: bool) -> None:
+        """Add a delivery to the webhook's statistics (in place, not committed)"""
+        now = datetime.utcnow()
+        values = {"delivery_count": Webhook.delivery_count + 1}
+        if success:
+            values["last_delivery_at"] = now
+        else:
+            values["failure_count"] = Webhook.failure_count + 1
+            values["last_failure_at"] = now
+
+        db.query(Webhook).filter(Webhook.id == webhook_id).update(
+            values, synchronize_session=False
+        )
+
     @staticmethod
     def update_delivery_stats(
         db: Session, webhook_id: str, success: bool
@@ -192,18 +211,58 @@ class WebhookQueries:
             webhook_id: Webhook UUID
             success: Whether delivery was successful
         """
-        webhook = WebhookQueries.get_webhook(db, webhook_id)
-        if not webhook:
-            return
+        WebhookQueries._count_delivery(db, webhook_id, success)
+        db.commit()
 
-        webhook.delivery_count += 1
+    @staticmethod
+    def record_delivery(
+        db: Session,
+        webhook_id: str,
+        event_type: str,
+        payload: dict,
+        status: str,
+        status_code: Optional[int] = None,
+        response_body: Optional[str] = None,
+        error_message: Optional[str] = None,
+        attempt_count: int = 1,
+        next_retry_at: Optional[datetime] = None,
+    ) -> None:
+        """
+        Log a delivery and update the webhook's statistics in one commit
 
-        if success:
-            webhook.last_delivery_at = datetime.utcnow()
-        else:
-            webhook.failure_count += 1
-            webhook.last_failure_at = datetime.utcnow()
+        Statistics are left alone while the delivery is 'pending'; they are
+        updated when its retry settles it (see update_delivery_log).
+
+        Args:
+            db: Database session
+            webhook_id: Webhook UUID
+            event_type: Type of event delivered
+            payload: Event payload
+            status: Delivery status ('success', 'failed', 'pending')
+            status_code: HTTP status code
+            response_body: Response from webhook endpoint
+            error_message: Error message if failed
+            attempt_count: Number of delivery attempts
+            next_retry_at: When to retry a 'pending' delivery
+        """
+        delivery = WebhookDelivery(
+            webhook_id=webhook_id,
+            event_type=event_type,
+            payload=payload,
+            status=status,
+            status_code=status_code,
+            response_body=response_body,
+            error_message=error_message,
+            attempt_count=attempt_count,
+            next_retry_at=next_retry_at,
+        )
 
+        if status == "success":
+            delivery.delivered_at = datetime.utcnow()
+
+        db.add(delivery)
+        if status != "pending":
+            WebhookQueries._count_delivery(db, webhook_id, status == "success")
         db.commit()
 
     @staticmethod
@@ -217,6 +276,7 @@ class WebhookQueries:
         response_body: Optional[str] = None,
         error_message: Optional[str] = None,
         attempt_count: int = 1,
+        next_retry_at: Optional[datetime] = None,
     ) -> WebhookDelivery:
         """
         Create a webhook delivery log entry
@@ -231,6 +291,7 @@ class WebhookQueries:
             response_body: Response from webhook endpoint
             error_message: Error message if failed
             attempt_count: Number of delivery attempts
+            next_retry_at: When to retry a 'pending' delivery
 
         Returns:
             Created delivery log
@@ -244,6 +305,7 @@ class WebhookQueries:
             response_body=response_body,
             error_message=error_message,
             attempt_count=attempt_count,
+            next_retry_at=next_retry_at,
         )
 
         if status == "success":
@@ -255,6 +317,116 @@ class WebhookQueries:
 
         return delivery
 
+    @staticmethod
+    def update_delivery_log(
+        db: Session,
+        delivery: WebhookDelivery,
+        status: str,
+        status_code: Optional[int] = None,
+        response_body: Optional[str] = None,
+        error_message: Optional[str] = None,
+        next_retry_at: Optional[datetime] = None,
+    ) -> WebhookDelivery:
+        """
+        Record the outcome of retrying a pending delivery
+
+        Once the delivery is settled (no longer 'pending'), the webhook's
+        statistics are updated in the same commit.
+
+        Args:
+            db: Database session
+            delivery: Delivery log entry being retried
+            status: Delivery status ('success', 'failed', 'pending')
+            status_code: HTTP status code
+            response_body: Response from webhook endpoint
+            error_message: Error message if failed
+            next_retry_at: When to retry again, if still 'pending'
+
+        Returns:
+            Updated delivery log
+        """
+        delivery.status = status
+        delivery.status_code = status_code
+        delivery.response_body = response_body
+        delivery.error_message = error_message
+        delivery.attempt_count += 1
+        delivery.next_retry_at = next_retry_at
+
+        if status == "success":
+            delivery.delivered_at = datetime.utcnow()
+
+        if status != "pending":
+            WebhookQueries._count_delivery(db, delivery.webhook_id, status == "success")
+        db.commit()
+
+        return delivery
+
+    @staticmethod
+    def get_due_deliveries(
+        db: Session, now: datetime, limit: int = 100
+    ) -> List[Tuple[int, datetime]]:
+        """
+        Get pending deliveries whose retry time has passed
+
+        Returns plain values rather than entities: claims must compare
+        against the retry time read here, not one reloaded after another
+        process has leased the delivery.
+
+        Args:
+            db: Database session
+            now: Current UTC time
+            limit: Maximum number of records to return
+
+        Returns:
+            (delivery ID, retry time) of due deliveries, oldest retry first
+        """
+        rows = (
+            db.query(WebhookDelivery.id, WebhookDelivery.next_retry_at)
+            .filter(
+                WebhookDelivery.status == "pending",
+                WebhookDelivery.next_retry_at <= now,
+            )
+            .order_by(WebhookDelivery.next_retry_at)
+            .limit(limit)
+            .all()
+        )
+        return [(delivery_id, due_at) for delivery_id, due_at in rows]
+
+    @staticmethod
+    def claim_delivery(
+        db: Session, delivery_id: int, due_at: datetime, lease_until: datetime
+    ) -> Optional[WebhookDelivery]:
+        """
+        Claim a due delivery by pushing its retry time back
+
+        Only one process succeeds for a given retry time, so API workers
+        sharing the database don't deliver the same retry twice. If the
+        claiming process dies, the delivery is retried after the lease.
+
+        Args:
+            db: Database session
+            delivery_id: Due delivery log entry ID
+            due_at: Retry time read by get_due_deliveries
+            lease_until: Retry time to set while the delivery is in flight
+
+        Returns:
+            The claimed delivery, or None if another process claimed it
+        """
+        claimed = (
+            db.query(WebhookDelivery)
+            .filter(
+                WebhookDelivery.id == delivery_id,
+                WebhookDelivery.status == "pending",
+                WebhookDelivery.next_retry_at == due_at,
+            )
+            .update({"next_retry_at": lease_until}, synchronize_session=False)
+        )
+        db.commit()
+
+        if claimed != 1:
+            return None
+        return db.get(WebhookDelivery, delivery_id)
+
     @staticmethod
     def get_delivery_logs(
         db: Session,
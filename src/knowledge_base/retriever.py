@@ -3,7 +3,11 @@ Knowledge Base Retriever for searching and retrieving relevant FAQs
 """
 
 from typing import List, Dict, Any, Optional
-from src.knowledge_base.vector_store import VectorStore, load_faqs_from_json
+from src.knowledge_base.vector_store import (
+    VectorStore,
+    compute_content_hash,
+    load_faqs_from_json,
+)
 from src.utils.logger import app_logger
 
 
@@ -33,22 +37,43 @@ class KnowledgeBaseRetriever:
             self.load_faqs()
 
     def load_faqs(self) -> None:
-        """Load FAQs into the vector store"""
+        """
+        Load FAQs into the vector store
+
+        Re-embeds only when the FAQ file or model changed since the
+        persisted index was built.
+        """
         try:
-            app_logger.info(f"Loading FAQs from {self.faq_path}")
+            content_hash = compute_content_hash(
+                self.vector_store.model_name, self.faq_path
+            )
+            if (
+                self.vector_store.index is not None
+                and self.vector_store.content_hash == content_hash
+            ):
+                app_logger.info(
+                    "Knowledge base index is up to date with {}, "
+                    "skipping re-embedding",
+                    self.faq_path,
+                )
+                return
+
+            app_logger.info("Loading FAQs from {}", self.faq_path)
             documents = load_faqs_from_json(self.faq_path)
 
             if documents:
+                # Rebuild from scratch so stale documents are not duplicated
+                self.vector_store.clear()
                 self.vector_store.add_documents(documents)
-                self.vector_store.save()
-                app_logger.info(f"Successfully loaded {len(documents)} FAQs")
+                self.vector_store.save(content_hash=content_hash)
+                app_logger.info("Successfully loaded {} FAQs", len(documents))
             else:
                 app_logger.warning("No FAQs found to load")
 
         except FileNotFoundError:
             app_logger.warning(f"FAQ file not found: {self.faq_path}")
         except Exception as e:
-            app_logger.error(f"Error loading FAQs: {e}", exc_info=True)
+            app_logger.exception(f"Error loading FAQs: {e}")
 
     def retrieve(
         self,
@@ -69,9 +94,10 @@ class KnowledgeBaseRetriever:
         Returns:
             List of relevant FAQs with metadata
         """
-        app_logger.info(f"Retrieving FAQs for query: '{query[:100]}...'")
+        app_logger.info("Retrieving FAQs for query: '{}...'", query[:100])
 
-        # Search vector store
+        # Search vector store; the category filter is applied inside the
+        # FAISS search, so only that category's vectors are scored
         results = self.vector_store.search(query=query, k=k, category_filter=category)
 
         # Filter by minimum score
@@ -82,12 +108,60 @@ class KnowledgeBaseRetriever:
         ]
 
         app_logger.info(
-            f"Retrieved {len(filtered_results)} FAQs "
-            f"(filtered from {len(results)} by score >= {min_score})"
+            "Retrieved {} FAQs (filtered from {} by score >= {})",
+            len(filtered_results),
+            len(results),
+            min_score,
         )
 
         return filtered_results
 
+    def prefetch(self, query: str) -> None:
+        """
+        Encode a query before its category is known
+
+        The embedding lands in the vector store's query cache, so the
+        category-filtered retrieve() afterwards only runs the FAISS search.
+
+        Args:
+            query: User query
+        """
+        self.vector_store.embed_query(query)
+
+    def retrieve_batch(
+        self,
+        queries: List[str],
+        k: int = 3,
+        category: Optional[str] = None,
+        min_score: float = 0.3,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve relevant FAQs for several queries in one batched search
+
+        Args:
+            queries: List of user queries
+            k: Number of results to retrieve per query
+            category: Optional category filter
+            min_score: Minimum similarity score threshold
+
+        Returns:
+            One list of relevant FAQs per query, in input order
+        """
+        app_logger.info("Retrieving FAQs for {} queries", len(queries))
+
+        batch_results = self.vector_store.search_batch(
+            queries=queries, k=k, category_filter=category
+        )
+
+        return [
+            [
+                result
+                for result in results
+                if result.get("similarity_score", 0) >= min_score
+            ]
+            for results in batch_results
+        ]
+
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics about the knowledge base"""
         stats = self.vector_store.get_stats()
@@ -95,9 +169,8 @@ class KnowledgeBaseRetriever:
         return stats
 
     def reload_faqs(self) -> None:
-        """Reload FAQs from disk (useful for updates)"""
+        """Reload FAQs from disk (useful for updates), rebuilding only if changed"""
         app_logger.info("Reloading FAQs...")
-        self.vector_store.clear()
         self.load_faqs()
 
 
@@ -113,7 +186,7 @@ def get_kb_retriever(
 
     Args:
         faq_path: Path to FAQ JSON file
-        force_reload: Force reload of FAQs
+        force_reload: Reload FAQs, re-embedding only if the file changed
 
     Returns:
         KnowledgeBaseRetriever instance
@@ -4,15 +4,102 @@ Vector Store implementation using FAISS for similarity search
 
 import os
 import json
+import hashlib
 import pickle
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
 import numpy as np
 import faiss
-from sentence_transformers import SentenceTransformer
 
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+from src.utils.config import settings
 from src.utils.logger import app_logger
 
 
+# Default location of the persisted FAISS index (without extension)
+DEFAULT_INDEX_PATH = "./data/knowledge_base/faiss_index"
+
+# Marker written next to the index once it has been saved, holding the
+# document count
+KB_SENTINEL_NAME = ".kb_initialized"
+
+
+def get_sentinel_path(index_path: str = DEFAULT_INDEX_PATH) -> str:
+    """Path of the initialization marker for an index"""
+    return os.path.join(os.path.dirname(index_path), KB_SENTINEL_NAME)
+
+
+def read_kb_sentinel(index_path: str = DEFAULT_INDEX_PATH) -> Optional[int]:
+    """
+    Read the initialization marker without loading the index or encoder
+
+    Args:
+        index_path: Path of the FAISS index (without extension)
+
+    Returns:
+        Persisted document count, or None if the knowledge base has not
+        been saved (or is being rewritten)
+    """
+    try:
+        with open(get_sentinel_path(index_path), "r", encoding="utf-8") as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+# Loaded encoders, shared by every VectorStore in the process
+_encoders: Dict[Tuple[str, str], "SentenceTransformer"] = {}
+
+
+def get_encoder(
+    model_name: str, backend: Optional[str] = None
+) -> "SentenceTransformer":
+    """
+    Get or load a sentence transformer encoder
+
+    Non-torch backends (``onnx``, ``openvino``) run the exported graph on CPU
+    and fall back to PyTorch if the backend runtime is not installed.
+
+    Args:
+        model_name: Sentence transformer model name
+        backend: Inference backend, defaults to ``settings.embedding_backend``
+
+    Returns:
+        SentenceTransformer instance
+    """
+    backend = backend or settings.embedding_backend
+    key = (model_name, backend)
+
+    if key not in _encoders:
+        # Deferred: importing sentence_transformers pulls in torch
+        from sentence_transformers import SentenceTransformer
+
+        encoder = None
+        if backend != "torch":
+            try:
+                app_logger.info("Loading embedding model: {} ({})", model_name, backend)
+                model_kwargs = (
+                    {"provider": "CPUExecutionProvider"} if backend == "onnx" else None
+                )
+                encoder = SentenceTransformer(
+                    model_name, backend=backend, model_kwargs=model_kwargs
+                )
+            except Exception as e:
+                app_logger.warning(
+                    f"Could not load {backend} backend, falling back to torch: {e}"
+                )
+
+        if encoder is None:
+            app_logger.info("Loading embedding model: {}", model_name)
+            encoder = SentenceTransformer(model_name)
+
+        _encoders[key] = encoder
+
+    return _encoders[key]
+
+
 class VectorStore:
     """
     Vector Store for managing document embeddings and similarity search
@@ -22,7 +109,7 @@ class VectorStore:
     def __init__(
         self,
         model_name: str = "all-MiniLM-L6-v2",
-        index_path: str = "./data/knowledge_base/faiss_index",
+        index_path: str = DEFAULT_INDEX_PATH,
         metadata_path: str = "./data/knowledge_base/metadata.json",
     ):
         """
@@ -37,15 +124,28 @@ class VectorStore:
         self.index_path = index_path
         self.metadata_path = metadata_path
 
-        # Initialize sentence transformer model
-        app_logger.info(f"Loading embedding model: {model_name}")
-        self.encoder = SentenceTransformer(model_name)
+        # Initialize sentence transformer model (shared across instances)
+        self.encoder = get_encoder(model_name)
         self.embedding_dim = self.encoder.get_sentence_embedding_dimension()
 
         # Initialize FAISS index
         self.index: Optional[faiss.Index] = None
         self.documents: List[Dict[str, Any]] = []
 
+        # Hash of the (model, source) the persisted index was built from
+        self.content_hash: Optional[str] = None
+        self._index_read_only = False
+
+        # Per-category FAISS search parameters restricting a search to that
+        # category's vectors (see _index_categories)
+        self._category_params: Dict[str, Any] = {}
+
+        # Raw query embeddings for hot queries, shared by search and
+        # embed_query
+        self._encode_query = lru_cache(maxsize=settings.kb_query_cache_size)(
+            self._encode_query_uncached
+        )
+
         # Load existing index if available
         self.load()
 
@@ -64,14 +164,19 @@ class VectorStore:
         # Extract texts for embedding
         texts = [doc.get("text", "") for doc in documents]
 
-        app_logger.info(f"Generating embeddings for {len(texts)} documents...")
+        app_logger.info("Generating embeddings for {} documents...", len(texts))
         embeddings = self.encoder.encode(texts, show_progress_bar=True)
         embeddings = np.array(embeddings).astype("float32")
 
+        # Memory-mapped indexes are read-only; copy before modifying
+        if self.index is not None and self._index_read_only:
+            self.index = faiss.clone_index(self.index)
+            self._index_read_only = False
+
         # Create or update FAISS index
         if self.index is None:
             app_logger.info(
-                f"Creating new FAISS index with dimension {self.embedding_dim}"
+                "Creating new FAISS index with dimension {}", self.embedding_dim
             )
             self.index = faiss.IndexFlatL2(self.embedding_dim)
 
@@ -80,11 +185,78 @@ class VectorStore:
 
         # Store document metadata
         self.documents.extend(documents)
+        self._index_categories()
 
         app_logger.info(
-            f"Added {len(documents)} documents to vector store. Total: {len(self.documents)}"
+            "Added {} documents to vector store. Total: {}",
+            len(documents),
+            len(self.documents),
         )
 
+    def _encode_query_uncached(self, query: str) -> np.ndarray:
+        """Encode one query; wrapped in a per-instance LRU cache in __init__"""
+        embedding = np.asarray(self.encoder.encode([query]), dtype="float32")[0]
+        # Cached arrays are shared between callers
+        embedding.setflags(write=False)
+        return embedding
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Generate a normalized embedding for a single query
+
+        Args:
+            query: Query text
+
+        Returns:
+            1-D float32 embedding with unit L2 norm
+        """
+        embedding = self._encode_query(query)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm > 0 else embedding.copy()
+
+    def _index_categories(self) -> None:
+        """Build the per-category ID selectors used by filtered searches"""
+        ids_by_category: Dict[str, List[int]] = {}
+        for position, doc in enumerate(self.documents):
+            ids_by_category.setdefault(doc.get("category"), []).append(position)
+
+        self._category_params = {}
+        for category, ids in ids_by_category.items():
+            selector = faiss.IDSelectorBatch(np.asarray(ids, dtype="int64"))
+            params = faiss.SearchParameters(sel=selector)
+            # SearchParameters does not own the selector; keep both alive
+            self._category_params[category] = (params, selector, len(ids))
+
+    def _search_index(
+        self, query_embeddings: np.ndarray, k: int, category_filter: Optional[str]
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Run one FAISS search, scoring only the vectors of the filtered category
+
+        Args:
+            query_embeddings: 2-D float32 array, one row per query
+            k: Number of results to return per query
+            category_filter: Optional category to restrict the search to
+
+        Returns:
+            One list of similar documents with scores per query
+        """
+        if category_filter is None:
+            params, search_k = None, min(k, len(self.documents))
+        elif category_filter in self._category_params:
+            params, _, count = self._category_params[category_filter]
+            search_k = min(k, count)
+        else:
+            return [[] for _ in range(len(query_embeddings))]
+
+        distances, indices = self.index.search(
+            query_embeddings, search_k, params=params
+        )
+        return [
+            self._build_results(row_distances, row_indices)
+            for row_distances, row_indices in zip(distances, indices)
+        ]
+
     def search(
         self, query: str, k: int = 3, category_filter: Optional[str] = None
     ) -> List[Dict[str, Any]]:
@@ -103,41 +275,83 @@ class VectorStore:
             app_logger.warning("Vector store is empty")
             return []
 
-        # Generate query embedding
-        query_embedding = self.encoder.encode([query])
-        query_embedding = np.array(query_embedding).astype("float32")
+        # Generate query embedding (cached for repeated queries)
+        query_embedding = self._encode_query(query)[np.newaxis, :]
 
-        # Search in FAISS
-        # Search more than k if we need to filter
-        search_k = k * 3 if category_filter else k
-        distances, indices = self.index.search(
-            query_embedding, min(search_k, len(self.documents))
+        results = self._search_index(query_embedding, k, category_filter)[0]
+
+        app_logger.info(
+            "Found {} relevant documents for query: '{}...'", len(results), query[:50]
         )
+        return results
 
-        # Prepare results
-        results = []
-        for distance, idx in zip(distances[0], indices[0]):
-            if idx < len(self.documents):
-                doc = self.documents[idx].copy()
-                doc["similarity_score"] = float(
-                    1 / (1 + distance)
-                )  # Convert distance to similarity
+    def search_batch(
+        self,
+        queries: List[str],
+        k: int = 3,
+        category_filter: Optional[str] = None,
+        batch_size: int = 64,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search for similar documents for several queries at once
+
+        Encodes all queries in a single batched call and runs one FAISS search.
 
-                # Apply category filter if specified
-                if category_filter is None or doc.get("category") == category_filter:
-                    results.append(doc)
+        Args:
+            queries: List of query texts
+            k: Number of results to return per query
+            category_filter: Optional category to filter results
+            batch_size: Encoder batch size
 
-                # Stop if we have enough results
-                if len(results) >= k:
-                    break
+        Returns:
+            One list of similar documents with scores per query
+        """
+        if not queries:
+            return []
 
-        app_logger.info(
-            f"Found {len(results)} relevant documents for query: '{query[:50]}...'"
+        if self.index is None or len(self.documents) == 0:
+            app_logger.warning("Vector store is empty")
+            return [[] for _ in queries]
+
+        query_embeddings = self.encoder.encode(
+            queries, batch_size=batch_size, convert_to_numpy=True
         )
+        query_embeddings = np.asarray(query_embeddings, dtype="float32")
+
+        results = self._search_index(query_embeddings, k, category_filter)
+
+        app_logger.info("Batch searched {} queries", len(queries))
+        return results
+
+    def _build_results(
+        self, distances: np.ndarray, indices: np.ndarray
+    ) -> List[Dict[str, Any]]:
+        """Convert one row of FAISS output into scored documents"""
+        # Score the whole row at once; FAISS pads missing hits with -1
+        valid = (indices >= 0) & (indices < len(self.documents))
+        scores = 1.0 / (1.0 + distances[valid])  # Convert distance to similarity
+
+        results = []
+        for idx, score in zip(indices[valid].tolist(), scores.tolist()):
+            doc = self.documents[idx].copy()
+            doc["similarity_score"] = score
+            results.append(doc)
+
         return results
 
-    def save(self) -> None:
-        """Save FAISS index and metadata to disk"""
+    @property
+    def hash_path(self) -> str:
+        """Path of the content-hash sidecar written next to the index"""
+        return f"{self.index_path}.sha256"
+
+    def save(self, content_hash: Optional[str] = None) -> None:
+        """
+        Save FAISS index and metadata to disk
+
+        Args:
+            content_hash: Optional hash of the source data, stored in a
+                sidecar file so unchanged sources can skip re-embedding
+        """
         if self.index is None:
             app_logger.warning("No index to save")
             return
@@ -145,14 +359,30 @@ class VectorStore:
         # Create directory if it doesn't exist
         os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
 
+        # Invalidate the initialization marker while files are rewritten
+        sentinel_path = get_sentinel_path(self.index_path)
+        if os.path.exists(sentinel_path):
+            os.remove(sentinel_path)
+
         # Save FAISS index
         faiss.write_index(self.index, f"{self.index_path}.index")
-        app_logger.info(f"Saved FAISS index to {self.index_path}.index")
+        app_logger.info("Saved FAISS index to {}.index", self.index_path)
 
         # Save metadata
         with open(self.metadata_path, "w", encoding="utf-8") as f:
             json.dump(self.documents, f, indent=2, ensure_ascii=False)
-        app_logger.info(f"Saved metadata to {self.metadata_path}")
+        app_logger.info("Saved metadata to {}", self.metadata_path)
+
+        # Save content hash sidecar
+        if content_hash:
+            with open(self.hash_path, "w", encoding="utf-8") as f:
+                f.write(content_hash)
+        elif os.path.exists(self.hash_path):
+            os.remove(self.hash_path)
+        self.content_hash = content_hash
+
+        with open(sentinel_path, "w", encoding="utf-8") as f:
+            f.write(str(len(self.documents)))
 
     def load(self) -> bool:
         """
@@ -168,17 +398,27 @@ class VectorStore:
             return False
 
         try:
-            # Load FAISS index
-            self.index = faiss.read_index(index_file)
-            app_logger.info(f"Loaded FAISS index from {index_file}")
+            # Memory-map the FAISS index so pages load on demand and are
+            # shared between processes
+            self.index = faiss.read_index(
+                index_file, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+            )
+            self._index_read_only = True
+            app_logger.info("Loaded FAISS index from {}", index_file)
 
             # Load metadata
             with open(self.metadata_path, "r", encoding="utf-8") as f:
                 self.documents = json.load(f)
+            self._index_categories()
             app_logger.info(
-                f"Loaded {len(self.documents)} documents from {self.metadata_path}"
+                "Loaded {} documents from {}", len(self.documents), self.metadata_path
             )
 
+            # Load content hash sidecar if present
+            if os.path.exists(self.hash_path):
+                with open(self.hash_path, "r", encoding="utf-8") as f:
+                    self.content_hash = f.read().strip() or None
+
             return True
         except Exception as e:
             app_logger.error(f"Error loading index: {e}")
@@ -188,6 +428,9 @@ class VectorStore:
         """Clear the vector store"""
         self.index = None
         self.documents = []
+        self.content_hash = None
+        self._index_read_only = False
+        self._category_params = {}
         app_logger.info("Cleared vector store")
 
     def get_stats(self) -> Dict[str, Any]:
@@ -200,6 +443,26 @@ class VectorStore:
         }
 
 
+def compute_content_hash(model_name: str, file_path: str) -> str:
+    """
+    Hash a source file together with the embedding model name
+
+    Embeddings are a pure function of (model, text), so an unchanged hash
+    means a persisted index can be reused as is.
+
+    Args:
+        model_name: Sentence transformer model name
+        file_path: Path to the source file
+
+    Returns:
+        SHA-256 hex digest
+    """
+    digest = hashlib.sha256(model_name.encode("utf-8"))
+    with open(file_path, "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
 def load_faqs_from_json(file_path: str) -> List[Dict[str, Any]]:
     """
     Load FAQs from JSON file and prepare for indexing
@@ -227,5 +490,5 @@ def load_faqs_from_json(file_path: str) -> List[Dict[str, Any]]:
         }
         documents.append(doc)
 
-    app_logger.info(f"Loaded {len(documents)} FAQs from {file_path}")
+    app_logger.info("Loaded {} FAQs from {}", len(documents), file_path)
     return documents
@@ -3,18 +3,76 @@ Multi-Agent HR Intelligence Platform - Main Orchestrator
 Version: 3.0.0
 """
 
-from typing import Dict, Any, Optional
+import asyncio
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    Optional,
+    Tuple,
+    Union,
+)
 from datetime import datetime
+from threading import Lock, Thread
+
+import numpy as np
+
+try:
+    import uvloop
+except ImportError:  # Not available on Windows
+    uvloop = None
 
 from src.agents.workflow import get_workflow
-from src.agents.state import ConversationContext
+from src.agents.escalation_agent import check_escalation, escalate_to_human
+from src.agents.llm_manager import get_llm_manager
+from src.agents.sentiment_analyzer import get_sentiment_classifier
+from src.agents.state import ConversationContext, new_history
+from src.knowledge_base.retriever import get_kb_retriever
 from src.database import (
+    Conversation,
     get_db_context,
     UserQueries,
     ConversationQueries,
     MessageQueries,
 )
-from src.utils import app_logger, generate_conversation_id, format_response, Timer
+from src.utils import (
+    app_logger,
+    generate_conversation_id,
+    format_response,
+    Timer,
+    SemanticCache,
+    calculate_priority_score,
+    settings,
+)
+
+# Workflow result fields kept in the semantic cache
+CACHED_RESULT_KEYS = (
+    "category",
+    "sentiment",
+    "priority_score",
+    "kb_results",
+    "response",
+    "should_escalate",
+    "escalation_reason",
+    "extra_metadata",
+)
+
+# Workflow result fields recomputed for the current user on a cache hit
+USER_DEPENDENT_KEYS = ("priority_score", "should_escalate", "escalation_reason")
+
+# Recent conversations loaded as history, and messages kept from each
+HISTORY_CONVERSATIONS = 5
+HISTORY_MESSAGES_PER_CONVERSATION = 3
+
+# Queued after the last streamed chunk (see CustomerSupportAgent.astream_query)
+_STREAM_END = object()
+
+
+def normalize_query(query: Optional[str]) -> Optional[str]:
+    """Lowercase a query and collapse its whitespace, for comparisons"""
+    return " ".join(query.lower().split()) if query else None
 
 
 class CustomerSupportAgent:
@@ -27,8 +85,225 @@ class CustomerSupportAgent:
     def __init__(self):
         """Initialize the customer support agent"""
         self.workflow = get_workflow()
+        # Build the shared LLM client now rather than on the first request
+        self.llm_manager = get_llm_manager()
+        self.semantic_cache: Optional[SemanticCache] = None
+        # Users (database IDs) whose past conversations are already cached
+        self._warmed_users = set()
+        self._warm_lock = Lock()
+        # Event loop the workflow runs on, started by _get_loop()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = Lock()
         app_logger.info("CustomerSupportAgent initialized")
 
+    def load_models(self) -> None:
+        """
+        Load the local sentiment model before the first query
+
+        On first start this exports and quantizes the model, which takes a
+        while, so it belongs in application startup rather than a request.
+        """
+        get_sentiment_classifier()
+
+    def warm_up(self) -> None:
+        """
+        Open the LLM API connections before the first query
+
+        Warms the sync pool (categorizer batches, scripts) and, on the
+        agent's event loop, the async pool used by the workflow nodes.
+        """
+        self.llm_manager.warm_up()
+        asyncio.run_coroutine_threadsafe(
+            self.llm_manager.awarm_up(), self._get_loop()
+        ).result()
+
+    def shutdown(self) -> None:
+        """
+        Close the LLM connection pools and stop the agent's event loop
+
+        Call once at process exit; the agent cannot process queries
+        afterwards.
+        """
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+
+        if loop is None:
+            asyncio.run(self.llm_manager.aclose())
+        else:
+            asyncio.run_coroutine_threadsafe(self.llm_manager.aclose(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+        self.llm_manager.close()
+        app_logger.info("CustomerSupportAgent shut down")
+
+    def _get_semantic_cache(self) -> Optional[SemanticCache]:
+        """Get the semantic cache, creating it on first use"""
+        if not settings.semantic_cache_enabled:
+            return None
+
+        if self.semantic_cache is None:
+            vector_store = get_kb_retriever().vector_store
+            self.semantic_cache = SemanticCache(
+                embedding_dim=vector_store.embedding_dim,
+                threshold=settings.semantic_cache_threshold,
+                max_size=settings.semantic_cache_max_size,
+                ttl_seconds=settings.semantic_cache_ttl_seconds,
+            )
+
+        return self.semantic_cache
+
+    def _warm_semantic_cache(self, cache: SemanticCache, user_db_id: int) -> None:
+        """Pre-populate the cache with a user's recent resolved conversations"""
+        with self._warm_lock:
+            if user_db_id in self._warmed_users:
+                return
+            self._warmed_users.add(user_db_id)
+
+        entries = []
+        with get_db_context() as db:
+            conversations = ConversationQueries.get_user_conversations(
+                db,
+                user_db_id,
+                limit=settings.semantic_cache_warm_limit,
+                columns=[
+                    Conversation.query,
+                    Conversation.response,
+                    Conversation.category,
+                    Conversation.sentiment,
+                    Conversation.priority_score,
+                    Conversation.status,
+                ],
+            )
+            # Oldest first, so each conversation follows the one before it
+            previous_query = None
+            for conv in reversed(conversations):
+                if conv.status == "Resolved" and conv.response:
+                    result = {
+                        "category": conv.category,
+                        "sentiment": conv.sentiment,
+                        "priority_score": conv.priority_score,
+                        "kb_results": [],
+                        "response": conv.response,
+                        "should_escalate": False,
+                        "escalation_reason": None,
+                        "extra_metadata": {},
+                    }
+                    entries.append((conv.query, previous_query, result))
+                previous_query = conv.query
+
+        if not entries:
+            return
+
+        encoder = get_kb_retriever().vector_store.encoder
+        embeddings = encoder.encode(
+            [query for query, _, _ in entries], normalize_embeddings=True
+        )
+        for embedding, (_, previous_query, result) in zip(embeddings, entries):
+            cache.put(
+                embedding,
+                (normalize_query(previous_query), result),
+                scope=user_db_id,
+            )
+
+        app_logger.info(
+            "Semantic cache warmed with {} conversations of user {}",
+            len(entries),
+            user_db_id,
+        )
+
+    def _lookup_semantic_cache(
+        self, query: str, user_db_id: int, previous_query: Optional[str]
+    ) -> Tuple[Optional[np.ndarray], Optional[Dict[str, Any]]]:
+        """
+        Look up a cached workflow result for a near-duplicate query
+
+        Only the user's own earlier answers are considered, and only if
+        they followed the same previous query (or the user is repeating
+        that query), since answers depend on the conversation so far.
+
+        Args:
+            query: Customer query text
+            user_db_id: User database ID the cache entries are scoped to
+            previous_query: The user's previous query, if any
+
+        Returns:
+            Tuple of (query embedding, cached result); the embedding is None
+            if the cache is disabled or unavailable, the result on a miss
+        """
+        try:
+            cache = self._get_semantic_cache()
+            if cache is None:
+                return None, None
+            self._warm_semantic_cache(cache, user_db_id)
+
+            embedding = get_kb_retriever().vector_store.embed_query(query)
+            cached = cache.get(embedding, scope=user_db_id)
+            if cached is None:
+                return embedding, None
+
+            cached_context, cached_result = cached
+            context = normalize_query(previous_query)
+            if context != cached_context and context != normalize_query(query):
+                return embedding, None
+            return embedding, cached_result
+        except Exception as e:
+            app_logger.warning(f"Semantic cache unavailable: {e}")
+            return None, None
+
+    @staticmethod
+    def _apply_cached_result(
+        state: Dict[str, Any], cached_result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Answer the current turn with a cached workflow result
+
+        Priority and escalation depend on the user's current context (VIP
+        status, repeat queries), so they are recomputed rather than reused;
+        an escalation replaces the cached answer with the handoff message.
+
+        Args:
+            state: Agent state for the current turn
+            cached_result: Cached workflow result
+
+        Returns:
+            Updated state, usable as the workflow result
+        """
+        for key, value in cached_result.items():
+            if key not in USER_DEPENDENT_KEYS:
+                state[key] = value
+
+        user_context = state.get("user_context") or {}
+        state["priority_score"] = calculate_priority_score(
+            sentiment=state.get("sentiment", "Neutral"),
+            category=state.get("category", "General"),
+            is_repeat_query=user_context.get("is_repeat_query", False),
+            is_vip=user_context.get("is_vip", False),
+        )
+        check_escalation(state)
+        if state["should_escalate"]:
+            escalate_to_human(state)
+
+        state["extra_metadata"] = {
+            **(cached_result.get("extra_metadata") or {}),
+            "semantic_cache_hit": True,
+        }
+        return state
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Get the agent's event loop, starting it on first use
+
+        All queries run on this one loop, in a daemon thread, so the async
+        LLM client's connection pool is only ever used from a single loop.
+        """
+        with self._loop_lock:
+            if self._loop is None:
+                loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+                Thread(
+                    target=loop.run_forever, name="agent-event-loop", daemon=True
+                ).start()
+                self._loop = loop
+        return self._loop
+
     def process_query(
         self,
         query: str,
@@ -39,6 +314,34 @@ class CustomerSupportAgent:
         """
         Process a customer support query
 
+        Blocks until the response is ready; async callers should await
+        ``aprocess_query`` instead.
+
+        Args:
+            query: Customer query text
+            user_id: User identifier
+            conversation_id: Optional existing conversation ID
+            user_context: Optional user context (VIP status, history, etc.)
+
+        Returns:
+            Response dictionary with all relevant information
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self._process_query(query, user_id, conversation_id, user_context),
+            self._get_loop(),
+        )
+        return future.result()
+
+    async def aprocess_query(
+        self,
+        query: str,
+        user_id: str = "anonymous",
+        conversation_id: Optional[str] = None,
+        user_context: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Process a customer support query without blocking the caller's event loop
+
         Args:
             query: Customer query text
             user_id: User identifier
@@ -48,7 +351,186 @@ class CustomerSupportAgent:
         Returns:
             Response dictionary with all relevant information
         """
-        app_logger.info(f"Processing query from user {user_id}: {query[:100]}...")
+        future = asyncio.run_coroutine_threadsafe(
+            self._process_query(query, user_id, conversation_id, user_context),
+            self._get_loop(),
+        )
+        return await asyncio.wrap_future(future)
+
+    async def astream_query(
+        self,
+        query: str,
+        user_id: str = "anonymous",
+        conversation_id: Optional[str] = None,
+        user_context: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[Union[str, Dict[str, Any]]]:
+        """
+        Process a customer support query, streaming the response text
+
+        Args:
+            query: Customer query text
+            user_id: User identifier
+            conversation_id: Optional existing conversation ID
+            user_context: Optional user context (VIP status, history, etc.)
+
+        Yields:
+            Response text chunks as they are generated, then the complete
+            response dictionary (as returned by ``aprocess_query``)
+        """
+        # Chunks are produced on the agent's loop and consumed on the caller's
+        caller_loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+
+        def on_token(chunk: str) -> None:
+            caller_loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+
+        future = asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(
+                self._process_query(
+                    query, user_id, conversation_id, user_context, on_token=on_token
+                ),
+                self._get_loop(),
+            )
+        )
+        # Scheduled after every chunk already queued by on_token
+        future.add_done_callback(lambda _: chunks.put_nowait(_STREAM_END))
+
+        while (chunk := await chunks.get()) is not _STREAM_END:
+            yield chunk
+        yield await future
+
+    @staticmethod
+    async def _forward_response(
+        result: Dict[str, Any], on_token: Callable[[str], None]
+    ) -> str:
+        """
+        Pass a workflow result's response to a streaming caller
+
+        Args:
+            result: Workflow result, with a response or a response_stream
+            on_token: Called with each chunk of response text
+
+        Returns:
+            The complete response text
+        """
+        stream = result.get("response_stream")
+        if stream is None:
+            response = result.get("response") or ""
+            on_token(response)
+            return response
+
+        parts = []
+        if hasattr(stream, "__aiter__"):
+            async for chunk in stream:
+                parts.append(chunk)
+                on_token(chunk)
+        else:
+            # Sync streams block on network reads, so pull them off the loop
+            while (chunk := await asyncio.to_thread(next, stream, None)) is not None:
+                parts.append(chunk)
+                on_token(chunk)
+        return "".join(parts).strip()
+
+    def _load_user(
+        self, user_id: str, user_context: Optional[Dict[str, Any]]
+    ) -> Tuple[int, Dict[str, Any], Deque[Dict[str, str]], Optional[str]]:
+        """
+        Get or create the user and load their recent conversation history
+
+        Returns:
+            Tuple of (user database ID, user context, conversation history,
+            the user's previous query or None)
+        """
+        with get_db_context() as db:
+            user = UserQueries.get_or_create_user(db, user_id)
+
+            # Get conversation history
+            recent_convs = ConversationQueries.get_user_conversations(
+                db,
+                user.id,
+                limit=HISTORY_CONVERSATIONS,
+                columns=[Conversation.id, Conversation.query],
+            )
+            previous_query = recent_convs[0].query if recent_convs else None
+            conversation_history = new_history()
+            # Conversations come newest first; history is kept oldest first
+            for conv in reversed(recent_convs):
+                # Only the messages kept are loaded, not the whole conversation
+                messages = MessageQueries.get_conversation_messages(
+                    db, conv.id, limit=HISTORY_MESSAGES_PER_CONVERSATION
+                )
+                for msg in messages:
+                    conversation_history.append(
+                        {"role": msg.role, "content": msg.content}
+                    )
+
+            # Prepare user context
+            # NOTE: attempt_count should only increment for the SAME query repeated
+            # Currently we don't have same-query detection, so default to 1
+            if not user_context:
+                user_context = {}
+            user_context["is_vip"] = user.is_vip
+            user_context["is_repeat_query"] = (
+                False  # TODO: Implement proper same-query detection
+            )
+            user_context["attempt_count"] = 1  # Always 1 unless same query detected
+
+            return user.id, user_context, conversation_history, previous_query
+
+    def _save_conversation(
+        self,
+        conversation_id: str,
+        user_db_id: int,
+        query: str,
+        result: Dict[str, Any],
+        processing_time: float,
+    ) -> None:
+        """Store the conversation, its response and both messages"""
+        with get_db_context() as db:
+            # Create conversation record
+            conversation = ConversationQueries.create_conversation(
+                db=db,
+                conversation_id=conversation_id,
+                user_id=user_db_id,
+                query=query,
+                category=result.get("category"),
+                sentiment=result.get("sentiment"),
+                priority_score=result.get("priority_score", 5),
+                extra_metadata=result.get("extra_metadata", {}),
+            )
+
+            # Update with response
+            ConversationQueries.update_conversation(
+                db=db,
+                conversation_id=conversation_id,
+                response=result.get("response"),
+                response_time=processing_time,
+                status="Escalated" if result.get("should_escalate") else "Resolved",
+                escalated=result.get("should_escalate", False),
+                escalation_reason=result.get("escalation_reason"),
+            )
+
+            # Add messages
+            MessageQueries.add_message(db, conversation.id, "user", query)
+            MessageQueries.add_message(
+                db, conversation.id, "assistant", result.get("response", "")
+            )
+
+    async def _process_query(
+        self,
+        query: str,
+        user_id: str,
+        conversation_id: Optional[str],
+        user_context: Optional[Dict[str, Any]],
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Process a query on the agent's event loop (see ``process_query``)
+
+        If ``on_token`` is given, the response is streamed to it as it is
+        generated (see ``astream_query``).
+        """
+        app_logger.info("Processing query from user {}: {}...", user_id, query[:100])
 
         # Start timer
         timer = Timer("Query Processing")
@@ -59,33 +541,13 @@ class CustomerSupportAgent:
             if not conversation_id:
                 conversation_id = generate_conversation_id()
 
-            # Get or create user in database
-            with get_db_context() as db:
-                user = UserQueries.get_or_create_user(db, user_id)
-                user_db_id = user.id
-
-                # Get conversation history
-                recent_convs = ConversationQueries.get_user_conversations(
-                    db, user.id, limit=5
-                )
-                conversation_history = []
-                for conv in recent_convs:
-                    messages = MessageQueries.get_conversation_messages(db, conv.id)
-                    for msg in messages[-3:]:  # Last 3 messages from each conversation
-                        conversation_history.append(
-                            {"role": msg.role, "content": msg.content}
-                        )
-
-                # Prepare user context
-                # NOTE: attempt_count should only increment for the SAME query repeated
-                # Currently we don't have same-query detection, so default to 1
-                if not user_context:
-                    user_context = {}
-                user_context["is_vip"] = user.is_vip
-                user_context["is_repeat_query"] = (
-                    False  # TODO: Implement proper same-query detection
-                )
-                user_context["attempt_count"] = 1  # Always 1 unless same query detected
+            # Get or create user in database (blocking I/O, off the loop)
+            (
+                user_db_id,
+                user_context,
+                conversation_history,
+                previous_query,
+            ) = await asyncio.to_thread(self._load_user, user_id, user_context)
 
             # Create conversation context
             context = ConversationContext(
@@ -99,20 +561,53 @@ class CustomerSupportAgent:
             # Convert to agent state
             state = context.to_state()
             state["user_db_id"] = user_db_id
+            state["stream"] = on_token is not None
 
-            # Run workflow
-            app_logger.info(f"Running workflow for conversation {conversation_id}")
-            result = self.workflow.invoke(state)
+            # Serve the user's near-duplicate queries from the semantic cache
+            query_embedding, cached_result = await asyncio.to_thread(
+                self._lookup_semantic_cache, query, user_db_id, previous_query
+            )
+
+            if cached_result is not None:
+                app_logger.info(
+                    "Semantic cache hit for conversation {}", conversation_id
+                )
+                result = self._apply_cached_result(state, cached_result)
+            else:
+                # Run workflow
+                app_logger.info("Running workflow for conversation {}", conversation_id)
+                result = await self.workflow.ainvoke(state)
+
+            if on_token is not None:
+                result["response"] = await self._forward_response(result, on_token)
+
+            # Escalated answers are handoff messages and fallbacks stand in
+            # for failed LLM calls, so never reuse either
+            if (
+                cached_result is None
+                and query_embedding is not None
+                and not result.get("should_escalate")
+                and not (result.get("extra_metadata") or {}).get("fallback")
+            ):
+                self.semantic_cache.put(
+                    query_embedding,
+                    (
+                        normalize_query(previous_query),
+                        {key: result.get(key) for key in CACHED_RESULT_KEYS},
+                    ),
+                    scope=user_db_id,
+                )
 
             # Debug logging for kb_results
-            app_logger.info(f"[MAIN DEBUG] Result keys: {list(result.keys())}")
+            app_logger.debug("[MAIN DEBUG] Result keys: {}", list(result.keys()))
             kb_results_from_workflow = result.get("kb_results", [])
-            app_logger.info(
-                f"[MAIN DEBUG] KB results from workflow: {len(kb_results_from_workflow)} items"
+            app_logger.debug(
+                "[MAIN DEBUG] KB results from workflow: {} items",
+                len(kb_results_from_workflow),
             )
             if kb_results_from_workflow:
-                app_logger.info(
-                    f"[MAIN DEBUG] First KB result: {kb_results_from_workflow[0]}"
+                app_logger.debug(
+                    "[MAIN DEBUG] First KB result: {}", kb_results_from_workflow[0]
                 )
 
             # Stop timer
@@ -120,40 +615,20 @@ class CustomerSupportAgent:
             processing_time = timer.elapsed
 
             # Save to database
-            with get_db_context() as db:
-                # Create conversation record
-                conversation = ConversationQueries.create_conversation(
-                    db=db,
-                    conversation_id=conversation_id,
-                    user_id=user_db_id,
-                    query=query,
-                    category=result.get("category"),
-                    sentiment=result.get("sentiment"),
-                    priority_score=result.get("priority_score", 5),
-                    extra_metadata=result.get("extra_metadata", {}),
-                )
-
-                # Update with response
-                ConversationQueries.update_conversation(
-                    db=db,
-                    conversation_id=conversation_id,
-                    response=result.get("response"),
-                    response_time=processing_time,
-                    status="Escalated" if result.get("should_escalate") else "Resolved",
-                    escalated=result.get("should_escalate", False),
-                    escalation_reason=result.get("escalation_reason"),
-                )
-
-                # Add messages
-                MessageQueries.add_message(db, conversation.id, "user", query)
-                MessageQueries.add_message(
-                    db, conversation.id, "assistant", result.get("response", "")
-                )
+            await asyncio.to_thread(
+                self._save_conversation,
+                conversation_id,
+                user_db_id,
+                query,
+                result,
+                processing_time,
+            )
 
             # Format response
             kb_results_for_metadata = result.get("kb_results", [])
-            app_logger.info(
-                f"[MAIN DEBUG] Passing {len(kb_results_for_metadata)} KB results to metadata"
+            app_logger.debug(
+                "[MAIN DEBUG] Passing {} KB results to metadata",
+                len(kb_results_for_metadata),
             )
 
             response = format_response(
@@ -171,15 +646,16 @@ class CustomerSupportAgent:
                 },
             )
 
-            app_logger.info(
-                f"[MAIN DEBUG] Response metadata contains kb_results: {'kb_results' in response.get('metadata', {})}"
+            app_logger.debug(
+                "[MAIN DEBUG] Response metadata contains kb_results: {}",
+                "kb_results" in response.get("metadata", {}),
             )
 
-            app_logger.info(f"Query processed successfully in {processing_time:.2f}s")
+            app_logger.info("Query processed successfully in {:.2f}s", processing_time)
             return response
 
         except Exception as e:
-            app_logger.error(f"Error processing query: {e}", exc_info=True)
+            app_logger.exception(f"Error processing query: {e}")
 
             # Return error response
             return {
@@ -209,7 +685,18 @@ class CustomerSupportAgent:
                 return []
 
             conversations = ConversationQueries.get_user_conversations(
-                db, user.id, limit
+                db,
+                user.id,
+                limit,
+                columns=[
+                    Conversation.conversation_id,
+                    Conversation.query,
+                    Conversation.response,
+                    Conversation.category,
+                    Conversation.sentiment,
+                    Conversation.created_at,
+                    Conversation.escalated,
+                ],
             )
 
             history = []
@@ -239,3 +726,11 @@ def get_customer_support_agent() -> CustomerSupportAgent:
     if _agent is None:
         _agent = CustomerSupportAgent()
     return _agent
+
+
+def shutdown_customer_support_agent() -> None:
+    """Shut down the customer support agent singleton, if it was created"""
+    global _agent
+    if _agent is not None:
+        _agent.shutdown()
+        _agent = None
@@ -57,10 +57,11 @@ def initialize_system():
         app_logger.info("Initializing Multi-Agent HR Intelligence Platform system...")
         init_db()
         agent = get_customer_support_agent()
+        agent.load_models()
         app_logger.info("System initialized successfully!")
         return "System Ready", "[OK] Online"
     except Exception as e:
-        app_logger.error(f"Failed to initialize system: {e}", exc_info=True)
+        app_logger.exception(f"Failed to initialize system: {e}")
         return f"Initialization Error: {str(e)}", "[FAIL] Offline"
 
 
@@ -177,11 +178,11 @@ def process_message(message: str, history: List[Tuple[str, str]], user_id: str):
         session_state.current_user_id = user_id if user_id.strip() else "anonymous"
 
         # Process query
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = agent.process_query(
             query=message, user_id=session_state.current_user_id
         )
-        processing_time = time.time() - start_time
+        processing_time = time.perf_counter() - start_time
 
         # Debug: Print entire result structure
         print("\n" + "=" * 70)
@@ -217,10 +218,10 @@ def process_message(message: str, history: List[Tuple[str, str]], user_id: str):
         print("=" * 70 + "\n")
 
         # Debug logging for kb_results
-        app_logger.info(f"[UI DEBUG] Metadata keys: {list(metadata.keys())}")
-        app_logger.info(f"[UI DEBUG] KB results count: {len(kb_results)}")
+        app_logger.info("[UI DEBUG] Metadata keys: {}", list(metadata.keys()))
+        app_logger.info("[UI DEBUG] KB results count: {}", len(kb_results))
         if kb_results:
-            app_logger.info(f"[UI DEBUG] First KB result: {kb_results[0]}")
+            app_logger.info("[UI DEBUG] First KB result: {}", kb_results[0])
         else:
             app_logger.info("[UI DEBUG] No KB results found in metadata")
 
@@ -284,7 +285,7 @@ def process_message(message: str, history: List[Tuple[str, str]], user_id: str):
         )
 
     except Exception as e:
-        app_logger.error(f"Error processing message: {e}", exc_info=True)
+        app_logger.exception(f"Error processing message: {e}")
         error_response = f"Error: {str(e)}"
         history.append((message, error_response))
         return history, "", "", "", 0, "", "", "", ""
@@ -19,6 +19,7 @@ def init_agent():
     global agent
     if agent is None:
         agent = get_customer_support_agent()
+        agent.load_models()
     return agent
 
 
@@ -139,10 +140,7 @@ def process_message(message: str, history: List[Tuple[str, str]]):
         return history, metadata_html, kb_html
 
     except Exception as e:
-        app_logger.error(f"Error processing message: {e}")
-        import traceback
-
-        traceback.print_exc()
+        app_logger.exception(f"Error processing message: {e}")
 
         error_msg = f"Error: {str(e)}"
         history = history + [[message, error_msg]]
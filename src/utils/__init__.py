@@ -8,12 +8,15 @@ from src.utils.helpers import (
     generate_conversation_id,
     calculate_priority_score,
     should_escalate,
+    compile_keyword_pattern,
     format_response,
     parse_llm_category,
     parse_llm_sentiment,
     truncate_text,
     Timer,
 )
+from src.utils.semantic_cache import SemanticCache
+from src.utils.response_cache import ResponseCache
 
 __all__ = [
     "settings",
@@ -22,9 +25,12 @@ __all__ = [
     "generate_conversation_id",
     "calculate_priority_score",
     "should_escalate",
+    "compile_keyword_pattern",
     "format_response",
     "parse_llm_category",
     "parse_llm_sentiment",
     "truncate_text",
     "Timer",
+    "SemanticCache",
+    "ResponseCache",
 ]
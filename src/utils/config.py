@@ -20,6 +20,15 @@ class Settings(BaseSettings):
     database_url: str = os.getenv("DATABASE_URL", "sqlite:///./smartsupport.db")
     redis_url: str = "redis://localhost:6379/0"
 
+    # Connection pool (PostgreSQL, per process)
+    db_pool_size: int = 5
+    db_max_overflow: int = 5
+    db_pool_recycle: int = 1800
+    # Test each connection with a round-trip on checkout, so connections
+    # dropped by the server or a proxy are replaced instead of failing a
+    # request; deployments with reliable connections can turn it off
+    db_pool_pre_ping: bool = True
+
     # Application
     app_name: str = "Multi-Agent HR Intelligence Platform"
     app_version: str = "1.0.0"
@@ -33,16 +42,108 @@ class Settings(BaseSettings):
     # Security
     secret_key: str
     algorithm: str = "HS256"
+    # Browser origins allowed to call the API, comma-separated ("*": any
+    # origin, but then without credentials)
+    cors_origins: str = "http://localhost:7860,http://127.0.0.1:7860"
     access_token_expire_minutes: int = 30
 
     # LLM Configuration
     llm_model: str = "llama-3.3-70b-versatile"
     llm_temperature: float = 0.0
     llm_max_tokens: int = 1000
+    # Per-specialist model tiers: FAQ-like categories use the fast model,
+    # the others llm_model ("balanced") or the strong model
+    llm_model_tiers_enabled: bool = True
+    llm_fast_model: str = "llama-3.1-8b-instant"
+    llm_strong_model: str = "llama-3.3-70b-versatile"
+
+    # Pooled HTTP connections to the LLM API (HTTP/2 needs the h2 package)
+    llm_max_connections: int = 64
+    llm_max_keepalive_connections: int = 32
+    llm_http2: bool = True
+    # Seconds; the connect timeout is short so an unreachable API fails fast
+    llm_request_timeout: float = 60.0
+    llm_connect_timeout: float = 5.0
+    # Open the LLM API connections at API startup (no tokens spent)
+    llm_warmup_enabled: bool = True
+
+    # Exact-match LLM response cache (identical formatted prompts)
+    llm_response_cache_enabled: bool = True
+    llm_response_cache_max_size: int = 2048
+    llm_response_cache_ttl_seconds: int = 3600
+
+    # Categorizer micro-batching (batch size 1 disables it)
+    categorizer_batch_size: int = 16
+    categorizer_batch_wait_ms: int = 25
+
+    # Embeddings ("torch", "onnx" or "openvino")
+    embedding_backend: str = "onnx"
+
+    # Query embeddings kept in memory for repeated KB searches
+    kb_query_cache_size: int = 1024
+
+    # VADER lexicon scoring, tried before the local model; it only settles
+    # clearly positive queries (compound score >= threshold, no negative word
+    # and within the word limit), everything else moves on to the next stage
+    sentiment_lexicon_enabled: bool = True
+    sentiment_lexicon_max_words: int = 40
+    sentiment_lexicon_positive_threshold: float = 0.7
+
+    # Local sentiment classifier; low-confidence and negative queries go to the LLM
+    sentiment_model_enabled: bool = True
+    sentiment_model: str = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+    sentiment_backend: str = "onnx"  # "onnx" or "torch"
+    # int8 ONNX exports are written here once and reused across restarts
+    sentiment_model_dir: str = "./models/sentiment"
+    sentiment_model_min_confidence: float = 0.6
+
+    # Conversation history summarization: with more than min_messages, older
+    # turns are summarized and only the recent ones are sent verbatim
+    history_summary_enabled: bool = True
+    history_summary_min_messages: int = 6
+    history_recent_messages: int = 2
+    history_summary_max_tokens: int = 80
+
+    # Semantic query cache
+    semantic_cache_enabled: bool = True
+    semantic_cache_threshold: float = 0.95
+    semantic_cache_max_size: int = 1000
+    semantic_cache_ttl_seconds: int = 3600
+    # Recent conversations of a user cached on their first query
+    semantic_cache_warm_limit: int = 20
+
+    # Exact-match cache of API responses per (user, normalized query)
+    query_response_cache_enabled: bool = True
+    query_response_cache_max_size: int = 2048
+    query_response_cache_ttl_seconds: int = 300
+
+    # Pooled HTTP connections for webhook delivery (seconds per request)
+    webhook_max_connections: int = 200
+    webhook_max_keepalive_connections: int = 100
+    webhook_timeout: float = 10.0
+    # Queued webhook events and the workers delivering them concurrently
+    webhook_queue_size: int = 10000
+    webhook_workers: int = 4
+    # Deliveries in flight at once across all workers (<= max connections)
+    webhook_max_concurrent_deliveries: int = 64
+    # Failed deliveries are retried from the delivery log with exponential
+    # backoff (seconds before the first retry, doubling each time)
+    webhook_max_attempts: int = 3
+    webhook_retry_backoff_seconds: int = 30
+    webhook_retry_poll_seconds: int = 5
+    # Seconds an event's "has subscribers" lookup is reused
+    webhook_subscriber_cache_ttl_seconds: int = 30
+
+    # Shared agent service (one agent process, thin clients). Listens on a
+    # Unix socket only its owner can open; clients must present the authkey
+    agent_service_socket: str = "./agent_service.sock"
+    agent_service_authkey: Optional[str] = None
 
     # Logging
     log_level: str = "INFO"
     log_file: str = "./logs/app.log"
+    # Write log sinks from a background thread instead of the caller's
+    log_enqueue: bool = True
 
     # Rate Limiting
     rate_limit_per_minute: int = 60
@@ -3,9 +3,11 @@ Utility helper functions
 """
 
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable
 import hashlib
 import json
+import re
+import time
 
 
 def generate_conversation_id() -> str:
@@ -123,6 +125,35 @@ def should_escalate(
     return should_escalate_flag, escalation_reason
 
 
+def compile_keyword_pattern(
+    keywords: Iterable[str], whole_words: bool = False
+) -> re.Pattern:
+    """
+    Compile keywords into a single case-insensitive regex alternation
+
+    Build the pattern once at module level and call ``pattern.search(text)``
+    on the hot path instead of lowercasing the text and scanning it once per
+    keyword. By default matching is by substring, like
+    ``keyword in text.lower()``; words in multi-word keywords may be
+    separated by any whitespace.
+
+    Args:
+        keywords: Keywords or phrases to match
+        whole_words: Only match keywords not embedded in a longer word
+            (so "PTO" does not match "laptop")
+
+    Returns:
+        Compiled pattern
+    """
+    # Longest first so overlapping phrases prefer the most specific match
+    alternatives = sorted(set(keywords), key=len, reverse=True)
+    pattern = "|".join(r"\s+".join(map(re.escape, k.split())) for k in alternatives)
+    if whole_words:
+        # Lookarounds instead of \b so keywords like "401(k)" work too
+        pattern = rf"(?<!\w)(?:{pattern})(?!\w)"
+    return re.compile(pattern, re.IGNORECASE)
+
+
 def format_response(
     response: str,
     category: str,
@@ -143,10 +174,30 @@ def format_response(
     }
 
 
+# HR categories, keyed by lowercase name for exact-match parsing
+HR_CATEGORIES = {
+    category.lower(): category
+    for category in (
+        "Recruitment",
+        "Payroll",
+        "Benefits",
+        "Policy",
+        "LeaveManagement",
+        "Performance",
+        "General",
+    )
+}
+
+
 def parse_llm_category(raw_category: str) -> str:
     """Parse and standardize category from LLM response - HR Domain"""
     category_lower = raw_category.lower().strip()
 
+    # The model usually answers with just the category name
+    exact = HR_CATEGORIES.get(category_lower)
+    if exact is not None:
+        return exact
+
     if "recruit" in category_lower or "hiring" in category_lower or "job" in category_lower or "interview" in category_lower:
         return "Recruitment"
     elif "payroll" in category_lower or "salary" in category_lower or "pay" in category_lower or "w-2" in category_lower or "w2" in category_lower:
@@ -208,12 +259,12 @@ class Timer:
         self.elapsed = None
 
     def __enter__(self):
-        self.start_time = datetime.now()
+        self.start_time = time.perf_counter()
         return self
 
     def __exit__(self, *args):
-        self.end_time = datetime.now()
-        self.elapsed = (self.end_time - self.start_time).total_seconds()
+        self.end_time = time.perf_counter()
+        self.elapsed = self.end_time - self.start_time
 
     def __str__(self):
         return f"{self.name}: {self.elapsed:.3f}s"
@@ -9,7 +9,12 @@ from src.utils.config import settings
 
 
 def setup_logger():
-    """Configure application logger"""
+    """
+    Configure application logger
+
+    With settings.log_enqueue, sinks are written by a background thread,
+    so a slow console or disk doesn't stall the request that logged.
+    """
 
     # Remove default handler
     logger.remove()
@@ -20,6 +25,7 @@ def setup_logger():
         colorize=True,
         format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
         level=settings.log_level,
+        enqueue=settings.log_enqueue,
     )
 
     # File handler
@@ -33,6 +39,7 @@ def setup_logger():
         compression="zip",
         format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
         level=settings.log_level,
+        enqueue=settings.log_enqueue,
     )
 
     return logger
@@ -0,0 +1,180 @@
+"""
+Semantic query cache using random-projection LSH over query embeddings
+"""
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    In-memory cache that serves near-duplicate queries by embedding similarity
+
+    Embeddings are bucketed with random-hyperplane LSH (several tables of
+    ``n_bits`` each) so a lookup only scores a handful of candidates instead
+    of every cached entry. Entries are evicted LRU-first and expire after
+    ``ttl_seconds``. Entries stored under a ``scope`` (e.g. a user) are only
+    served to lookups in the same scope.
+    """
+
+    def __init__(
+        self,
+        embedding_dim: int,
+        threshold: float = 0.95,
+        max_size: int = 1000,
+        ttl_seconds: float = 3600,
+        n_tables: int = 8,
+        n_bits: int = 16,
+        seed: int = 42,
+    ):
+        """
+        Initialize the semantic cache
+
+        Args:
+            embedding_dim: Dimension of the query embeddings
+            threshold: Minimum cosine similarity for a cache hit
+            max_size: Maximum number of cached entries
+            ttl_seconds: Time-to-live for each entry in seconds
+            n_tables: Number of LSH hash tables
+            n_bits: Number of hyperplanes (hash bits) per table
+            seed: Random seed for the hyperplanes
+        """
+        self.embedding_dim = embedding_dim
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+
+        rng = np.random.default_rng(seed)
+        # One (n_tables, n_bits, dim) stack of hyperplanes, hashed in a single matmul
+        self._planes = rng.standard_normal((n_tables, n_bits, embedding_dim)).astype(
+            "float32"
+        )
+        self._bit_weights = (1 << np.arange(n_bits, dtype=np.int64)).astype(np.int64)
+
+        # Per table: (scope, bucket id) -> entry keys
+        self._buckets: List[Dict[Tuple[Hashable, int], set]] = [
+            {} for _ in range(n_tables)
+        ]
+        # Entry key -> (vector, bucket keys, expiry, value)
+        self._entries: "OrderedDict[int, Tuple[np.ndarray, tuple, float, Any]]" = (
+            OrderedDict()
+        )
+        self._next_key = 0
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        """Return a flat, L2-normalized float32 copy of an embedding"""
+        vector = np.asarray(embedding, dtype="float32").reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _hash(
+        self, vector: np.ndarray, scope: Hashable
+    ) -> Tuple[Tuple[Hashable, int], ...]:
+        """Compute one (scope, LSH bucket id) key per table"""
+        bits = (self._planes @ vector) > 0  # (n_tables, n_bits)
+        return tuple((scope, int(h)) for h in bits.astype(np.int64) @ self._bit_weights)
+
+    def _remove(self, key: int) -> None:
+        """Drop an entry and its bucket references (lock must be held)"""
+        _, hashes, _, _ = self._entries.pop(key)
+        for table, bucket_id in zip(self._buckets, hashes):
+            bucket = table.get(bucket_id)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del table[bucket_id]
+
+    def get(self, embedding: np.ndarray, scope: Hashable = None) -> Optional[Any]:
+        """
+        Look up a cached value for a semantically similar query
+
+        Args:
+            embedding: Query embedding
+            scope: Only entries stored with this scope are considered
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        vector = self._normalize(embedding)
+        hashes = self._hash(vector, scope)
+        now = time.monotonic()
+
+        with self._lock:
+            candidates = set()
+            for table, bucket_id in zip(self._buckets, hashes):
+                candidates.update(table.get(bucket_id, ()))
+
+            best_key, best_score = None, self.threshold
+            for key in candidates:
+                cached_vector, _, expires_at, _ = self._entries[key]
+                if expires_at <= now:
+                    self._remove(key)
+                    continue
+                score = float(np.dot(vector, cached_vector))
+                if score >= best_score:
+                    best_key, best_score = key, score
+
+            if best_key is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(best_key)
+            self.hits += 1
+            return self._entries[best_key][3]
+
+    def put(self, embedding: np.ndarray, value: Any, scope: Hashable = None) -> None:
+        """
+        Store a value for a query embedding
+
+        Args:
+            embedding: Query embedding
+            value: Value to cache (e.g. workflow result)
+            scope: Scope the value may be served in (e.g. a user ID)
+        """
+        vector = self._normalize(embedding)
+        hashes = self._hash(vector, scope)
+
+        with self._lock:
+            key = self._next_key
+            self._next_key += 1
+
+            self._entries[key] = (
+                vector,
+                hashes,
+                time.monotonic() + self.ttl_seconds,
+                value,
+            )
+            for table, bucket_id in zip(self._buckets, hashes):
+                table.setdefault(bucket_id, set()).add(key)
+
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        """Remove all cached entries"""
+        with self._lock:
+            self._entries.clear()
+            for table in self._buckets:
+                table.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "threshold": self.threshold,
+        }
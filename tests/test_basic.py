@@ -4,6 +4,8 @@ import pytest
 from unittest.mock import Mock, patch
 import os
 
+from langchain_core.messages import AIMessage
+
 
 class TestImports:
     """Test that all modules can be imported"""
@@ -101,6 +103,295 @@ class TestHelpers:
         assert len(truncated) <= 53  # 50 + "..."
         assert truncated.endswith("...")
 
+    def test_compile_keyword_pattern(self):
+        """Test compiled keyword matching"""
+        from src.utils.helpers import compile_keyword_pattern
+
+        pattern = compile_keyword_pattern(["refund", "cancel subscription"])
+
+        assert pattern.search("I want a REFUND now")
+        assert pattern.search("please cancel  my subscription") is None
+        assert pattern.search("Please Cancel   Subscription")
+        assert pattern.search("billing question") is None
+
+    def test_parse_llm_category(self):
+        """Category names parse exactly; other replies fall back to keywords"""
+        from src.agents.workflow import ROUTE_MAP
+        from src.utils.helpers import HR_CATEGORIES, parse_llm_category
+
+        for category in HR_CATEGORIES.values():
+            assert parse_llm_category(f" {category.upper()}\n") == category
+        assert parse_llm_category("Category: Payroll.") == "Payroll"
+        assert parse_llm_category("no idea") == "General"
+
+        # Every category the parser can return has a route
+        assert set(ROUTE_MAP) == set(HR_CATEGORIES.values())
+
+
+class TestSemanticCache:
+    """Test semantic query cache"""
+
+    def test_hit_on_similar_embedding(self):
+        """Near-duplicate embeddings are served from cache"""
+        import numpy as np
+        from src.utils.semantic_cache import SemanticCache
+
+        cache = SemanticCache(embedding_dim=8, threshold=0.95)
+        embedding = np.arange(1, 9, dtype="float32")
+        cache.put(embedding, {"response": "cached"})
+
+        assert cache.get(embedding * 2) == {"response": "cached"}
+        assert cache.hits == 1
+
+    def test_miss_on_dissimilar_embedding(self):
+        """Unrelated embeddings miss"""
+        import numpy as np
+        from src.utils.semantic_cache import SemanticCache
+
+        cache = SemanticCache(embedding_dim=8, threshold=0.95)
+        cache.put(np.eye(8, dtype="float32")[0], "first")
+
+        assert cache.get(np.eye(8, dtype="float32")[1]) is None
+        assert cache.misses == 1
+
+    def test_lru_eviction_and_ttl(self):
+        """Oldest entries are evicted and expired entries are not served"""
+        import numpy as np
+        from src.utils.semantic_cache import SemanticCache
+
+        vectors = np.eye(8, dtype="float32")
+        cache = SemanticCache(embedding_dim=8, max_size=2)
+        for i in range(3):
+            cache.put(vectors[i], i)
+
+        assert len(cache) == 2
+        assert cache.get(vectors[0]) is None
+        assert cache.get(vectors[2]) == 2
+
+        expired = SemanticCache(embedding_dim=8, ttl_seconds=0)
+        expired.put(vectors[0], "stale")
+        assert expired.get(vectors[0]) is None
+
+    def test_entries_scoped_per_user(self):
+        """Entries stored for one scope are not served to another"""
+        import numpy as np
+        from src.utils.semantic_cache import SemanticCache
+
+        cache = SemanticCache(embedding_dim=8, threshold=0.95)
+        embedding = np.arange(1, 9, dtype="float32")
+        cache.put(embedding, "alice's answer", scope=1)
+
+        assert cache.get(embedding, scope=2) is None
+        assert cache.get(embedding) is None
+        assert cache.get(embedding, scope=1) == "alice's answer"
+
+    def test_cache_hit_rechecks_escalation(self):
+        """A cached answer is escalated when the current user needs it"""
+        from src.main import CustomerSupportAgent
+
+        state = {
+            "query": "I want a refund now, this is unacceptable",
+            "user_context": {"is_vip": True, "is_repeat_query": True},
+        }
+        cached_result = {
+            "category": "Billing",
+            "sentiment": "Angry",
+            "priority_score": 5,
+            "kb_results": [],
+            "response": "Refunds take 5-7 business days.",
+            "should_escalate": False,
+            "escalation_reason": None,
+            "extra_metadata": {},
+        }
+
+        result = CustomerSupportAgent._apply_cached_result(state, cached_result)
+
+        assert result["should_escalate"] is True
+        assert result["priority_score"] > cached_result["priority_score"]
+        assert result["response"] != cached_result["response"]
+        assert result["extra_metadata"]["semantic_cache_hit"] is True
+
+
+class TestResponseCache:
+    """Test exact-match response cache"""
+
+    def test_lru_eviction_and_ttl(self):
+        """Oldest entries are evicted and expired entries are not served"""
+        from src.utils.response_cache import ResponseCache
+
+        cache = ResponseCache(max_size=2)
+        for i in range(3):
+            cache.put(i, f"response {i}")
+
+        assert len(cache) == 2
+        assert cache.get(0) is None
+        assert cache.get(2) == "response 2"
+
+        expired = ResponseCache(ttl_seconds=0)
+        expired.put("key", "stale")
+        assert expired.get("key") is None
+
+    def test_llm_manager_serves_repeated_prompts(self):
+        """Identical prompts hit the LLM once"""
+        from src.agents.categorizer import CATEGORIZATION_PROMPT
+        from src.agents.llm_manager import LLMManager
+        from src.utils.response_cache import ResponseCache
+
+        manager = LLMManager.__new__(LLMManager)
+        manager.llm = Mock()
+        manager.llm.invoke.return_value = AIMessage(content="Payroll")
+        manager.llm.batch.side_effect = lambda batch, **kwargs: [
+            AIMessage(content="Benefits")
+        ] * len(batch)
+        manager.response_cache = ResponseCache()
+
+        inputs = {"query": "W-2?", "context": ""}
+        assert manager.invoke_with_retry(CATEGORIZATION_PROMPT, inputs) == "Payroll"
+        assert manager.invoke_with_retry(CATEGORIZATION_PROMPT, inputs) == "Payroll"
+        assert manager.llm.invoke.call_count == 1
+
+        messages = [
+            CATEGORIZATION_PROMPT.format_messages(**inputs),
+            CATEGORIZATION_PROMPT.format_messages(query="401k?", context=""),
+        ]
+        assert manager.batch_formatted(messages) == ["Payroll", "Benefits"]
+        assert len(manager.llm.batch.call_args.args[0]) == 1
+
+    def test_query_cache_key_normalizes_per_user(self):
+        """Case and whitespace don't matter, the user does"""
+        from src.api.response_cache import make_query_cache_key
+
+        key = make_query_cache_key("emp1", "What is the PTO policy?")
+        assert make_query_cache_key("emp1", "  what is the  pto policy? ") == key
+        assert make_query_cache_key("emp2", "What is the PTO policy?") != key
+
+    def _run_query_route(self, agent_results):
+        """Post the same query twice; return (responses, agent, webhooks)"""
+        import asyncio
+        from unittest.mock import AsyncMock
+        from src.api import routes
+        from src.api.schemas import QueryRequest
+        from src.utils.response_cache import ResponseCache
+
+        agent = Mock()
+        agent.aprocess_query = AsyncMock(side_effect=agent_results)
+        schedule = Mock()
+        request = QueryRequest(message="What is the PTO policy?", user_id="emp1")
+
+        with patch.object(routes, "get_agent", return_value=agent), patch.object(
+            routes, "get_query_response_cache", return_value=ResponseCache()
+        ), patch.object(routes, "schedule_query_webhooks", schedule):
+            responses = [asyncio.run(routes.process_query(request)) for _ in range(2)]
+
+        return responses, agent, schedule
+
+    def test_query_route_serves_repeats_from_cache(self):
+        """A repeated query is answered without calling the agent"""
+        result = {"conversation_id": "c1", "response": "15 days a year."}
+
+        responses, agent, schedule = self._run_query_route([result])
+
+        assert responses[1] is responses[0]
+        assert agent.aprocess_query.await_count == 1
+        # Webhook subscribers still hear about the repeat
+        assert schedule.call_count == 2
+
+    def test_query_route_does_not_cache_escalations(self):
+        """Escalated responses are never replayed from cache"""
+        escalated = {
+            "conversation_id": "c1",
+            "response": "Connecting you with a specialist.",
+            "metadata": {"escalated": True, "escalation_reason": "Angry"},
+        }
+
+        responses, agent, _ = self._run_query_route([escalated, dict(escalated)])
+
+        assert agent.aprocess_query.await_count == 2
+        assert all(response.metadata.escalated for response in responses)
+
+    def test_query_route_does_not_cache_errors(self):
+        """Error responses from transient failures are never replayed"""
+        error = {
+            "conversation_id": "error",
+            "response": "I apologize, but I encountered an error.",
+            "category": "Error",
+            "metadata": {"error": "Connection reset", "success": False},
+        }
+
+        responses, agent, _ = self._run_query_route([error, dict(error)])
+
+        assert agent.aprocess_query.await_count == 2
+        assert responses[1] is not responses[0]
+
+
+class TestVectorStore:
+    """Test FAISS-backed vector store"""
+
+    def test_category_filter_runs_inside_search(self, tmp_path):
+        """Filtered searches only return that category and reuse embeddings"""
+        import numpy as np
+        from src.knowledge_base.vector_store import VectorStore
+
+        vectors = {"a": [1, 0, 0, 0], "b": [0.9, 0.1, 0, 0], "c": [0, 1, 0, 0]}
+        encoder = Mock()
+        encoder.get_sentence_embedding_dimension.return_value = 4
+        encoder.encode.side_effect = lambda texts, **kwargs: np.array(
+            [vectors[text] for text in texts], dtype="float32"
+        )
+
+        with patch(
+            "src.knowledge_base.vector_store.get_encoder", return_value=encoder
+        ):
+            store = VectorStore(
+                index_path=str(tmp_path / "index"),
+                metadata_path=str(tmp_path / "metadata.json"),
+            )
+        store.add_documents(
+            [
+                {"id": 1, "text": "a", "category": "Payroll"},
+                {"id": 2, "text": "b", "category": "Benefits"},
+                {"id": 3, "text": "c", "category": "Payroll"},
+            ]
+        )
+
+        results = store.search("a", k=3, category_filter="Payroll")
+        assert [doc["id"] for doc in results] == [1, 3]
+        assert [doc["id"] for doc in store.search("a", k=1)] == [1]
+        assert store.search("a", category_filter="Unknown") == []
+
+        # Documents are encoded once, the repeated query once
+        assert encoder.encode.call_count == 2
+
+    def test_request_encodes_its_query_once(self, tmp_path):
+        """Semantic cache lookup, prefetch and retrieval share one encoding"""
+        import numpy as np
+        from src.knowledge_base.retriever import KnowledgeBaseRetriever
+        from src.knowledge_base.vector_store import VectorStore
+
+        encoder = Mock()
+        encoder.get_sentence_embedding_dimension.return_value = 2
+        encoder.encode.side_effect = lambda texts, **kwargs: np.ones(
+            (len(texts), 2), dtype="float32"
+        )
+
+        with patch(
+            "src.knowledge_base.vector_store.get_encoder", return_value=encoder
+        ):
+            store = VectorStore(
+                index_path=str(tmp_path / "index"),
+                metadata_path=str(tmp_path / "metadata.json"),
+            )
+        store.add_documents([{"id": 1, "text": "W-2 form", "category": "Payroll"}])
+        retriever = KnowledgeBaseRetriever.__new__(KnowledgeBaseRetriever)
+        retriever.vector_store = store
+        encoder.encode.reset_mock()
+
+        query = "Where is my W-2?"
+        store.embed_query(query)  # semantic cache lookup
+        retriever.prefetch(query)
+        assert [r["id"] for r in retriever.retrieve(query, category="Payroll")] == [1]
+        assert encoder.encode.call_count == 1
+
 
 class TestAgentState:
     """Test agent state management"""
@@ -123,6 +414,47 @@ class TestAgentState:
         assert state["user_id"] == "test_user"
         assert state["category"] == "general"
 
+    def test_conversation_history_is_bounded(self):
+        """Old messages are dropped and tails are read without slicing"""
+        from src.agents.state import (
+            MAX_HISTORY_MESSAGES,
+            ConversationContext,
+            recent_messages,
+        )
+
+        messages = [{"role": "user", "content": str(i)} for i in range(50)]
+        state = ConversationContext(
+            query="q", user_id="u", conversation_id="c", conversation_history=messages
+        ).to_state()
+
+        history = state["conversation_history"]
+        assert len(history) == MAX_HISTORY_MESSAGES
+        assert [msg["content"] for msg in recent_messages(history, 2)] == ["48", "49"]
+        assert list(recent_messages(None, 5)) == []
+
+    def test_history_loads_only_latest_messages(self):
+        """A message limit loads the conversation's tail, oldest first"""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from src.database.models import Base
+        from src.database.queries import (
+            ConversationQueries,
+            MessageQueries,
+            UserQueries,
+        )
+
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        with sessionmaker(bind=engine)() as db:
+            user = UserQueries.create_user(db, "u1")
+            conv = ConversationQueries.create_conversation(db, "c1", user.id, "q")
+            for i in range(6):
+                MessageQueries.add_message(db, conv.id, "user", str(i))
+
+            latest = MessageQueries.get_conversation_messages(db, conv.id, limit=3)
+            assert [msg.content for msg in latest] == ["3", "4", "5"]
+            assert len(MessageQueries.get_conversation_messages(db, conv.id)) == 6
+
 
 class TestWorkflow:
     """Test workflow components"""
@@ -140,6 +472,372 @@ class TestWorkflow:
             # We're just testing that the function is callable
             assert True
 
+    def test_independent_analysis_runs_in_parallel(self):
+        """Categorization, sentiment and the KB embedding all start at once"""
+        from src.agents.workflow import create_workflow
+
+        graph = create_workflow().get_graph()
+        started = {edge.target for edge in graph.edges if edge.source == "__start__"}
+
+        assert {"categorize", "analyze_sentiment", "prefetch_kb"} <= started
+
+    def test_categorizer_keyword_fastpath(self):
+        """Obvious keywords are categorized without calling the LLM"""
+        from src.agents import categorizer
+
+        with patch.object(
+            categorizer, "get_llm_manager", side_effect=AssertionError("LLM called")
+        ):
+            state = categorizer.categorize_query({"query": "Where is my W-2 form?"})
+
+        assert state["category"] == "Payroll"
+        assert state["extra_metadata"]["category_source"] == "fastpath"
+
+        # Ambiguous or unmatched queries are left to the LLM
+        assert categorizer.match_category_hint("My PTO and my paycheck") is None
+        assert categorizer.match_category_hint("My laptop is slow") is None
+
+        # Overlapping keywords: the more specific phrase decides
+        assert categorizer.match_category_hint("How does PTO accrual work?") == "Benefits"
+
+    def test_parallel_nodes_merge_extra_metadata(self):
+        """Metadata written by categorize and analyze_sentiment both survive"""
+        import asyncio
+        from src.agents import categorizer, sentiment_analyzer, workflow
+        from src.agents.state import ConversationContext
+
+        analyzer = Mock()
+        analyzer.polarity_scores.return_value = {"neg": 0.0, "compound": 0.8}
+
+        def answer(state):
+            state["response"] = "Your W-2 is in the portal."
+            return state
+
+        with patch.object(
+            categorizer, "get_llm_manager", side_effect=AssertionError("LLM called")
+        ), patch.object(
+            sentiment_analyzer, "get_lexicon_analyzer", return_value=analyzer
+        ), patch.object(
+            workflow, "prefetch_query_embedding", lambda state: state
+        ), patch.object(
+            workflow, "retrieve_from_kb", lambda state: {**state, "kb_results": []}
+        ), patch.object(
+            workflow, "handle_payroll", answer
+        ):
+            graph = workflow.create_workflow()
+            state = ConversationContext(
+                query="Where is my W-2 form? Thanks!",
+                user_id="user",
+                conversation_id="conv",
+            ).to_state()
+            result = asyncio.run(graph.ainvoke(state))
+
+        assert result["category"] == "Payroll"
+        assert result["extra_metadata"]["category_source"] == "fastpath"
+        assert "raw_sentiment" in result["extra_metadata"]
+
+    def test_local_sentiment_fastpath(self):
+        """Confident positive/neutral predictions skip the LLM"""
+        import asyncio
+        from unittest.mock import AsyncMock
+        from src.agents import sentiment_analyzer
+
+        llm_manager = Mock()
+        llm_manager.ainvoke_with_retry = AsyncMock(return_value="Angry")
+        classifier = Mock(return_value=[{"label": "neutral", "score": 0.9}])
+
+        with patch.object(
+            sentiment_analyzer, "get_sentiment_classifier", return_value=classifier
+        ), patch.object(
+            sentiment_analyzer, "get_llm_manager", return_value=llm_manager
+        ):
+            state = asyncio.run(
+                sentiment_analyzer.analyze_sentiment({"query": "How do I enroll?"})
+            )
+            assert state["sentiment"] == "Neutral"
+            assert llm_manager.ainvoke_with_retry.await_count == 0
+
+            # Negative needs the LLM to tell Negative from Angry
+            classifier.return_value = [{"label": "negative", "score": 0.99}]
+            state = asyncio.run(
+                sentiment_analyzer.analyze_sentiment({"query": "This is awful"})
+            )
+            assert state["sentiment"] == "Angry"
+            assert llm_manager.ainvoke_with_retry.await_count == 1
+
+    def test_quantized_sentiment_model_is_exported_once(self, tmp_path):
+        """A cached int8 ONNX export is reused instead of exporting again"""
+        from src.agents import sentiment_analyzer
+
+        model_dir = tmp_path / "org--model"
+        model_dir.mkdir()
+        (model_dir / sentiment_analyzer.QUANTIZED_MODEL_FILE).touch()
+
+        # Exporting would need optimum; the cached files don't
+        with patch.object(
+            sentiment_analyzer.settings, "sentiment_model_dir", str(tmp_path)
+        ), patch.dict("sys.modules", {"optimum.onnxruntime": None}):
+            assert sentiment_analyzer.get_quantized_onnx_model("org/model") == model_dir
+
+    def test_lexicon_sentiment_fastpath(self):
+        """Clear lexicon scores skip both the local model and the LLM"""
+        import asyncio
+        from src.agents import sentiment_analyzer
+
+        analyzer = Mock()
+        analyzer.polarity_scores.return_value = {"neg": 0.0, "compound": 0.8}
+
+        with patch.object(
+            sentiment_analyzer, "get_lexicon_analyzer", return_value=analyzer
+        ), patch.object(
+            sentiment_analyzer,
+            "classify_sentiment_locally",
+            side_effect=AssertionError("model called"),
+        ):
+            state = asyncio.run(
+                sentiment_analyzer.analyze_sentiment({"query": "Thanks, great help!"})
+            )
+            assert state["sentiment"] == "Positive"
+
+            # Any negative word defers to the next stage
+            analyzer.polarity_scores.return_value = {"neg": 0.3, "compound": 0.1}
+            assert sentiment_analyzer.classify_sentiment_lexically("not great") is None
+
+            # So do unscored queries, which may be angry without lexicon words
+            analyzer.polarity_scores.return_value = {"neg": 0.0, "compound": 0.0}
+            assert (
+                sentiment_analyzer.classify_sentiment_lexically(
+                    "I will sue the company if this is not fixed today"
+                )
+                is None
+            )
+
+    def test_categorizer_batcher_coalesces_requests(self):
+        """Concurrent categorization prompts share one batch call"""
+        from concurrent.futures import ThreadPoolExecutor
+        from src.agents import categorizer
+
+        llm_manager = Mock()
+        llm_manager.batch_formatted.side_effect = lambda batch: [
+            f"Category {messages}" for messages in batch
+        ]
+        batcher = categorizer.CategorizerBatcher(max_batch=4, max_wait=0.5)
+
+        with patch.object(categorizer, "get_llm_manager", return_value=llm_manager):
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                results = list(pool.map(batcher.submit, range(4)))
+
+        assert results == [f"Category {i}" for i in range(4)]
+        assert llm_manager.batch_formatted.call_count == 1
+
+    def test_llm_invocations_call_the_model_directly(self):
+        """Prompts are formatted and sent to the model built at init"""
+        from src.agents.categorizer import CATEGORIZATION_PROMPT
+        from src.agents.llm_manager import LLMManager
+
+        manager = LLMManager.__new__(LLMManager)
+        manager.llm = llm = Mock()
+        llm.invoke.return_value = AIMessage(content=" Payroll ")
+
+        for _ in range(2):
+            assert (
+                manager.invoke_with_retry(
+                    CATEGORIZATION_PROMPT, {"query": "W-2?", "context": ""}
+                )
+                == "Payroll"
+            )
+
+        assert llm.invoke.call_count == 2
+        messages = llm.invoke.call_args.args[0]
+        assert "W-2?" in messages[0].content
+
+    def test_model_tiers_pick_the_model_per_specialist(self):
+        """Fast-tier calls go to the fast model and are cached separately"""
+        from src.agents.categorizer import CATEGORIZATION_PROMPT
+        from src.agents.general_agent import GENERAL, PERFORMANCE
+        from src.agents.llm_manager import LLMManager, get_tier_model
+        from src.utils.config import settings
+        from src.utils.response_cache import ResponseCache
+
+        assert GENERAL.model_tier == "fast" and PERFORMANCE.model_tier == "strong"
+        assert get_tier_model("fast") == settings.llm_fast_model
+        assert get_tier_model(None) == settings.llm_model
+
+        manager = LLMManager.__new__(LLMManager)
+        manager.llm = llm = Mock()
+        manager._bound_models = {}
+        manager.response_cache = ResponseCache()
+        llm.invoke.return_value = AIMessage(content="balanced")
+        llm.bind.return_value.invoke.return_value = AIMessage(content="fast")
+
+        inputs = {"query": "W-2?", "context": ""}
+        assert manager.invoke_with_retry(CATEGORIZATION_PROMPT, inputs) == "balanced"
+        assert (
+            manager.invoke_with_retry(CATEGORIZATION_PROMPT, inputs, tier="fast")
+            == "fast"
+        )
+        llm.bind.assert_called_once_with(model=settings.llm_fast_model)
+
+    def test_llm_http_clients_time_out_and_close(self):
+        """Pooled LLM clients carry a timeout and are closed on shutdown"""
+        import asyncio
+        from src.agents.llm_manager import LLMManager
+
+        manager = LLMManager()
+        http_client = manager.llm.http_client
+        http_async_client = manager.llm.http_async_client
+        assert http_client.timeout.connect == 5.0
+        assert manager.llm.request_timeout == http_client.timeout
+
+        manager.close()
+        asyncio.run(manager.aclose())
+        assert http_client.is_closed and http_async_client.is_closed
+
+    def test_compiled_prompt_matches_langchain_formatting(self):
+        """Precompiled prompts render exactly like format_messages"""
+        from src.agents.exceptions import AgentFatalError
+        from src.agents.general_agent import BENEFITS_PROMPT
+        from src.agents.llm_manager import format_prompt
+        from src.agents.technical_agent import TECHNICAL_PROMPT
+
+        inputs = {
+            "query": "Can I add my {spouse}?",
+            "sentiment": "Neutral",
+            "priority": 3,
+            "word_budget": "80-120",
+            "context": "",
+            "kb_context": "",
+        }
+        assert format_prompt(BENEFITS_PROMPT, inputs) == BENEFITS_PROMPT.format_messages(
+            **inputs
+        )
+
+        # Static instructions first, as their own system message
+        messages = format_prompt(TECHNICAL_PROMPT, inputs)
+        assert messages == TECHNICAL_PROMPT.format_messages(**inputs)
+        assert [message.type for message in messages] == ["system", "human"]
+        assert "{" not in messages[0].content
+        assert format_prompt(TECHNICAL_PROMPT, inputs)[0] is messages[0]
+
+        del inputs["priority"]
+        with pytest.raises(AgentFatalError):
+            format_prompt(BENEFITS_PROMPT, inputs)
+
+    def test_llm_errors_fail_fast_unless_transient(self):
+        """Fatal LLM errors are not retried; transient ones are"""
+        from src.agents.exceptions import AgentFatalError, AgentTransientError
+        from src.agents.llm_manager import LLMManager
+
+        manager = LLMManager.__new__(LLMManager)
+        manager.llm = Mock()
+
+        manager.llm.invoke.side_effect = ValueError("bad request")
+        with pytest.raises(AgentFatalError):
+            manager.invoke_formatted([], retry_delay=0)
+        assert manager.llm.invoke.call_count == 1
+
+        manager.llm.invoke.reset_mock()
+        manager.llm.invoke.side_effect = TimeoutError("slow")
+        with pytest.raises(AgentTransientError):
+            manager.invoke_formatted([], max_retries=2, retry_delay=0)
+        assert manager.llm.invoke.call_count == 2
+
+    def test_async_llm_invocation_shares_cache(self):
+        """Async invocations await the model and share the response cache"""
+        import asyncio
+        from unittest.mock import AsyncMock
+        from src.agents.categorizer import CATEGORIZATION_PROMPT
+        from src.agents.llm_manager import LLMManager
+        from src.utils.response_cache import ResponseCache
+
+        manager = LLMManager.__new__(LLMManager)
+        manager.llm = Mock()
+        manager.llm.ainvoke = AsyncMock(return_value=AIMessage(content=" Payroll "))
+        manager.response_cache = ResponseCache()
+
+        inputs = {"query": "W-2?", "context": ""}
+        assert (
+            asyncio.run(manager.ainvoke_with_retry(CATEGORIZATION_PROMPT, inputs))
+            == "Payroll"
+        )
+        assert manager.invoke_with_retry(CATEGORIZATION_PROMPT, inputs) == "Payroll"
+        assert manager.llm.ainvoke.await_count == 1
+        assert manager.llm.invoke.call_count == 0
+
+    def test_word_budget_scales_with_sentiment(self):
+        """Routine queries get a short answer and a lower token limit"""
+        from src.agents.context_builder import (
+            CONCISE_WORD_BUDGET,
+            get_word_budget,
+            word_budget_to_max_tokens,
+        )
+
+        routine = {"sentiment": "Neutral", "priority_score": 3}
+        upset = {"sentiment": "Negative", "priority_score": 3}
+        urgent = {"sentiment": "Neutral", "priority_score": 8}
+
+        assert get_word_budget(routine, "200-300") == CONCISE_WORD_BUDGET
+        assert get_word_budget(upset, "200-300") == "200-300"
+        assert get_word_budget(urgent, "200-300") == "200-300"
+        assert word_budget_to_max_tokens("80-120") < word_budget_to_max_tokens(
+            "200-300"
+        )
+
+    def test_specialist_handlers_share_one_implementation(self):
+        """Specialists differ only in their config, including error fallback"""
+        import asyncio
+        from unittest.mock import AsyncMock
+        from src.agents import specialist
+        from src.agents.general_agent import handle_benefits
+        from src.agents.recruitment_agent import RECRUITMENT, handle_recruitment
+
+        llm_manager = Mock()
+        llm_manager.ainvoke_with_retry = AsyncMock(return_value="Enroll by Friday")
+        state = {"query": "How do I enroll?", "sentiment": "Neutral", "priority_score": 3}
+
+        with patch.object(specialist, "get_llm_manager", return_value=llm_manager):
+            result = asyncio.run(handle_benefits(dict(state)))
+            assert result["response"] == "Enroll by Friday"
+            assert "fallback" not in (result.get("extra_metadata") or {})
+
+            llm_manager.ainvoke_with_retry.side_effect = TimeoutError("slow")
+            result = asyncio.run(handle_recruitment(dict(state)))
+            assert result["response"] == RECRUITMENT.fallback_response
+            assert result["should_escalate"] is True
+            # Fallbacks are marked so the semantic cache skips them
+            assert result["extra_metadata"]["fallback"] is True
+
+    def test_long_history_is_summarized(self):
+        """Older turns are replaced by a summary in response prompts"""
+        import asyncio
+        from unittest.mock import AsyncMock
+        from src.agents import history_summarizer
+        from src.agents.context_builder import build_contexts
+
+        llm_manager = Mock()
+        llm_manager.ainvoke_with_retry = AsyncMock(return_value="Asked about PTO.")
+        history = [{"role": "user", "content": f"message {i}"} for i in range(8)]
+
+        with patch.object(
+            history_summarizer, "get_llm_manager", return_value=llm_manager
+        ):
+            state = asyncio.run(
+                history_summarizer.summarize_history({"conversation_history": history})
+            )
+            short = asyncio.run(
+                history_summarizer.summarize_history(
+                    {"conversation_history": history[:3]}
+                )
+            )
+
+        assert state["history_summary"] == "Asked about PTO."
+        assert short["history_summary"] is None
+        assert llm_manager.ainvoke_with_retry.await_count == 1
+
+        context, _ = build_contexts(state, "KB")
+        assert "Asked about PTO." in context
+        assert "message 7" in context and "message 5" not in context
+
     def test_route_query_function_exists(self):
         """Test that route_query function exists"""
         from src.agents.workflow import route_query
@@ -164,6 +862,189 @@ class TestMainAgent:
             # We're just testing the function exists and is callable
             assert True
 
+    def test_history_summary_covers_older_turns(self):
+        """History loads oldest first: older turns are summarized, latest kept"""
+        import asyncio
+        from contextlib import nullcontext
+        from unittest.mock import AsyncMock
+        from src import main
+        from src.agents import history_summarizer
+        from src.agents.context_builder import build_history_context
+
+        # Conversations are returned newest first, messages oldest first
+        convs = [Mock(id=i, query=f"question {i}") for i in (3, 2, 1)]
+        messages = {
+            conv.id: [
+                Mock(role="user", content=f"question {conv.id}"),
+                Mock(role="assistant", content=f"answer {conv.id}"),
+            ]
+            for conv in convs
+        }
+        agent = main.CustomerSupportAgent.__new__(main.CustomerSupportAgent)
+
+        with patch.object(
+            main, "get_db_context", lambda: nullcontext("db")
+        ), patch.object(
+            main.UserQueries, "get_or_create_user", return_value=Mock(id=7)
+        ), patch.object(
+            main.ConversationQueries, "get_user_conversations", return_value=convs
+        ), patch.object(
+            main.MessageQueries,
+            "get_conversation_messages",
+            side_effect=lambda db, conv_id, limit: messages[conv_id],
+        ):
+            _, _, history, previous_query = agent._load_user("emp1", None)
+
+        assert previous_query == "question 3"
+
+        llm_manager = Mock()
+        llm_manager.ainvoke_with_retry = AsyncMock(return_value="Asked 1 and 2")
+        with patch.object(
+            history_summarizer, "get_llm_manager", return_value=llm_manager
+        ), patch.object(history_summarizer.settings, "history_summary_min_messages", 4):
+            state = asyncio.run(
+                history_summarizer.summarize_history({"conversation_history": history})
+            )
+
+        summarized = llm_manager.ainvoke_with_retry.await_args.args[1]["conversation"]
+        assert "question 1" in summarized and "answer 2" in summarized
+        assert "question 3" not in summarized and "answer 3" not in summarized
+
+        context = build_history_context(history, summary=state["history_summary"])
+        recent = context.split("Recent messages:")[1]
+        assert "User: question 3" in recent and "Assistant: answer 3" in recent
+        assert "question 1" not in recent
+
+    def test_stream_query_yields_chunks_then_result(self):
+        """Streamed chunks arrive in order, followed by the full result"""
+        import asyncio
+        from threading import Lock
+        from src.main import CustomerSupportAgent
+
+        async def fake_process_query(query, user_id, conversation_id, context, on_token):
+            response = await CustomerSupportAgent._forward_response(
+                {"response_stream": iter(["Hello", " there"])}, on_token
+            )
+            return {"response": response}
+
+        agent = CustomerSupportAgent.__new__(CustomerSupportAgent)
+        agent._loop, agent._loop_lock = None, Lock()
+        agent._process_query = fake_process_query
+
+        async def collect():
+            return [item async for item in agent.astream_query("Hi")]
+
+        assert asyncio.run(collect()) == [
+            "Hello",
+            " there",
+            {"response": "Hello there"},
+        ]
+
+    def test_webhook_deliveries_share_one_client(self):
+        """Webhook deliveries reuse the pooled client until it is closed"""
+        import asyncio
+        import httpx
+        from src.api import http_pool
+        from src.api.webhook_delivery import deliver_webhook
+
+        webhook = Mock(id="wh-1", url="https://hooks.example.com/hr", secret_key="s")
+        requests = []
+
+        def respond(request):
+            requests.append(request)
+            return httpx.Response(200)
+
+        async def deliver_twice():
+            client = http_pool.get_http_client()
+            client._transport = httpx.MockTransport(respond)
+            results = [await deliver_webhook(webhook, {"n": i}) for i in range(2)]
+            assert http_pool.get_http_client() is client
+            await http_pool.close_http_client()
+            return results
+
+        results = asyncio.run(deliver_twice())
+        assert [r["success"] for r in results] == [True, True]
+        assert http_pool._http_client is None
+
+        headers = requests[0].headers
+        assert headers["Content-Type"] == "application/json"
+        assert headers["User-Agent"] == http_pool.WEBHOOK_HEADERS["User-Agent"]
+        assert headers["X-Webhook-ID"] == "wh-1"
+        assert requests[0].content == b'{"n":0}'
+
+    def test_webhook_events_are_delivered_by_workers(self):
+        """Queued events are delivered by the workers and flushed on stop"""
+        import asyncio
+        from contextlib import nullcontext
+        from unittest.mock import AsyncMock
+        from src.api import webhook_delivery
+
+        async def enqueue_and_stop():
+            webhook_delivery.start_webhook_workers()
+            assert webhook_delivery.enqueue_webhook_event("query.created", {"n": 1})
+            await webhook_delivery.stop_webhook_workers()
+
+        trigger = AsyncMock()
+        with patch.object(webhook_delivery, "trigger_webhooks", trigger), patch.object(
+            webhook_delivery, "get_db_context", lambda: nullcontext("db")
+        ):
+            asyncio.run(enqueue_and_stop())
+
+        trigger.assert_awaited_once_with("db", "query.created", {"n": 1})
+        assert webhook_delivery._webhook_queue is None
+        assert webhook_delivery._webhook_workers == []
+
+    def test_webhook_subscriber_lookup_is_cached(self):
+        """Subscriber checks reuse the lookup until webhooks change"""
+        from contextlib import nullcontext
+        from src.api import webhook_delivery
+
+        lookup = Mock(return_value=[])
+        webhook_delivery.invalidate_subscriber_cache()
+        with patch.object(
+            webhook_delivery.WebhookQueries, "get_active_webhooks_for_event", lookup
+        ), patch.object(webhook_delivery, "get_db_context", lambda: nullcontext("db")):
+            assert not webhook_delivery.has_subscribers("query.created")
+            assert not webhook_delivery.has_subscribers("query.created")
+            assert lookup.call_count == 1
+
+            lookup.return_value = [Mock()]
+            webhook_delivery.invalidate_subscriber_cache()
+            assert webhook_delivery.has_subscribers("query.created")
+        webhook_delivery.invalidate_subscriber_cache()
+
+    def test_query_response_matches_validated_model(self):
+        """Responses built without validation equal validated ones"""
+        import numpy as np
+        from src.api.routes import build_query_response
+        from src.api.schemas import QueryResponse
+
+        result = {
+            "conversation_id": "c1",
+            "response": "Hi",
+            "category": "Payroll",
+            "sentiment": "Neutral",
+            "priority": 3,
+            "timestamp": "2025-01-01T00:00:00",
+            "metadata": {
+                "processing_time": 0.5,
+                "escalated": False,
+                "kb_results": [
+                    {
+                        "title": "T",
+                        "content": "C",
+                        "category": "Payroll",
+                        "score": np.float32(0.75),
+                    }
+                ],
+            },
+        }
+
+        response = build_query_response(result, start_time=0.0)
+        dumped = response.model_dump(mode="json")
+        assert dumped == QueryResponse.model_validate(dumped).model_dump(mode="json")
+        assert dumped["metadata"]["kb_results"][0]["score"] == 0.75
+
 
 class TestHealthCheck:
     """Test system health checks"""
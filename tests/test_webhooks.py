@@ -6,15 +6,21 @@ import pytest
 import json
 import hmac
 import hashlib
-from unittest.mock import Mock, patch, AsyncMock
+import httpx
+from unittest.mock import Mock, patch
 from datetime import datetime
 
 from src.database.models import Webhook, WebhookDelivery
 from src.database.webhook_queries import WebhookQueries
 from src.api.webhook_delivery import (
     generate_webhook_signature,
+    generate_webhook_signature_bytes,
+    serialize_webhook_payload,
+    serialize_webhook_payloads,
     verify_webhook_signature,
     deliver_webhook,
+    read_response_text,
+    RESPONSE_BODY_LIMIT,
 )
 from src.api.webhook_events import (
     WebhookEvents,
@@ -91,6 +97,22 @@ class TestWebhookQueries:
         assert len(active_webhooks) >= 1
         assert all(w.is_active for w in active_webhooks)
 
+    def test_listed_webhooks_build_responses(self, db_session):
+        """Test listed rows validate into API responses with ISO timestamps"""
+        from src.api.schemas import WebhookResponse
+
+        webhook = WebhookQueries.create_webhook(
+            db=db_session, url="https://example.com/webhook", events=["query.created"]
+        )
+
+        (row,) = WebhookQueries.list_webhooks(db=db_session)
+        response = json.loads(WebhookResponse.model_validate(row).model_dump_json())
+
+        assert response["id"] == webhook.id
+        assert response["events"] == ["query.created"]
+        assert response["created_at"] == webhook.created_at.isoformat()
+        assert response["last_delivery_at"] is None
+
     def test_update_webhook(self, db_session):
         """Test updating webhook properties"""
         webhook = WebhookQueries.create_webhook(
@@ -181,6 +203,39 @@ class TestWebhookQueries:
         assert updated.failure_count == 1
         assert updated.last_failure_at is not None
 
+    def test_record_delivery(self, db_session):
+        """Test logging a delivery and counting it in one commit"""
+        webhook = WebhookQueries.create_webhook(
+            db=db_session, url="https://example.com/webhook", events=["query.created"]
+        )
+
+        WebhookQueries.record_delivery(
+            db=db_session,
+            webhook_id=webhook.id,
+            event_type="query.created",
+            payload={"event": "query.created"},
+            status="success",
+            status_code=200,
+        )
+        WebhookQueries.record_delivery(
+            db=db_session,
+            webhook_id=webhook.id,
+            event_type="query.created",
+            payload={"event": "query.created"},
+            status="pending",
+            status_code=503,
+            next_retry_at=datetime.utcnow(),
+        )
+
+        logs = WebhookQueries.get_delivery_logs(db=db_session, webhook_id=webhook.id)
+        assert sorted(log.status for log in logs) == ["pending", "success"]
+
+        # Pending deliveries are counted once their retry settles them
+        updated = WebhookQueries.get_webhook(db=db_session, webhook_id=webhook.id)
+        assert updated.delivery_count == 1
+        assert updated.failure_count == 0
+        assert updated.last_delivery_at is not None
+
 
 class TestWebhookSignatures:
     """Test webhook signature generation and verification"""
@@ -195,6 +250,11 @@ class TestWebhookSignatures:
         assert signature is not None
         assert len(signature) == 64  # SHA256 hex length
         assert isinstance(signature, str)
+        assert signature == hmac.new(
+            secret_key.encode("utf-8"),
+            json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8"),
+            hashlib.sha256,
+        ).hexdigest()
 
     def test_verify_webhook_signature_valid(self):
         """Test signature verification with valid signature"""
@@ -239,6 +299,33 @@ class TestWebhookSignatures:
 
         assert signature1 == signature2
 
+    def test_shared_serialization_matches_per_webhook_payload(self):
+        """Test bodies built from the shared payload match full serialization"""
+        payload = create_query_created_payload(
+            webhook_id="",
+            query_id="123",
+            user_id="user_456",
+            query="How many vacation days do I have?",
+            category="Leave",
+            sentiment="Neutral",
+            priority=5,
+        )
+        webhook_ids = ["webhook-a", "webhook-b"]
+
+        bodies = serialize_webhook_payloads(payload, webhook_ids)
+
+        for webhook_id, body in zip(webhook_ids, bodies):
+            webhook_payload = {**payload, "webhook_id": webhook_id}
+            assert body == serialize_webhook_payload(webhook_payload)
+            assert generate_webhook_signature_bytes(
+                body, "test_secret_key"
+            ) == generate_webhook_signature(webhook_payload, "test_secret_key")
+
+        # Payloads with keys sorting after webhook_id are serialized in full
+        payload["zone"] = "EU"
+        body = serialize_webhook_payloads(payload, ["webhook-a"])[0]
+        assert json.loads(body) == {**payload, "webhook_id": "webhook-a"}
+
 
 class TestWebhookDelivery:
     """Test webhook delivery system"""
@@ -253,11 +340,9 @@ class TestWebhookDelivery:
 
         payload = {"event": "query.created", "data": {"query_id": "123"}}
 
-        with patch("httpx.AsyncClient.post") as mock_post:
-            mock_response = AsyncMock()
-            mock_response.status_code = 200
-            mock_response.text = "OK"
-            mock_post.return_value = mock_response
+        with patch("httpx.AsyncClient.send") as mock_send:
+            mock_response = httpx.Response(200, text="OK")
+            mock_send.return_value = mock_response
 
             result = await deliver_webhook(
                 webhook, payload, max_retries=1, timeout=10
@@ -277,17 +362,13 @@ class TestWebhookDelivery:
 
         payload = {"event": "query.created", "data": {"query_id": "123"}}
 
-        with patch("httpx.AsyncClient.post") as mock_post:
+        with patch("httpx.AsyncClient.send") as mock_send:
             # First attempt: 500 error, second attempt: success
-            mock_response_fail = AsyncMock()
-            mock_response_fail.status_code = 500
-            mock_response_fail.text = "Internal Server Error"
+            mock_response_fail = httpx.Response(500, text="Internal Server Error")
 
-            mock_response_success = AsyncMock()
-            mock_response_success.status_code = 200
-            mock_response_success.text = "OK"
+            mock_response_success = httpx.Response(200, text="OK")
 
-            mock_post.side_effect = [mock_response_fail, mock_response_success]
+            mock_send.side_effect = [mock_response_fail, mock_response_success]
 
             result = await deliver_webhook(
                 webhook, payload, max_retries=2, timeout=10
@@ -295,7 +376,7 @@ class TestWebhookDelivery:
 
             assert result["success"] is True
             assert result["attempts"] == 2
-            assert mock_post.call_count == 2
+            assert mock_send.call_count == 2
 
     @pytest.mark.asyncio
     async def test_deliver_webhook_no_retry_on_400(self):
@@ -307,11 +388,9 @@ class TestWebhookDelivery:
 
         payload = {"event": "query.created", "data": {"query_id": "123"}}
 
-        with patch("httpx.AsyncClient.post") as mock_post:
-            mock_response = AsyncMock()
-            mock_response.status_code = 400
-            mock_response.text = "Bad Request"
-            mock_post.return_value = mock_response
+        with patch("httpx.AsyncClient.send") as mock_send:
+            mock_response = httpx.Response(400, text="Bad Request")
+            mock_send.return_value = mock_response
 
             result = await deliver_webhook(
                 webhook, payload, max_retries=3, timeout=10
@@ -320,7 +399,7 @@ class TestWebhookDelivery:
             assert result["success"] is False
             assert result["status_code"] == 400
             assert result["attempts"] == 1  # No retry
-            assert mock_post.call_count == 1
+            assert mock_send.call_count == 1
 
     @pytest.mark.asyncio
     async def test_deliver_webhook_max_retries(self):
@@ -332,11 +411,9 @@ class TestWebhookDelivery:
 
         payload = {"event": "query.created", "data": {"query_id": "123"}}
 
-        with patch("httpx.AsyncClient.post") as mock_post:
-            mock_response = AsyncMock()
-            mock_response.status_code = 503
-            mock_response.text = "Service Unavailable"
-            mock_post.return_value = mock_response
+        with patch("httpx.AsyncClient.send") as mock_send:
+            mock_response = httpx.Response(503, text="Service Unavailable")
+            mock_send.return_value = mock_response
 
             result = await deliver_webhook(
                 webhook, payload, max_retries=3, timeout=10
@@ -344,7 +421,141 @@ class TestWebhookDelivery:
 
             assert result["success"] is False
             assert result["attempts"] == 3
-            assert mock_post.call_count == 3
+            assert mock_send.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_response_body_read_is_capped(self):
+        """Test only the start of an endless response body is read"""
+
+        async def endless_body():
+            while True:
+                yield "é".encode("utf-8") * 512
+
+        response = httpx.Response(500, content=endless_body())
+
+        text = await read_response_text(response)
+
+        assert len(text.encode("utf-8")) <= RESPONSE_BODY_LIMIT
+        assert text.startswith("é" * 499)
+
+    @pytest.mark.asyncio
+    async def test_trigger_webhooks_bounds_concurrent_deliveries(self):
+        """Test fan-out to many webhooks keeps few deliveries in flight"""
+        import asyncio
+        from src.api import webhook_delivery
+
+        webhooks = []
+        for i in range(5):
+            webhook = Mock(spec=Webhook)
+            webhook.id = f"webhook-{i}"
+            webhooks.append(webhook)
+
+        in_flight = 0
+        peak = 0
+
+        async def deliver(*args):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+        with patch.object(
+            WebhookQueries, "get_active_webhooks_for_event", return_value=webhooks
+        ), patch.object(
+            webhook_delivery, "deliver_webhook_and_log", side_effect=deliver
+        ) as deliver_mock, patch.object(
+            webhook_delivery.settings, "webhook_max_concurrent_deliveries", 2
+        ):
+            await webhook_delivery.trigger_webhooks(
+                Mock(), "query.created", {"event": "query.created", "data": {}}
+            )
+
+        assert deliver_mock.call_count == 5
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_delivery_timeout_defaults_to_setting(self):
+        """Test deliveries use WEBHOOK_TIMEOUT unless a timeout is given"""
+        from src.api import webhook_delivery
+
+        webhook = Mock(spec=Webhook)
+        webhook.id = "wh_test"
+        webhook.url = "https://example.com/webhook"
+        webhook.secret_key = "test_secret"
+
+        with patch("httpx.AsyncClient.send") as mock_send, patch.object(
+            webhook_delivery.settings, "webhook_timeout", 3
+        ):
+            mock_send.return_value = httpx.Response(200, text="OK")
+            await deliver_webhook(webhook, {"event": "test"}, max_retries=1)
+
+        request = mock_send.call_args.args[0]
+        assert request.extensions["timeout"]["read"] == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_delivery_is_retried_from_the_log(self, db_session):
+        """Test a 5xx delivery is logged as pending and redelivered later"""
+        from datetime import timedelta
+        from src.api.webhook_delivery import deliver_webhook_and_log, retry_delivery
+
+        webhook = WebhookQueries.create_webhook(
+            db=db_session, url="https://example.com/webhook", events=["query.created"]
+        )
+        payload = {"event": "query.created", "webhook_id": webhook.id, "data": {}}
+
+        with patch("httpx.AsyncClient.send") as mock_send:
+            mock_response_fail = httpx.Response(503, text="Service Unavailable")
+            mock_response_success = httpx.Response(200, text="OK")
+            mock_send.side_effect = [mock_response_fail, mock_response_success]
+
+            await deliver_webhook_and_log(
+                db_session, webhook, payload, "query.created", log_delivery=True
+            )
+
+            (delivery,) = WebhookQueries.get_delivery_logs(db_session, webhook.id)
+            assert delivery.status == "pending"
+            assert mock_send.call_count == 1
+            assert webhook.delivery_count == 0  # Not settled yet
+
+            due_at = delivery.next_retry_at
+            due = WebhookQueries.get_due_deliveries(db_session, due_at)
+            assert due == [(delivery.id, due_at)]
+            await retry_delivery(db_session, *due[0])
+
+            assert delivery.status == "success"
+            assert delivery.attempt_count == 2
+            assert delivery.next_retry_at is None
+            assert webhook.delivery_count == 1
+            assert webhook.failure_count == 0
+            assert not WebhookQueries.get_due_deliveries(
+                db_session, due_at + timedelta(days=1)
+            )
+
+    def test_due_delivery_is_claimed_once(self, db_session):
+        """Test a retry time read by two workers can only be claimed by one"""
+        from datetime import timedelta
+
+        webhook = WebhookQueries.create_webhook(
+            db=db_session, url="https://example.com/webhook", events=["query.created"]
+        )
+        due_at = datetime.utcnow() - timedelta(seconds=1)
+        WebhookQueries.record_delivery(
+            db=db_session,
+            webhook_id=webhook.id,
+            event_type="query.created",
+            payload={},
+            status="pending",
+            next_retry_at=due_at,
+        )
+
+        # Both workers read the same due entry before either claims it
+        (entry,) = WebhookQueries.get_due_deliveries(db_session, datetime.utcnow())
+        lease_until = datetime.utcnow() + timedelta(minutes=1)
+
+        claimed = WebhookQueries.claim_delivery(db_session, *entry, lease_until)
+        assert claimed is not None and claimed.next_retry_at == lease_until
+        assert WebhookQueries.claim_delivery(db_session, *entry, lease_until) is None
 
 
 class TestWebhookEvents:
@@ -363,6 +574,16 @@ class TestWebhookEvents:
         assert WebhookEvents.is_valid_event("query.escalated") is True
         assert WebhookEvents.is_valid_event("invalid.event") is False
 
+    def test_is_valid_webhook_url(self):
+        """Test webhook URL validation"""
+        from src.api.webhooks import is_valid_webhook_url
+
+        assert is_valid_webhook_url("https://example.com/webhook") is True
+        assert is_valid_webhook_url("http://localhost:8000/hook") is True
+        assert is_valid_webhook_url("ftp://example.com/webhook") is False
+        assert is_valid_webhook_url("https:///webhook") is False
+        assert is_valid_webhook_url("http://[::1") is False
+
     def test_create_webhook_payload(self):
         """Test base webhook payload creation"""
         payload = create_webhook_payload(